@@ -0,0 +1,5 @@
+"""HTTP API поверх очереди задач анализа (см. app/api/server.py)"""
+
+from app.api.server import create_app
+
+__all__ = ["create_app"]
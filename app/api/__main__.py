@@ -0,0 +1,3 @@
+from app.api.server import main
+
+main()
@@ -0,0 +1,100 @@
+"""
+Рассылка прогресса задач подписчикам (SSE): один фоновый опрос SQLite на все
+отслеживаемые задачи вместо отдельного опроса на каждого клиента.
+"""
+
+import asyncio
+from collections import defaultdict
+from concurrent.futures import Executor
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional, Set
+
+from app.services.job_queue import ACTIVE_STATUSES, JobQueue
+
+
+class ProgressHub:
+    """
+    Подписки на состояние задач. Опрос идёт, пока есть подписчики; каждый
+    получает текущее состояние сразу и затем каждое изменение.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        executor: Executor,
+        state: Callable[[Dict[str, Any]], Dict[str, Any]],
+        interval: float = 1.0,
+    ):
+        self.queue = queue
+        self.executor = executor
+        self.state = state
+        self.interval = interval
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self._last: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _fetch(self, job_ids: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        return {job_id: self.queue.get(job_id) for job_id in job_ids}
+
+    async def _poll(self):
+        loop = asyncio.get_running_loop()
+        while self._subscribers:
+            try:
+                jobs = await loop.run_in_executor(
+                    self.executor, self._fetch, list(self._subscribers)
+                )
+            except Exception as e:
+                print(f"[api] Ошибка опроса задач: {e}")
+                jobs = {}
+            for job_id, job in jobs.items():
+                if job is None:
+                    continue
+                state = self.state(job)
+                if state == self._last.get(job_id):
+                    continue
+                self._last[job_id] = state
+                for inbox in self._subscribers.get(job_id, ()):
+                    inbox.put_nowait(state)
+            await asyncio.sleep(self.interval)
+
+    def _ensure_polling(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._poll())
+
+    async def watch(
+        self, job_id: str, heartbeat: float = 15.0
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Состояния задачи до её завершения. Если за `heartbeat` секунд изменений
+        не было, выдаёт None — чтобы соединение не закрыли прокси.
+        """
+        inbox: asyncio.Queue = asyncio.Queue()
+        self._subscribers[job_id].add(inbox)
+        if job_id in self._last:
+            inbox.put_nowait(self._last[job_id])
+        self._ensure_polling()
+        try:
+            while True:
+                try:
+                    state = await asyncio.wait_for(inbox.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield state
+                if state["status"] not in ACTIVE_STATUSES:
+                    return
+        finally:
+            subscribers = self._subscribers.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(inbox)
+                if not subscribers:
+                    del self._subscribers[job_id]
+                    self._last.pop(job_id, None)
+
+    async def close(self):
+        self._subscribers.clear()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
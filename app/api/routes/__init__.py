@@ -0,0 +1,8 @@
+from aiohttp import web
+
+from app.api.routes import analyses, authors, jobs, reports
+
+
+def setup_routes(app: web.Application):
+    for module in (authors, analyses, reports, jobs):
+        app.router.add_routes(module.routes)
@@ -0,0 +1,179 @@
+"""Анализ коммитов разработчика, команды или организации: запуск, коммиты, аналитика"""
+
+from aiohttp import web
+
+from app.api.routes.helpers import (
+    QUEUE,
+    get_job,
+    json_error,
+    json_response,
+    parse_date,
+    read_json,
+    require,
+    run_blocking,
+    submitted,
+)
+from app.services.analysis_jobs import (
+    COMMIT_ANALYSIS,
+    ORG_ANALYSIS,
+    TEAM_ANALYSIS,
+    find_recent_analysis,
+    org_params,
+    request_review,
+    team_params,
+)
+from app.services.identity import author_from_identity
+
+routes = web.RouteTableDef()
+
+
+async def get_analysis(request: web.Request):
+    """Анализ разработчика, команды или организации из пути запроса"""
+    job = await get_job(request)
+    if job["kind"] not in (COMMIT_ANALYSIS, TEAM_ANALYSIS, ORG_ANALYSIS):
+        raise json_error(web.HTTPNotFound, f"Анализ {job['id']} не найден")
+    return job
+
+
+async def get_commit(request: web.Request):
+    job = await get_analysis(request)
+    sha = request.match_info["sha"]
+    commits = await run_blocking(request, request.app[QUEUE].results, job["id"])
+    for commit in commits:
+        if commit["sha"] == sha:
+            return job, commit
+    raise json_error(web.HTTPNotFound, f"Коммит {sha} не найден в анализе {job['id']}")
+
+
+@routes.post("/api/analyses")
+async def submit_analysis(request: web.Request) -> web.Response:
+    """
+    `{"repo_name", "developer_username", "start_date", "end_date", "use_llm",
+    "author", "force"}` — задача анализа. Готовый анализ с теми же параметрами
+    возвращается сразу (200), если не задан `force`.
+    """
+    body = await read_json(request)
+    require(body, "repo_name", "developer_username")
+    start_date, end_date = parse_date(body, "start_date"), parse_date(body, "end_date")
+    if start_date > end_date:
+        raise json_error(web.HTTPBadRequest, "start_date позже end_date")
+    selection = {
+        "repo_name": body["repo_name"],
+        "developer_username": body["developer_username"],
+        "start_date": start_date,
+        "end_date": end_date,
+        "use_llm": bool(body.get("use_llm", True)),
+    }
+    queue = request.app[QUEUE]
+    if not body.get("force"):
+        job = await run_blocking(request, find_recent_analysis, queue, selection)
+        if job is not None:
+            return submitted(job, reused=True)
+    author = body.get("author") or author_from_identity(body["developer_username"])
+    job_id = await run_blocking(
+        request, queue.submit, COMMIT_ANALYSIS, {**selection, "author": author}
+    )
+    return submitted(await run_blocking(request, queue.get, job_id))
+
+
+@routes.post("/api/teams")
+async def submit_team_analysis(request: web.Request) -> web.Response:
+    """
+    `{"repo_name", "members", "start_date", "end_date", "use_llm", "force"}` —
+    анализ команды одним списком коммитов. `members` — авторы в формате
+    `/api/authors` (или логины GitHub / email); пустой список — все авторы.
+    """
+    body = await read_json(request)
+    require(body, "repo_name")
+    start_date, end_date = parse_date(body, "start_date"), parse_date(body, "end_date")
+    if start_date > end_date:
+        raise json_error(web.HTTPBadRequest, "start_date позже end_date")
+    members = [
+        member if isinstance(member, dict) else author_from_identity(str(member))
+        for member in body.get("members") or []
+    ]
+    use_llm = bool(body.get("use_llm", True))
+    params = team_params(body["repo_name"], members, start_date, end_date, use_llm)
+    queue = request.app[QUEUE]
+    if not body.get("force"):
+        job = await run_blocking(
+            request, find_recent_analysis, queue, params, kind=TEAM_ANALYSIS
+        )
+        if job is not None:
+            return submitted(job, reused=True)
+    job_id = await run_blocking(request, queue.submit, TEAM_ANALYSIS, params)
+    return submitted(await run_blocking(request, queue.get, job_id))
+
+
+@routes.post("/api/orgs")
+async def submit_org_analysis(request: web.Request) -> web.Response:
+    """
+    `{"org", "repos", "members", "start_date", "end_date", "use_llm", "force"}` —
+    анализ всех репозиториев организации и/или списка `repos` с объединением
+    авторов по email и логину. `members` — логины GitHub или email; пусто — все.
+    """
+    body = await read_json(request)
+    if not body.get("org") and not body.get("repos"):
+        raise json_error(
+            web.HTTPBadRequest, "Не заданы обязательные поля: org или repos"
+        )
+    start_date, end_date = parse_date(body, "start_date"), parse_date(body, "end_date")
+    if start_date > end_date:
+        raise json_error(web.HTTPBadRequest, "start_date позже end_date")
+    params = org_params(
+        body.get("org"),
+        [str(repo) for repo in body.get("repos") or []],
+        [str(member) for member in body.get("members") or []],
+        start_date,
+        end_date,
+        bool(body.get("use_llm", True)),
+    )
+    queue = request.app[QUEUE]
+    if not body.get("force"):
+        job = await run_blocking(
+            request, find_recent_analysis, queue, params, kind=ORG_ANALYSIS
+        )
+        if job is not None:
+            return submitted(job, reused=True)
+    job_id = await run_blocking(request, queue.submit, ORG_ANALYSIS, params)
+    return submitted(await run_blocking(request, queue.get, job_id))
+
+
+@routes.get("/api/analyses/{job_id}/commits/{sha}")
+async def commit_details(request: web.Request) -> web.Response:
+    """Коммит с файлами и LLM-ревью; патчи — только с `?patches=1`"""
+    _, commit = await get_commit(request)
+    data = commit.to_dict()
+    if request.query.get("patches") in ("1", "true"):
+        data["files"] = await run_blocking(
+            request, lambda: [dict(file) for file in commit["files"]]
+        )
+    return json_response(data)
+
+
+@routes.post("/api/analyses/{job_id}/commits/{sha}/review")
+async def prioritize_review(request: web.Request) -> web.Response:
+    """Ставит ревью коммита первым в очередь анализа"""
+    job, commit = await get_commit(request)
+    if commit.get("llm_summary"):
+        return json_response({"sha": commit["sha"], "reviewed": True})
+    await run_blocking(
+        request, request_review, request.app[QUEUE], job["id"], commit["sha"]
+    )
+    return json_response({"sha": commit["sha"], "reviewed": False}, status=202)
+
+
+@routes.get("/api/analyses/{job_id}/analytics")
+async def analytics(request: web.Request) -> web.Response:
+    """Агрегаты дашборда по загруженным коммитам (`?top=N` — размер топов)"""
+    # pandas загружается при первом запросе аналитики, а не при старте сервера
+    from app.services.commit_analytics import commit_analytics
+
+    job = await get_analysis(request)
+    try:
+        top = int(request.query.get("top", 15))
+    except ValueError:
+        raise json_error(web.HTTPBadRequest, "top: ожидается целое число")
+    commits = await run_blocking(request, request.app[QUEUE].results, job["id"])
+    data = await run_blocking(request, commit_analytics, commits, top)
+    return json_response({"status": job["status"], **data})
@@ -0,0 +1,33 @@
+"""Список авторов репозитория"""
+
+from aiohttp import web
+
+from app.api.routes.helpers import QUEUE, read_json, require, run_blocking, submitted
+from app.services.analysis_jobs import ANALYSIS_REUSE_HOURS, AUTHOR_LIST
+
+routes = web.RouteTableDef()
+
+
+@routes.post("/api/authors")
+async def submit_authors(request: web.Request) -> web.Response:
+    """
+    `{"repo_name": "owner/repo", "force": false}` — задача загрузки авторов;
+    недавний непустой список возвращается сразу (200), если не задан `force`
+    (пустой — скорее всего, репозиторий был недоступен — загружается заново).
+    """
+    body = await read_json(request)
+    require(body, "repo_name")
+    queue = request.app[QUEUE]
+    params = {"repo_name": body["repo_name"]}
+    if not body.get("force"):
+        job = await run_blocking(
+            request,
+            queue.find_latest,
+            AUTHOR_LIST,
+            params,
+            max_age=ANALYSIS_REUSE_HOURS * 3600,
+        )
+        if job is not None and job["result"]:
+            return submitted(job, reused=True)
+    job_id = await run_blocking(request, queue.submit, AUTHOR_LIST, params)
+    return submitted(await run_blocking(request, queue.get, job_id))
@@ -0,0 +1,121 @@
+"""
+Общее для обработчиков API: ключи приложения, вызов блокирующего кода в пуле
+потоков, JSON-ответы и ошибки, представление задач.
+"""
+
+import asyncio
+import functools
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Optional
+
+from aiohttp import web
+
+from app.api.progress import ProgressHub
+from app.services.git_service import GitService
+from app.services.job_queue import JobQueue
+
+QUEUE = web.AppKey("queue", JobQueue)
+GIT_SERVICE = web.AppKey("git_service", GitService)
+EXECUTOR = web.AppKey("executor", ThreadPoolExecutor)
+PROGRESS = web.AppKey("progress", ProgressHub)
+
+# Поля задачи в ответах API (результат отдаётся отдельным запросом)
+JOB_FIELDS = (
+    "id",
+    "kind",
+    "status",
+    "params",
+    "progress_done",
+    "progress_total",
+    "reviews_done",
+    "reviews_pending",
+    "error",
+    "created_at",
+    "updated_at",
+)
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Не удаётся сериализовать {type(value).__name__}")
+
+
+dumps = functools.partial(json.dumps, default=_json_default, ensure_ascii=False)
+
+
+def json_response(data: Any, status: int = 200) -> web.Response:
+    return web.json_response(data, status=status, dumps=dumps)
+
+
+def json_error(exception_class, message: str) -> web.HTTPException:
+    """HTTP-ошибка с телом `{"error": ...}` — для `raise`"""
+    return exception_class(
+        text=dumps({"error": message}), content_type="application/json"
+    )
+
+
+async def run_blocking(request: web.Request, function: Callable, *args, **kwargs):
+    """
+    Выполняет блокирующий вызов (SQLite, pandas, PyGithub) в пуле потоков,
+    не занимая цикл событий.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        request.app[EXECUTOR], functools.partial(function, *args, **kwargs)
+    )
+
+
+async def read_json(request: web.Request) -> Dict[str, Any]:
+    try:
+        body = await request.json()
+    except ValueError:
+        raise json_error(web.HTTPBadRequest, "Тело запроса должно быть JSON")
+    if not isinstance(body, dict):
+        raise json_error(web.HTTPBadRequest, "Ожидается JSON-объект")
+    return body
+
+
+def require(body: Dict[str, Any], *keys: str):
+    missing = [key for key in keys if not body.get(key)]
+    if missing:
+        raise json_error(
+            web.HTTPBadRequest, f"Не заданы обязательные поля: {', '.join(missing)}"
+        )
+
+
+def parse_date(body: Dict[str, Any], key: str) -> date:
+    try:
+        return date.fromisoformat(str(body[key]))
+    except (KeyError, ValueError):
+        raise json_error(web.HTTPBadRequest, f"{key}: ожидается дата YYYY-MM-DD")
+
+
+def job_state(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Задача без результата — для ответов о статусе и событий прогресса"""
+    return {field: job.get(field) for field in JOB_FIELDS}
+
+
+async def get_job(request: web.Request, kind: Optional[str] = None) -> Dict[str, Any]:
+    """Задача из пути запроса (`{job_id}`); 404, если её нет или тип другой"""
+    job_id = request.match_info["job_id"]
+    job = await run_blocking(request, request.app[QUEUE].get, job_id)
+    if job is None or (kind is not None and job["kind"] != kind):
+        raise json_error(web.HTTPNotFound, f"Задача {job_id} не найдена")
+    return job
+
+
+def job_links(job_id: str) -> Dict[str, str]:
+    return {
+        "self": f"/api/jobs/{job_id}",
+        "events": f"/api/jobs/{job_id}/events",
+        "result": f"/api/jobs/{job_id}/result",
+    }
+
+
+def submitted(job: Dict[str, Any], reused: bool = False) -> web.Response:
+    """Ответ на создание задачи: 202, или 200 для готового переиспользованного"""
+    body = {**job_state(job), "reused": reused, "links": job_links(job["id"])}
+    return json_response(body, status=200 if reused else 202)
@@ -0,0 +1,111 @@
+"""Статус, отмена, поток прогресса (SSE) и результат любой задачи"""
+
+from aiohttp import web
+
+from app.api.routes.helpers import (
+    PROGRESS,
+    QUEUE,
+    dumps,
+    get_job,
+    job_links,
+    job_state,
+    json_error,
+    json_response,
+    run_blocking,
+)
+from app.services.analysis_jobs import (
+    AUTHOR_LIST,
+    COMMIT_ANALYSIS,
+    ORG_ANALYSIS,
+    TEAM_ANALYSIS,
+)
+from app.services.job_queue import ACTIVE_STATUSES, DONE
+
+routes = web.RouteTableDef()
+
+
+def commit_summary(commit) -> dict:
+    """Коммит в списке результатов: без файлов и текста ревью"""
+    return {
+        "sha": commit["sha"],
+        "message": commit.get("message"),
+        "author": commit.get("author"),
+        "author_email": commit.get("author_email"),
+        "date": commit.get("date"),
+        "url": commit.get("url"),
+        "stats": commit["stats"],
+        "files": len(commit.get("files") or []),
+        "llm_pending": bool(commit.get("llm_pending")),
+        "reviewed": bool(commit.get("llm_summary")),
+        "member": commit.get("member"),
+        "repo": commit.get("repo"),
+    }
+
+
+@routes.get("/api/jobs/{job_id}")
+async def get_status(request: web.Request) -> web.Response:
+    job = await get_job(request)
+    return json_response({**job_state(job), "links": job_links(job["id"])})
+
+
+@routes.delete("/api/jobs/{job_id}")
+async def cancel(request: web.Request) -> web.Response:
+    job = await get_job(request)
+    await run_blocking(request, request.app[QUEUE].cancel, job["id"])
+    return json_response(job_state(await get_job(request)))
+
+
+@routes.get("/api/jobs/{job_id}/events")
+async def events(request: web.Request) -> web.StreamResponse:
+    """
+    Server-Sent Events: `progress` при каждом изменении состояния задачи
+    и `end` после завершения; комментарий-пульс, пока изменений нет.
+    """
+    job = await get_job(request)
+    response = web.StreamResponse(
+        headers={
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        }
+    )
+    await response.prepare(request)
+    states = request.app[PROGRESS].watch(job["id"])
+    try:
+        async for state in states:
+            if state is None:
+                await response.write(b": ping\n\n")
+                continue
+            event = "progress" if state["status"] in ACTIVE_STATUSES else "end"
+            await response.write(f"event: {event}\ndata: {dumps(state)}\n\n".encode())
+    except ConnectionResetError:
+        pass
+    finally:
+        await states.aclose()
+    return response
+
+
+@routes.get("/api/jobs/{job_id}/result")
+async def result(request: web.Request) -> web.Response:
+    """
+    Результат задачи: авторы, список коммитов анализа (доступен по мере
+    загрузки, ревью догружаются) или отчёт. Для анализа организации — также
+    репозитории и объединённые разработчики.
+    """
+    job = await get_job(request)
+    if job["kind"] in (COMMIT_ANALYSIS, TEAM_ANALYSIS, ORG_ANALYSIS):
+        commits = await run_blocking(request, request.app[QUEUE].results, job["id"])
+        return json_response(
+            {
+                "status": job["status"],
+                **(job["result"] or {}),
+                "commits": [commit_summary(commit) for commit in commits],
+            }
+        )
+    if job["status"] != DONE:
+        raise json_error(
+            web.HTTPConflict, f"Задача {job['id']} ещё не завершена: {job['status']}"
+        )
+    if job["kind"] == AUTHOR_LIST:
+        return json_response({"status": job["status"], "authors": job["result"]})
+    return json_response({"status": job["status"], **(job["result"] or {})})
@@ -0,0 +1,70 @@
+"""Итоговый отчёт по завершённому анализу: markdown и PDF"""
+
+from aiohttp import web
+
+from app.api.routes.helpers import (
+    QUEUE,
+    get_job,
+    json_error,
+    read_json,
+    require,
+    run_blocking,
+    submitted,
+)
+from app.services.analysis_jobs import (
+    COMMIT_ANALYSIS,
+    ORG_ANALYSIS,
+    QUALITY_REPORT,
+    TEAM_ANALYSIS,
+)
+from app.services.job_queue import DONE
+
+routes = web.RouteTableDef()
+
+
+@routes.post("/api/reports")
+async def submit_report(request: web.Request) -> web.Response:
+    """
+    `{"analysis_job": "<id>", "member": ...}` — задача отчёта; анализ должен быть
+    завершён. Для командного анализа и анализа организации `member` — участник
+    (id разработчика из результата анализа), по которому строится отчёт.
+    """
+    body = await read_json(request)
+    require(body, "analysis_job")
+    queue = request.app[QUEUE]
+    analysis = await run_blocking(request, queue.get, body["analysis_job"])
+    kinds = (COMMIT_ANALYSIS, TEAM_ANALYSIS, ORG_ANALYSIS)
+    if analysis is None or analysis["kind"] not in kinds:
+        raise json_error(web.HTTPNotFound, f"Анализ {body['analysis_job']} не найден")
+    if analysis["status"] != DONE:
+        raise json_error(
+            web.HTTPConflict,
+            f"Анализ {analysis['id']} ещё не завершён: {analysis['status']}",
+        )
+    params = {"analysis_job": analysis["id"]}
+    if analysis["kind"] != COMMIT_ANALYSIS and body.get("member"):
+        params["member"] = body["member"]
+    job_id = await run_blocking(request, queue.submit, QUALITY_REPORT, params)
+    return submitted(await run_blocking(request, queue.get, job_id))
+
+
+@routes.get("/api/reports/{job_id}/pdf")
+async def report_pdf(request: web.Request) -> web.Response:
+    from app.services.full_quality_report import render_pdf
+
+    job = await get_job(request, QUALITY_REPORT)
+    if job["status"] != DONE:
+        raise json_error(
+            web.HTTPConflict, f"Отчёт {job['id']} ещё не готов: {job['status']}"
+        )
+    try:
+        pdf = await run_blocking(request, render_pdf, job["result"]["markdown"])
+    except Exception as e:
+        raise json_error(web.HTTPInternalServerError, f"Не удалось создать PDF: {e}")
+    return web.Response(
+        body=pdf,
+        content_type="application/pdf",
+        headers={
+            "Content-Disposition": f'attachment; filename="report_{job["id"]}.pdf"'
+        },
+    )
@@ -0,0 +1,141 @@
+"""
+HTTP API для внутренних порталов: авторы репозитория, анализ коммитов с ревью,
+аналитика и итоговые отчёты — как задачи (создать, узнать статус, получить
+результат) с потоком прогресса по SSE.
+
+    python -m app.api --port 8600 --workers 4
+
+Запросы обслуживает один цикл событий: задачи выполняют рабочие потоки очереди
+(`JobQueue`, та же база, что у интерфейса и CLI), короткие блокирующие вызовы
+(SQLite, pandas, PDF) — пул потоков `API_IO_THREADS`. Клиенты, ожидающие
+GitHub и LLM, не занимают потоков: прогресс всех задач опрашивает один
+`ProgressHub`.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from aiohttp import web
+from dotenv import load_dotenv
+
+from app.api.progress import ProgressHub
+from app.api.routes import setup_routes
+from app.api.routes.helpers import (
+    EXECUTOR,
+    GIT_SERVICE,
+    PROGRESS,
+    QUEUE,
+    job_state,
+    json_response,
+)
+from app.services.analysis_jobs import create_job_queue
+from app.services.git_service import GitService
+from app.services.job_queue import JobQueue
+from app.utils.metrics import CONTENT_TYPE, get_registry
+from app.utils.tracing import span
+
+load_dotenv()
+
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "8600"))
+# Рабочие потоки очереди: одновременно выполняемые задачи (GitHub, LLM)
+API_JOB_WORKERS = int(os.getenv("API_JOB_WORKERS", "4"))
+# Потоки для коротких блокирующих вызовов из обработчиков запросов
+API_IO_THREADS = int(os.getenv("API_IO_THREADS", "16"))
+
+_metrics = get_registry()
+API_REQUESTS = _metrics.counter(
+    "api_requests_total", "Запросы к HTTP API", ("route", "status")
+)
+API_LATENCY = _metrics.histogram(
+    "api_request_duration_seconds",
+    "Время ответа HTTP API (без потоков SSE)",
+    ("route",),
+)
+
+
+@web.middleware
+async def observe_requests(request: web.Request, handler):
+    """Счётчик запросов по маршруту и статусу, время ответа и span трассировки"""
+    resource = request.match_info.route.resource
+    route = resource.canonical if resource is not None else "unmatched"
+    started = time.perf_counter()
+    status = 500
+    try:
+        with span("api.request", method=request.method, route=route) as current:
+            try:
+                response = await handler(request)
+            except web.HTTPException as e:
+                status = e.status
+                raise
+            status = response.status
+            current.set_attribute("status", status)
+            return response
+    finally:
+        API_REQUESTS.inc(route=route, status=str(status))
+        if not route.endswith("/events"):
+            API_LATENCY.observe(time.perf_counter() - started, route=route)
+
+
+async def health(request: web.Request) -> web.Response:
+    return json_response({"status": "ok"})
+
+
+async def metrics(request: web.Request) -> web.Response:
+    return web.Response(
+        body=get_registry().render().encode("utf-8"),
+        headers={"Content-Type": CONTENT_TYPE},
+    )
+
+
+def create_app(
+    git_service: Optional[GitService] = None,
+    queue: Optional[JobQueue] = None,
+    job_workers: int = API_JOB_WORKERS,
+    io_threads: int = API_IO_THREADS,
+) -> web.Application:
+    """
+    Приложение aiohttp. Очередь с рабочими потоками и пул потоков создаются
+    при запуске и останавливаются при завершении; `queue` можно передать
+    готовой (её рабочие потоки тогда не запускаются).
+    """
+    app = web.Application(middlewares=[observe_requests])
+    app.router.add_get("/api/health", health)
+    app.router.add_get("/metrics", metrics)
+    setup_routes(app)
+
+    async def start(app: web.Application):
+        app[EXECUTOR] = ThreadPoolExecutor(
+            max_workers=io_threads, thread_name_prefix="api-io"
+        )
+        app[GIT_SERVICE] = git_service or GitService()
+        app[QUEUE] = queue or create_job_queue(app[GIT_SERVICE], job_workers)
+        app[PROGRESS] = ProgressHub(app[QUEUE], app[EXECUTOR], job_state)
+
+    async def stop(app: web.Application):
+        await app[PROGRESS].close()
+        app[EXECUTOR].shutdown(wait=False, cancel_futures=True)
+
+    app.on_startup.append(start)
+    app.on_cleanup.append(stop)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument(
+        "--workers", type=int, default=API_JOB_WORKERS, help="Рабочие потоки очереди"
+    )
+    args = parser.parse_args()
+    web.run_app(create_app(job_workers=args.workers), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+"""
+Пакетный анализ без интерфейса: загрузка коммитов, LLM-ревью и итоговый отчёт
+по набору репозиториев, авторов и периодов — например, ночью по расписанию.
+
+    python -m app.cli --repo owner/repo --author alice --author bob
+    python -m app.cli --repo owner/a --repo owner/b --period 2024-01-01:2024-03-31 \\
+        --parallel 4 --format md pdf json --output reports
+    python -m app.cli --org acme --repo partner/sdk --author alice@corp.com
+
+С `--org` (или `--combined`) коммиты всех репозиториев организации и `--repo`
+загружаются одним анализом, авторы объединяются по email и логину GitHub,
+и отчёт строится по каждому разработчику сразу по всем его репозиториям.
+
+Анализы выполняются через ту же очередь задач (`JOBS_DB_PATH`) и хранилище патчей,
+что и интерфейс: кнопка Analyze с теми же параметрами открывает готовый результат
+сразу (см. `ANALYSIS_REUSE_HOURS`), а снимки появляются в списке Snapshots.
+Код выхода 1, если хотя бы один анализ или файл отчёта получить не удалось.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+from dotenv import load_dotenv
+
+from app.services.analysis_jobs import (
+    ANALYSIS_REUSE_HOURS,
+    COMMIT_ANALYSIS,
+    ORG_ANALYSIS,
+    create_job_queue,
+    find_recent_analysis,
+    org_params,
+)
+from app.services.full_quality_report import generate_full_quality_report, render_pdf
+from app.services.git_service import GitService
+from app.services.identity import author_from_identity
+from app.services.job_queue import DONE, JobQueue
+from app.services.snapshot_service import SNAPSHOTS_DIR, export_snapshot, snapshot_name
+from app.services.team_service import partition_by_member
+from app.utils.cancellation import CancellationToken
+from app.utils.metrics import METRICS_FILE, start_exporters, write_metrics
+
+load_dotenv()
+
+FORMATS = ("md", "pdf", "json")
+# Период по умолчанию — как в интерфейсе: последние 30 дней
+DEFAULT_PERIOD_DAYS = 30
+
+
+def parse_period(value: str):
+    """`2024-01-01:2024-01-31` → (date, date)"""
+    start, sep, end = value.partition(":")
+    try:
+        start_date, end_date = date.fromisoformat(start), date.fromisoformat(end)
+    except ValueError:
+        sep = ""
+    if not sep or start_date > end_date:
+        raise argparse.ArgumentTypeError(
+            f"ожидается период НАЧАЛО:КОНЕЦ в формате ISO, получено {value!r}"
+        )
+    return start_date, end_date
+
+
+def plan_tasks(git_service: GitService, args) -> List[Dict[str, Any]]:
+    """Все сочетания репозиторий × автор × период"""
+    tasks = []
+    for repo_name in args.repo:
+        if args.author:
+            authors = [author_from_identity(value) for value in args.author]
+        else:
+            authors = git_service.get_all_commit_authors(repo_name)
+            if not authors:
+                print(f"⚠️ {repo_name}: авторы не найдены или репозиторий недоступен")
+        for author in authors:
+            for start_date, end_date in args.period:
+                tasks.append(
+                    {
+                        "repo_name": repo_name,
+                        # Как в интерфейсе: логин GitHub, если известен, иначе email
+                        "developer_username": author.get("github_login")
+                        or author.get("email"),
+                        "start_date": start_date,
+                        "end_date": end_date,
+                        "use_llm": not args.no_llm,
+                        "author": author,
+                    }
+                )
+    return tasks
+
+
+def plan_org_tasks(args) -> List[Dict[str, Any]]:
+    """Анализ организации (и/или списка репозиториев) на каждый период"""
+    return [
+        org_params(
+            args.org,
+            args.repo or [],
+            args.author or [],
+            start_date,
+            end_date,
+            use_llm=not args.no_llm,
+        )
+        for start_date, end_date in args.period
+    ]
+
+
+def write_outputs(task, job, commits, report, args) -> Dict[str, Any]:
+    """Файлы отчёта и снимок; ошибки собираются, а не прерывают остальные файлы"""
+    metadata = {
+        "repo_name": task["repo_name"],
+        "developer": task["developer_username"],
+        "start_date": task["start_date"].isoformat(),
+        "end_date": task["end_date"].isoformat(),
+        "author": task["author"],
+    }
+    name = snapshot_name(metadata)
+    base = os.path.join(args.output, name)
+    written, errors = [], []
+
+    if report is not None and "md" in args.format:
+        with open(base + ".md", "w", encoding="utf-8") as f:
+            f.write(report)
+        written.append(base + ".md")
+    if report is not None and "pdf" in args.format:
+        try:
+            pdf = render_pdf(report)
+        except Exception as e:
+            errors.append(f"pdf: {e}")
+        else:
+            with open(base + ".pdf", "wb") as f:
+                f.write(pdf)
+            written.append(base + ".pdf")
+    if "json" in args.format:
+        payload = {
+            "metadata": {**metadata, "job_id": job["id"], "use_llm": task["use_llm"]},
+            "report": report,
+            # Тексты патчей, а не ключи локального хранилища: файл самодостаточен
+            "commits": [
+                {**commit.to_dict(), "files": [dict(file) for file in commit["files"]]}
+                for commit in commits
+            ],
+        }
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2, default=str)
+        written.append(base + ".json")
+    if not args.no_snapshot and commits:
+        written.append(
+            export_snapshot(commits, os.path.join(SNAPSHOTS_DIR, name), metadata)
+        )
+    return {"files": written, "errors": errors}
+
+
+def run_task(
+    queue: JobQueue, task: Dict[str, Any], args, cancel_token: CancellationToken
+) -> Dict[str, Any]:
+    """Анализ одного сочетания: готовый результат или новая задача, затем отчёт"""
+    label = f"{task['repo_name']} · {task['developer_username']} · " + (
+        f"{task['start_date']}..{task['end_date']}"
+    )
+    started = time.perf_counter()
+    max_age = 0 if args.force else args.max_age_hours
+    job = find_recent_analysis(queue, task, max_age)
+    reused = job is not None
+    if job is None:
+        print(f"▶️ {label}: анализ")
+        job = queue.run(COMMIT_ANALYSIS, task, cancel_token)
+    else:
+        print(f"♻️ {label}: готовый анализ {job['id']}")
+
+    result = {"task": label, "job_id": job["id"], "reused": reused, "commits": 0}
+    if job["status"] != DONE:
+        result.update(status=job["status"], files=[], errors=[job["error"] or ""])
+    else:
+        commits = queue.results(job["id"])
+        report = None
+        if commits and not args.no_report and {"md", "pdf"} & set(args.format):
+            cancel_token.raise_if_cancelled()
+            report = generate_full_quality_report(commits)
+        result.update(status=DONE, commits=len(commits))
+        result.update(write_outputs(task, job, commits, report, args))
+    result["seconds"] = round(time.perf_counter() - started, 1)
+    return result
+
+
+def run_org_task(
+    queue: JobQueue, params: Dict[str, Any], args, cancel_token: CancellationToken
+) -> List[Dict[str, Any]]:
+    """
+    Анализ организации за период (готовый или новый), затем отчёт по каждому
+    разработчику — по его коммитам во всех репозиториях.
+    """
+    scope = params["org"] or "+".join(params["repos"])
+    period = f"{params['start_date']}..{params['end_date']}"
+    label = f"{scope} · {period}"
+    started = time.perf_counter()
+    max_age = 0 if args.force else args.max_age_hours
+    job = find_recent_analysis(queue, params, max_age, kind=ORG_ANALYSIS)
+    reused = job is not None
+    if job is None:
+        print(f"▶️ {label}: анализ организации")
+        job = queue.run(ORG_ANALYSIS, params, cancel_token)
+    else:
+        print(f"♻️ {label}: готовый анализ {job['id']}")
+    if job["status"] != DONE:
+        return [
+            {
+                "task": label,
+                "job_id": job["id"],
+                "reused": reused,
+                "status": job["status"],
+                "files": [],
+                "errors": [job["error"] or ""],
+                "seconds": round(time.perf_counter() - started, 1),
+            }
+        ]
+
+    developers = {
+        developer["id"]: developer for developer in job["result"]["developers"]
+    }
+    for repo_name in job["result"]["failed_repos"]:
+        print(f"⚠️ {label}: репозиторий {repo_name} пропущен")
+
+    def report_developer(member, commits):
+        member_started = time.perf_counter()
+        task = {
+            "repo_name": scope,
+            "developer_username": member,
+            "start_date": params["start_date"],
+            "end_date": params["end_date"],
+            "use_llm": params["use_llm"],
+            "author": developers.get(member) or author_from_identity(member),
+        }
+        report = None
+        if not args.no_report and {"md", "pdf"} & set(args.format):
+            cancel_token.raise_if_cancelled()
+            report = generate_full_quality_report(commits)
+        result = {
+            "task": f"{scope} · {member} · {period}",
+            "job_id": job["id"],
+            "reused": reused,
+            "status": DONE,
+            "commits": len(commits),
+        }
+        result.update(write_outputs(task, job, commits, report, args))
+        result["seconds"] = round(time.perf_counter() - member_started, 1)
+        return result
+
+    by_member = partition_by_member(queue.results(job["id"]))
+    print(f"{label}: разработчиков {len(by_member)}, отчёты по каждому")
+    with ThreadPoolExecutor(max_workers=max(1, args.parallel)) as pool:
+        futures = [
+            pool.submit(report_developer, member, commits)
+            for member, commits in by_member.items()
+        ]
+        return [future.result() for future in futures]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--repo", action="append", help="owner/repo (можно несколько)")
+    parser.add_argument(
+        "--org",
+        help="Организация GitHub: один анализ по всем её репозиториям (и --repo) "
+        "с объединением авторов",
+    )
+    parser.add_argument(
+        "--combined",
+        action="store_true",
+        help="Один анализ по всем --repo с объединением авторов (как --org)",
+    )
+    parser.add_argument(
+        "--author",
+        action="append",
+        help="Логин GitHub или email (можно несколько; по умолчанию — все авторы)",
+    )
+    parser.add_argument(
+        "--period",
+        action="append",
+        type=parse_period,
+        help="НАЧАЛО:КОНЕЦ, например 2024-01-01:2024-01-31 (можно несколько; "
+        f"по умолчанию — последние {DEFAULT_PERIOD_DAYS} дней)",
+    )
+    parser.add_argument("--parallel", type=int, default=2, help="Параллельные анализы")
+    parser.add_argument("--format", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--output", default="reports", help="Каталог отчётов")
+    parser.add_argument("--no-llm", action="store_true", help="Без LLM-ревью")
+    parser.add_argument("--no-report", action="store_true", help="Без итогового отчёта")
+    parser.add_argument(
+        "--no-snapshot", action="store_true", help="Не сохранять снимки для интерфейса"
+    )
+    parser.add_argument(
+        "--max-age-hours",
+        type=float,
+        default=ANALYSIS_REUSE_HOURS,
+        help="Возраст готового анализа, который можно переиспользовать",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Не переиспользовать готовые анализы"
+    )
+    args = parser.parse_args()
+    if not args.repo and not args.org:
+        parser.error("нужен --repo или --org")
+    if not args.period:
+        today = date.today()
+        args.period = [(today - timedelta(days=DEFAULT_PERIOD_DAYS), today)]
+    os.makedirs(args.output, exist_ok=True)
+
+    start_exporters()
+    git_service = GitService()
+    # Без рабочих потоков: задачи выполняются здесь, а не забираются из очереди
+    queue = create_job_queue(git_service, workers=0)
+    org_mode = bool(args.org or args.combined)
+    if org_mode:
+        tasks = plan_org_tasks(args)
+        run = run_org_task
+    else:
+        tasks = plan_tasks(git_service, args)
+        run = run_task
+    print(f"Анализов: {len(tasks)}, параллельно: {args.parallel}")
+
+    cancel_token = CancellationToken()
+    results = []
+    finished = 0
+    pool = ThreadPoolExecutor(max_workers=max(1, args.parallel))
+    futures = [pool.submit(run, queue, task, args, cancel_token) for task in tasks]
+    try:
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"task": "?", "status": "failed", "errors": [str(e)]}
+            # Анализ организации даёт по результату на каждого разработчика
+            results.extend(result if isinstance(result, list) else [result])
+            finished += 1
+    except KeyboardInterrupt:
+        print("Отмена: останавливаем анализы...")
+        cancel_token.cancel()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        if METRICS_FILE:
+            write_metrics(METRICS_FILE)
+
+    print(f"\n{'task':<60} {'status':<14} {'commits':>8} {'time, s':>8}")
+    for result in results:
+        reused = " (cached)" if result.get("reused") else ""
+        print(
+            f"{result['task']:<60} {result['status'] + reused:<14} "
+            f"{result.get('commits', 0):>8} {result.get('seconds', 0):>8}"
+        )
+        for path in result.get("files", []):
+            print(f"    {path}")
+        for error in result.get("errors", []):
+            print(f"    ❌ {error.strip().splitlines()[-1] if error.strip() else ''}")
+
+    failed = len(tasks) - finished + sum(
+        1 for result in results if result["status"] != DONE or result["errors"]
+    )
+    if failed:
+        print(f"\nС ошибками: {failed} из {len(tasks) - finished + len(results)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+import hashlib
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Dict, Iterable, Optional
+
+from app.utils.metrics import CACHE_BYTES, CACHE_REQUESTS
+
+# Каталог общего хранилища патчей (один на процесс, переживает перезапуски)
+PATCHES_DIR = os.getenv("PATCHES_DIR", os.path.join("data", "patches"))
+
+# Сколько распакованных патчей держать в памяти для повторных обращений
+PATCH_CACHE_MAX_BYTES = int(os.getenv("PATCH_CACHE_MAX_MB", "16")) * 2**20
+
+
+class PatchStore:
+    """
+    Дисковое хранилище патчей, адресуемое по содержимому: ключ — SHA-256
+    текста патча, файл сжат zlib. Одинаковые патчи (например, в разных задачах
+    анализа одного репозитория) хранятся один раз. Недавно прочитанные патчи
+    кэшируются в памяти в пределах `max_cache_bytes`.
+    """
+
+    def __init__(
+        self, root: str = PATCHES_DIR, max_cache_bytes: int = PATCH_CACHE_MAX_BYTES
+    ):
+        self.root = root
+        self.max_cache_bytes = max_cache_bytes
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_size = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key[2:])
+
+    def put(self, patch: str) -> str:
+        """Сохраняет патч и возвращает его ключ"""
+        data = patch.encode("utf-8")
+        key = hashlib.sha256(data).hexdigest()
+        path = self._path(key)
+        try:
+            # Патч уже есть: свежее время изменения защищает его от `sweep`,
+            # пока ссылающийся на него коммит ещё не сохранён
+            os.utime(path)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Запись через временный файл: параллельные записи одного ключа безопасны
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(zlib.compress(data))
+            os.replace(tmp_path, path)
+        return key
+
+    def get(self, key: str) -> str:
+        """Текст патча по ключу; KeyError, если патча нет в хранилище"""
+        with self._lock:
+            patch = self._cache.get(key)
+            if patch is not None:
+                self._cache.move_to_end(key)
+                CACHE_REQUESTS.inc(cache="patch", result="hit")
+                return patch
+        CACHE_REQUESTS.inc(cache="patch", result="miss")
+        try:
+            with open(self._path(key), "rb") as f:
+                patch = zlib.decompress(f.read()).decode("utf-8")
+        except FileNotFoundError:
+            raise KeyError(key) from None
+
+        with self._lock:
+            if key not in self._cache and len(patch) <= self.max_cache_bytes:
+                self._cache[key] = patch
+                self._cache_size += len(patch)
+                while self._cache_size > self.max_cache_bytes:
+                    _, evicted = self._cache.popitem(last=False)
+                    self._cache_size -= len(evicted)
+        return patch
+
+    def sweep(self, keep: Iterable[str], min_age: float = 3600) -> int:
+        """
+        Удаляет патчи, ключей которых нет в `keep`, и брошенные временные
+        файлы. Файлы моложе `min_age` секунд не трогаются: их могла только что
+        записать задача, коммит которой ещё не сохранён. Возвращает число
+        удалённых патчей.
+        """
+        keep = set(keep)
+        cutoff = time.time() - min_age
+        removed = 0
+        if not os.path.isdir(self.root):
+            return 0
+        for prefix in os.listdir(self.root):
+            directory = os.path.join(self.root, prefix)
+            if len(prefix) != 2 or not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                path = os.path.join(directory, name)
+                try:
+                    if os.path.getmtime(path) >= cutoff:
+                        continue
+                    if name.endswith(".tmp"):
+                        os.remove(path)
+                    elif prefix + name not in keep:
+                        os.remove(path)
+                        removed += 1
+                except FileNotFoundError:
+                    continue
+                with self._lock:
+                    patch = self._cache.pop(prefix + name, None)
+                    if patch is not None:
+                        self._cache_size -= len(patch)
+        return removed
+
+
+_patch_store: Optional[PatchStore] = None
+_patch_store_lock = threading.Lock()
+
+
+def get_patch_store() -> PatchStore:
+    """Общее для процесса хранилище патчей"""
+    global _patch_store
+    with _patch_store_lock:
+        if _patch_store is None:
+            _patch_store = PatchStore()
+            CACHE_BYTES.set_function(lambda: _patch_store._cache_size, cache="patch")
+        return _patch_store
+
+
+class FileChange(Mapping):
+    """
+    Изменённый файл коммита. Ведёт себя как словарь из `GitService.build_commit_data`
+    (filename, status, additions, deletions, changes, patch), но хранит вместо
+    текста патча только его ключ в `PatchStore` — патч читается при обращении.
+    """
+
+    __slots__ = (
+        "filename",
+        "status",
+        "additions",
+        "deletions",
+        "changes",
+        "patch_key",
+    )
+
+    _FIELDS = ("filename", "status", "additions", "deletions", "changes")
+
+    def __init__(
+        self,
+        filename,
+        status=None,
+        additions=0,
+        deletions=0,
+        changes=0,
+        patch_key=None,
+    ):
+        self.filename = filename
+        self.status = status
+        self.additions = additions
+        self.deletions = deletions
+        self.changes = changes
+        self.patch_key = patch_key
+
+    @classmethod
+    def from_dict(
+        cls, data: Mapping, store: Optional[PatchStore] = None
+    ) -> "FileChange":
+        """Создаёт запись из словаря файла; текст патча переносится в хранилище"""
+        if isinstance(data, FileChange):
+            return data
+        patch_key = data.get("patch_key")
+        if patch_key is None and data.get("patch"):
+            patch_key = (store or get_patch_store()).put(data["patch"])
+        return cls(
+            data.get("filename"),
+            data.get("status"),
+            data.get("additions") or 0,
+            data.get("deletions") or 0,
+            data.get("changes") or 0,
+            patch_key,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Словарь для сериализации: вместо патча — его ключ"""
+        data = {field: getattr(self, field) for field in self._FIELDS}
+        if self.patch_key is not None:
+            data["patch_key"] = self.patch_key
+        return data
+
+    def __getitem__(self, key):
+        if key == "patch":
+            if self.patch_key is None:
+                raise KeyError(key)
+            return get_patch_store().get(self.patch_key)
+        if key in self._FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        # Проверка наличия патча не должна читать его с диска
+        return key in self._FIELDS or (key == "patch" and self.patch_key is not None)
+
+    def __iter__(self):
+        yield from self._FIELDS
+        if self.patch_key is not None:
+            yield "patch"
+
+    def __len__(self):
+        return len(self._FIELDS) + (self.patch_key is not None)
+
+    def __repr__(self):
+        return f"FileChange({self.filename!r}, +{self.additions}/-{self.deletions})"
+
+
+class CommitRecord(MutableMapping):
+    """
+    Компактная запись коммита. Поддерживает интерфейс словаря коммита
+    (`commit["sha"]`, `commit.get("stats")`, `commit["llm_summary"] = ...`),
+    но хранит метаданные в слотах, а патчи файлов — в `PatchStore`.
+    Дополнительные поля (LLM-ревью и т.п.) хранятся в отдельном словаре.
+    """
+
+    __slots__ = (
+        "sha",
+        "message",
+        "author",
+        "author_email",
+        "date",
+        "url",
+        "additions",
+        "deletions",
+        "total",
+        "files",
+        "_extra",
+    )
+
+    _FIELDS = ("sha", "message", "author", "author_email", "date", "url")
+    _STATS = ("additions", "deletions", "total")
+
+    def __init__(
+        self,
+        sha,
+        message=None,
+        author=None,
+        author_email=None,
+        date=None,
+        url=None,
+        additions=0,
+        deletions=0,
+        total=0,
+        files=(),
+        extra=None,
+    ):
+        self.sha = sha
+        self.message = message
+        self.author = author
+        self.author_email = author_email
+        self.date = date
+        self.url = url
+        self.additions = additions
+        self.deletions = deletions
+        self.total = total
+        self.files = tuple(files)
+        self._extra = dict(extra) if extra else None
+
+    @classmethod
+    def from_dict(
+        cls, data: Mapping, store: Optional[PatchStore] = None
+    ) -> "CommitRecord":
+        """
+        Создаёт запись из словаря коммита (`build_commit_data` или сохранённого
+        JSON). Патчи файлов переносятся в хранилище.
+        """
+        if isinstance(data, CommitRecord):
+            return data
+        stats = data.get("stats") or {}
+        extra = {
+            key: value
+            for key, value in data.items()
+            if key not in cls._FIELDS and key not in ("stats", "files")
+        }
+        return cls(
+            *(data.get(field) for field in cls._FIELDS),
+            *(stats.get(stat) or 0 for stat in cls._STATS),
+            files=[
+                FileChange.from_dict(file, store) for file in data.get("files") or []
+            ],
+            extra=extra,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Словарь для сериализации (патчи представлены ключами `patch_key`)"""
+        data = {field: getattr(self, field) for field in self._FIELDS}
+        data["stats"] = self["stats"]
+        data["files"] = [file.to_dict() for file in self.files]
+        data.update(self._extra or {})
+        return data
+
+    def __getitem__(self, key):
+        if key in self._FIELDS:
+            return getattr(self, key)
+        if key == "stats":
+            return {stat: getattr(self, stat) for stat in self._STATS}
+        if key == "files":
+            return self.files
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        if key in self._FIELDS:
+            setattr(self, key, value)
+        elif key == "stats":
+            for stat in self._STATS:
+                setattr(self, stat, value.get(stat) or 0)
+        elif key == "files":
+            self.files = tuple(FileChange.from_dict(file) for file in value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._FIELDS or key in ("stats", "files") or self._extra is None:
+            raise KeyError(key)
+        del self._extra[key]
+
+    def __contains__(self, key):
+        return (
+            key in self._FIELDS
+            or key in ("stats", "files")
+            or (self._extra is not None and key in self._extra)
+        )
+
+    def __iter__(self):
+        yield from self._FIELDS
+        yield "stats"
+        yield "files"
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return len(self._FIELDS) + 2 + len(self._extra or ())
+
+    def __repr__(self):
+        return f"CommitRecord({self.sha!r}, files={len(self.files)})"
+
+
+def as_record(commit: Mapping, store: Optional[PatchStore] = None) -> CommitRecord:
+    """Приводит словарь коммита к `CommitRecord` (запись возвращается как есть)"""
+    return CommitRecord.from_dict(commit, store)
@@ -1,22 +1,188 @@
 import os
-import requests
+import threading
+import time
 from dotenv import load_dotenv
-import google.generativeai as genai
+from app.utils.cancellation import OperationCancelled, check_cancelled
 from app.utils.criteria_loader import load_review_criteria
+from app.utils.metrics import get_registry
+from app.utils.rate_limiter import (
+    estimate_tokens,
+    get_rate_limiter,
+    rate_limited,
+)
+from app.utils.tracing import span, traced
 
 load_dotenv()
 
 YANDEX_API_KEY = os.getenv("YANDEX_GPT_API_KEY")
 YANDEX_FOLDER_ID = os.getenv("YANDEX_FOLDER_ID")
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+# Адреса API можно переопределить, например на локальные двойники из app/stand_ins
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+YANDEX_LLM_BASE_URL = os.getenv(
+    "YANDEX_LLM_BASE_URL", "https://llm.api.cloud.yandex.net/foundationModels/v1"
+)
 
+# Сколько раз повторять запрос после ответа 429, прежде чем вернуть ошибку
+MAX_RATE_LIMIT_RETRIES = 5
 
+_metrics = get_registry()
+LLM_REQUESTS = _metrics.counter(
+    "llm_requests_total",
+    "HTTP-запросы к LLM (status — код ответа или exception)",
+    ("provider", "status"),
+)
+LLM_TOKENS = _metrics.counter(
+    "llm_tokens_total",
+    "Токены LLM: reserved — зарезервированные лимитером, used — по ответу API",
+    ("provider", "kind"),
+)
+LLM_ERRORS = _metrics.counter(
+    "llm_errors_total",
+    "Ошибки LLM (rate_limited — 429 с повтором, http — неуспешный ответ, "
+    "exception — сетевая ошибка)",
+    ("provider", "reason"),
+)
+LLM_LATENCY = _metrics.histogram(
+    "llm_request_duration_seconds",
+    "Время HTTP-запроса к LLM без ожидания лимитера",
+    ("provider",),
+)
+LLM_QUEUE_DEPTH = _metrics.gauge(
+    "llm_queue_depth", "Запросы в очереди лимитера провайдера", ("provider",)
+)
+# Лимитер GitHub тоже живёт в DEFAULT_LIMITS, но это не LLM-провайдер
+for _provider in ("openrouter", "yandex"):
+    LLM_QUEUE_DEPTH.set_function(
+        lambda provider=_provider: get_rate_limiter(provider).queue_depth,
+        provider=_provider,
+    )
+
+
+def _retry_after(response, attempt: int) -> float:
+    """Пауза перед повтором: из заголовка Retry-After или экспоненциальная"""
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return min(60.0, 5.0 * 2**attempt)
+
+
+def _openrouter_usage(data: dict):
+    return (data.get("usage") or {}).get("total_tokens")
+
+
+def _yandex_usage(data: dict):
+    total = ((data.get("result") or {}).get("usage") or {}).get("totalTokens")
+    return int(total) if total is not None else None
+
+
+def _cancellable_post(url: str, headers: dict, payload: dict, cancel_token=None):
+    """
+    POST-запрос, который можно прервать токеном отмены.
+    Запрос выполняется во вспомогательном потоке; при отмене его сессия
+    закрывается, а вызывающий код сразу получает OperationCancelled.
+    """
+    # requests загружается при первом запросе, а не при старте приложения
+    import requests
+
+    if cancel_token is None:
+        return requests.post(url, headers=headers, json=payload)
+
+    session = requests.Session()
+    outcome = {}
+    finished = threading.Event()
+
+    def send():
+        try:
+            outcome["response"] = session.post(url, headers=headers, json=payload)
+        except Exception as e:
+            outcome["error"] = e
+        finally:
+            finished.set()
+
+    remove_callback = cancel_token.add_callback(session.close)
+    try:
+        threading.Thread(target=send, daemon=True).start()
+        while not finished.wait(timeout=0.2):
+            if cancel_token.is_cancelled:
+                raise OperationCancelled()
+        if "error" in outcome:
+            cancel_token.raise_if_cancelled()
+            raise outcome["error"]
+        return outcome["response"]
+    finally:
+        remove_callback()
+        if finished.is_set():
+            session.close()
+
+
+def _post_llm(
+    provider: str,
+    url: str,
+    headers: dict,
+    payload: dict,
+    reserve_tokens: int,
+    usage_getter,
+    cancel_token=None,
+):
+    """
+    Отправляет запрос к LLM через общий лимитер провайдера.
+    При 429 запрос не падает, а ставится обратно в очередь после паузы.
+    """
+    limiter = get_rate_limiter(provider)
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        check_cancelled(cancel_token)
+        with span(
+            "llm.request",
+            provider=provider,
+            model=payload.get("model") or payload.get("modelUri"),
+            attempt=attempt,
+            tokens_reserved=reserve_tokens,
+        ) as current, rate_limited(provider, reserve_tokens, cancel_token) as slot:
+            LLM_TOKENS.inc(reserve_tokens, provider=provider, kind="reserved")
+            started = time.perf_counter()
+            try:
+                response = _cancellable_post(url, headers, payload, cancel_token)
+            except Exception:
+                LLM_REQUESTS.inc(provider=provider, status="exception")
+                LLM_ERRORS.inc(provider=provider, reason="exception")
+                raise
+            LLM_LATENCY.observe(time.perf_counter() - started, provider=provider)
+            LLM_REQUESTS.inc(provider=provider, status=response.status_code)
+            current.set_attributes(
+                status=response.status_code, response_bytes=len(response.content)
+            )
+            if response.status_code == 429 and attempt < MAX_RATE_LIMIT_RETRIES:
+                pause = _retry_after(response, attempt)
+                limiter.pause(pause)
+                slot["used"] = 0
+                current.set_attribute("retry_after", pause)
+                LLM_ERRORS.inc(provider=provider, reason="rate_limited")
+                print(
+                    f"⏳ {provider}: 429, повтор через {pause:.0f} с "
+                    f"(в очереди {limiter.queue_depth})"
+                )
+                continue
+            if response.status_code == 200:
+                try:
+                    slot["used"] = usage_getter(response.json())
+                except ValueError:
+                    pass
+                if slot["used"] is not None:
+                    current.set_attribute("tokens_used", slot["used"])
+                    LLM_TOKENS.inc(slot["used"], provider=provider, kind="used")
+            else:
+                LLM_ERRORS.inc(provider=provider, reason="http")
+            return response
+
+
+@traced("llm.ask_qwen", provider="openrouter")
 def ask_qwen(
     prompt: str,
     model="qwen/qwen-2.5-coder-32b-instruct",
     max_tokens=1200,
     temperature=0.3,
+    cancel_token=None,
 ):
     headers = {
         "Authorization": f"Bearer {os.getenv('OPENROUTER_API_KEY')}",
@@ -30,8 +196,16 @@ def ask_qwen(
         "max_tokens": max_tokens,
     }
 
-    url = "https://openrouter.ai/api/v1/chat/completions"
-    response = requests.post(url, headers=headers, json=payload)
+    url = f"{OPENROUTER_BASE_URL}/chat/completions"
+    response = _post_llm(
+        "openrouter",
+        url,
+        headers,
+        payload,
+        reserve_tokens=estimate_tokens(prompt) + max_tokens,
+        usage_getter=_openrouter_usage,
+        cancel_token=cancel_token,
+    )
 
     if response.status_code == 200:
         return response.json()["choices"][0]["message"]["content"]
@@ -40,9 +214,10 @@ def ask_qwen(
         return "⚠️ Ошибка при обращении к OpenRouter"
 
 
-def ask_yandex_gpt(prompt: str, temperature=0.4, max_tokens=800):
+@traced("llm.ask_yandex_gpt", provider="yandex")
+def ask_yandex_gpt(prompt: str, temperature=0.4, max_tokens=800, cancel_token=None):
     """Создание итогового отчета (весь текст) через YandexGPT 32k"""
-    url = "https://llm.api.cloud.yandex.net/foundationModels/v1/completion"
+    url = f"{YANDEX_LLM_BASE_URL}/completion"
     headers = {
         "Authorization": f"Api-Key {YANDEX_API_KEY}",
         "Content-Type": "application/json",
@@ -57,7 +232,15 @@ def ask_yandex_gpt(prompt: str, temperature=0.4, max_tokens=800):
         "messages": [{"role": "user", "text": prompt}],
     }
 
-    response = requests.post(url, headers=headers, json=payload)
+    response = _post_llm(
+        "yandex",
+        url,
+        headers,
+        payload,
+        reserve_tokens=estimate_tokens(prompt) + max_tokens,
+        usage_getter=_yandex_usage,
+        cancel_token=cancel_token,
+    )
     if response.status_code == 200:
         return response.json()["result"]["alternatives"][0]["message"]["text"]
     else:
@@ -65,7 +248,8 @@ def ask_yandex_gpt(prompt: str, temperature=0.4, max_tokens=800):
         return "⚠️ Ошибка при обращении к YandexGPT"
 
 
-def ask_gemini(prompt: str):
+@traced("llm.ask_gemini", provider="openrouter")
+def ask_gemini(prompt: str, temperature=0.3, max_tokens=3072, cancel_token=None):
     headers = {
         "Authorization": f"Bearer {os.getenv('OPENROUTER_API_KEY')}",
         "Content-Type": "application/json",
@@ -74,12 +258,20 @@ def ask_gemini(prompt: str):
     payload = {
         "model": "google/gemini-2.5-pro-exp-03-25:free",
         "messages": [{"role": "user", "content": prompt}],
-        "temperature": 0.3,
-        "max_tokens": 3072,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
     }
 
-    url = "https://openrouter.ai/api/v1/chat/completions"
-    response = requests.post(url, headers=headers, json=payload)
+    url = f"{OPENROUTER_BASE_URL}/chat/completions"
+    response = _post_llm(
+        "openrouter",
+        url,
+        headers,
+        payload,
+        reserve_tokens=estimate_tokens(prompt) + max_tokens,
+        usage_getter=_openrouter_usage,
+        cancel_token=cancel_token,
+    )
 
     if response.status_code == 200:
         return response.json()["choices"][0]["message"]["content"]
@@ -88,8 +280,9 @@ def ask_gemini(prompt: str):
         return "⚠️ Ошибка при обращении к OpenRouter"
 
 
+@traced("llm.revise_code_review", provider="openrouter")
 def revise_code_review_with_gemini(
-    diff: str, first_review: str, temperature=0.3, max_tokens=3072
+    diff: str, first_review: str, temperature=0.3, max_tokens=3072, cancel_token=None
 ):
     """
     Проверка и корректировка отчета AI по коду.
@@ -145,4 +338,6 @@ def revise_code_review_with_gemini(
     📄 Отчёт от первой модели:
     {first_review}
     """
-    return ask_gemini(prompt, temperature=temperature, max_tokens=max_tokens)
+    return ask_gemini(
+        prompt, temperature=temperature, max_tokens=max_tokens, cancel_token=cancel_token
+    )
@@ -0,0 +1,468 @@
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional
+
+from app.services.git_service import GitService
+from app.services.identity import IdentityResolver, select_developers
+from app.services.job_queue import DONE, JobQueue
+from app.services.review_scheduler import ON_DEMAND_PRIORITY, review_priorities
+from app.services.team_service import TeamRoster, member_key, partition_by_member
+from app.utils.cancellation import check_cancelled
+from app.utils.tracing import span
+
+COMMIT_ANALYSIS = "commit_analysis"
+TEAM_ANALYSIS = "team_analysis"
+ORG_ANALYSIS = "org_analysis"
+AUTHOR_LIST = "author_list"
+QUALITY_REPORT = "quality_report"
+
+# Параметры, при совпадении которых готовый анализ переиспользуется
+SELECTION_KEYS = (
+    "repo_name",
+    "developer_username",
+    "start_date",
+    "end_date",
+    "use_llm",
+)
+TEAM_SELECTION_KEYS = ("repo_name", "member_keys", "start_date", "end_date", "use_llm")
+ORG_SELECTION_KEYS = ("org", "repos", "members", "start_date", "end_date", "use_llm")
+# Сколько часов результат анализа (из интерфейса или CLI) считается актуальным
+ANALYSIS_REUSE_HOURS = float(os.getenv("ANALYSIS_REUSE_HOURS", "24"))
+# Параллельные LLM-ревью командного анализа (общий пул на всех участников)
+TEAM_REVIEW_WORKERS = int(os.getenv("TEAM_REVIEW_WORKERS", "4"))
+# Параллельная загрузка репозиториев организации (частоту запросов к GitHub
+# ограничивает общий лимитер "github", см. GITHUB_RPM)
+ORG_FETCH_WORKERS = int(os.getenv("ORG_FETCH_WORKERS", "4"))
+
+
+def _parse_date(value):
+    """Даты приходят из параметров задачи строками ISO — возвращаем date"""
+    if isinstance(value, str) and value:
+        return date.fromisoformat(value[:10])
+    return value
+
+
+def run_commit_analysis(queue: JobQueue, job: Dict[str, Any], git_service: GitService):
+    """
+    Загружает коммиты разработчика и проводит LLM-ревью каждого из них.
+    Сначала загружаются все коммиты (дашборд можно строить сразу), затем
+    ревью идут по приоритету: запрошенные вручную, видимые в списке
+    последних коммитов, остальные — в фоне по убыванию размера.
+    Результаты сохраняются по мере готовности, поэтому при повторном запуске
+    уже загруженные и проверенные коммиты не запрашиваются заново.
+    Отмена задачи проверяется перед каждым коммитом и каждым вызовом LLM.
+    """
+    params = job["params"]
+    with span(
+        "analysis.job",
+        job_id=job["id"],
+        repo=params["repo_name"],
+        author=params.get("developer_username"),
+    ):
+        _analyze_commits(queue, job, git_service)
+
+
+def _analyze_commits(queue: JobQueue, job: Dict[str, Any], git_service: GitService):
+    params = job["params"]
+    all_commits = git_service.list_commits(
+        params["repo_name"],
+        developer_username=params.get("developer_username"),
+        start_date=_parse_date(params.get("start_date")),
+        end_date=_parse_date(params.get("end_date")),
+    )
+    _fetch_commits(queue, job, git_service, all_commits)
+    if params.get("use_llm", True):
+        queue.set_priorities(job["id"], review_priorities(queue.results(job["id"])))
+        _review_pending(queue, job, git_service)
+
+
+def _fetch_commits(
+    queue: JobQueue,
+    job: Dict[str, Any],
+    git_service: GitService,
+    all_commits,
+    assign: Optional[Callable[[Any], Optional[str]]] = None,
+):
+    """
+    Загружает коммиты списка и сохраняет их по одному (уже сохранённые
+    пропускаются). `assign(commit)` — участник команды, которому принадлежит
+    элемент списка; коммиты, для которых он вернул None, не загружаются.
+    """
+    params = job["params"]
+    cancel_token = job.get("cancel_token")
+    use_llm = params.get("use_llm", True)
+    total = git_service.count_commits(all_commits, params["repo_name"])
+    queue.update_progress(job["id"], total=total)
+
+    done = queue.done_shas(job["id"])
+    if done:
+        print(f"Задача {job['id']}: продолжение, уже загружено {len(done)} коммитов")
+
+    with span("analysis.fetch", total=total, resumed=len(done)) as current:
+        commits = git_service.iter_pages(all_commits, params["repo_name"])
+        for position, commit in enumerate(commits):
+            check_cancelled(cancel_token)
+            if commit.sha in done:
+                continue
+            member = assign(commit) if assign is not None else None
+            if assign is not None and member is None:
+                continue
+            commit_data = git_service.build_commit_data(commit)
+            if member is not None:
+                commit_data["member"] = member
+            if use_llm:
+                commit_data["llm_pending"] = True
+            queue.checkpoint(job["id"], position, commit_data, reviewed=not use_llm)
+        if assign is not None:
+            # В списке были и коммиты не из команды: итог — число загруженных
+            fetched = len(queue.done_shas(job["id"]))
+            queue.update_progress(job["id"], total=fetched)
+            current.set_attribute("fetched", fetched)
+
+
+def _review_pending(
+    queue: JobQueue, job: Dict[str, Any], git_service: GitService, workers: int = 1
+):
+    """
+    LLM-ревью сохранённых коммитов по приоритету. При `workers` > 1 ревью идут
+    параллельно в общем пуле потоков; частоту запросов к провайдерам
+    по-прежнему ограничивает общий лимитер.
+    """
+    cancel_token = job.get("cancel_token")
+    claimed = set()
+    lock = threading.Lock()
+    reviewed = 0
+
+    def review_all(current):
+        nonlocal reviewed
+        while True:
+            with lock:
+                pending = queue.next_pending_review(job["id"], exclude=claimed)
+                if pending is None:
+                    return
+                position, commit_data = pending
+                claimed.add(commit_data["sha"])
+            commit_data.pop("llm_pending", None)
+            git_service.review_commit(commit_data, cancel_token=cancel_token)
+            queue.checkpoint(job["id"], position, commit_data)
+            with lock:
+                claimed.discard(commit_data["sha"])
+                reviewed += 1
+                current.set_attribute("reviewed", reviewed)
+
+    with span("analysis.review", workers=workers) as current:
+        if workers <= 1:
+            review_all(current)
+            return
+        # Span-ы ревью остаются в трассе задачи: каждый поток получает её контекст
+        with ThreadPoolExecutor(workers, thread_name_prefix="team-review") as pool:
+            futures = [
+                pool.submit(contextvars.copy_context().run, review_all, current)
+                for _ in range(workers)
+            ]
+            for future in futures:
+                future.result()
+
+
+def run_team_analysis(queue: JobQueue, job: Dict[str, Any], git_service: GitService):
+    """
+    Анализ команды: один список коммитов репозитория за период вместо
+    отдельного на каждого разработчика. Коммиты распределяются по участникам
+    (`members` — авторы в формате `get_all_commit_authors`; пусто — все
+    авторы), ревью всех участников идут через общий пул `TEAM_REVIEW_WORKERS`
+    потоков, начиная с последних коммитов каждого участника.
+    """
+    params = job["params"]
+    roster = TeamRoster(params.get("members") or ())
+    with span(
+        "analysis.team_job",
+        job_id=job["id"],
+        repo=params["repo_name"],
+        members=len(roster.members),
+    ):
+        all_commits = git_service.list_commits(
+            params["repo_name"],
+            start_date=_parse_date(params.get("start_date")),
+            end_date=_parse_date(params.get("end_date")),
+        )
+
+        def assign(commit):
+            # Логин и email есть в элементе списка: загружать коммит не нужно
+            login = commit.author.login if commit.author else None
+            return roster.match(login, commit.commit.author.email)
+
+        _fetch_commits(queue, job, git_service, all_commits, assign)
+        if params.get("use_llm", True):
+            _review_members(queue, job, git_service)
+
+
+def _review_members(queue: JobQueue, job: Dict[str, Any], git_service: GitService):
+    """Ревью коммитов всех участников в общем пуле, с последних коммитов каждого"""
+    priorities = {}
+    for commits in partition_by_member(queue.results(job["id"])).values():
+        priorities.update(review_priorities(commits))
+    queue.set_priorities(job["id"], priorities)
+    _review_pending(queue, job, git_service, workers=TEAM_REVIEW_WORKERS)
+
+
+def run_org_analysis(queue: JobQueue, job: Dict[str, Any], git_service: GitService):
+    """
+    Анализ по нескольким репозиториям: все репозитории организации `org`
+    и/или список `repos`. Списки коммитов загружаются параллельно
+    (`ORG_FETCH_WORKERS` потоков, общий бюджет запросов к GitHub), авторы
+    объединяются по email и логину (`IdentityResolver`), и загружаются только
+    коммиты разработчиков из `members` (логины или email; пусто — все).
+    Каждый коммит помечается репозиторием (`repo`) и разработчиком (`member`),
+    результат задачи — репозитории и объединённый список разработчиков.
+    """
+    params = job["params"]
+    with span("analysis.org_job", job_id=job["id"], org=params.get("org")) as current:
+        repos = _org_repositories(git_service, params)
+        current.set_attribute("repos", len(repos))
+        listed, failed = _list_org_commits(queue, job, git_service, repos)
+
+        resolver = IdentityResolver()
+        for repo_name, commit in listed:
+            author = commit.commit.author
+            resolver.add(
+                author.name,
+                author.email,
+                commit.author.login if commit.author else None,
+                repo_name,
+                author.date,
+            )
+        developers = resolver.developers()
+        # Разработчики доступны сразу: коммиты ещё загружаются
+        queue.set_result(
+            job["id"],
+            {"repos": repos, "failed_repos": failed, "developers": developers},
+        )
+        selected = select_developers(resolver, params.get("members") or ())
+
+        targets = []
+        for position, (repo_name, commit) in enumerate(listed):
+            login = commit.author.login if commit.author else None
+            member = resolver.resolve(commit.commit.author.email, login)
+            if member is not None and (selected is None or member in selected):
+                targets.append((position, repo_name, member, commit))
+        current.set_attributes(developers=len(developers), selected=len(targets))
+        _fetch_org_commits(queue, job, git_service, targets)
+        if params.get("use_llm", True):
+            _review_members(queue, job, git_service)
+
+
+def _org_repositories(git_service: GitService, params: Dict[str, Any]) -> List[str]:
+    repos = list(params.get("repos") or ())
+    if params.get("org"):
+        repos += git_service.list_org_repositories(params["org"])
+    # Порядок сохраняется: позиции коммитов при продолжении задачи не меняются
+    return list(dict.fromkeys(repos))
+
+
+def _list_org_commits(
+    queue: JobQueue, job: Dict[str, Any], git_service: GitService, repos: List[str]
+):
+    """
+    Элементы списков коммитов всех репозиториев — от новых к старым; коммит,
+    встретившийся в нескольких репозиториях, учитывается один раз. Второе
+    значение — репозитории, список коммитов которых получить не удалось.
+    """
+    from github import GithubException
+
+    params = job["params"]
+    cancel_token = job.get("cancel_token")
+
+    def list_repo(repo_name):
+        try:
+            commits = git_service.list_commits(
+                repo_name,
+                start_date=_parse_date(params.get("start_date")),
+                end_date=_parse_date(params.get("end_date")),
+            )
+            listed = []
+            for commit in git_service.iter_pages(commits, repo_name):
+                check_cancelled(cancel_token)
+                listed.append((repo_name, commit))
+            return listed
+        except GithubException as e:
+            # Пустой или недоступный репозиторий не должен останавливать анализ
+            print(f"Задача {job['id']}: репозиторий {repo_name} пропущен: {e}")
+            return None
+
+    with span("analysis.list_repos", repos=len(repos)) as current:
+        with ThreadPoolExecutor(
+            ORG_FETCH_WORKERS, thread_name_prefix="org-list"
+        ) as pool:
+            futures = [
+                pool.submit(contextvars.copy_context().run, list_repo, repo_name)
+                for repo_name in repos
+            ]
+            results = [future.result() for future in futures]
+        failed = [repo for repo, listed in zip(repos, results) if listed is None]
+        seen, listed = set(), []
+        for repo_commits in results:
+            for repo_name, commit in repo_commits or ():
+                if commit.sha not in seen:
+                    seen.add(commit.sha)
+                    listed.append((repo_name, commit))
+        listed.sort(key=lambda item: item[1].commit.author.date, reverse=True)
+        current.set_attributes(commits=len(listed), failed=len(failed))
+    return listed, failed
+
+
+def _fetch_org_commits(
+    queue: JobQueue, job: Dict[str, Any], git_service: GitService, targets: List
+):
+    """Загружает отобранные коммиты (`ORG_FETCH_WORKERS` потоков) и сохраняет их"""
+    cancel_token = job.get("cancel_token")
+    use_llm = job["params"].get("use_llm", True)
+    queue.update_progress(job["id"], total=len(targets))
+    done = queue.done_shas(job["id"])
+    if done:
+        print(f"Задача {job['id']}: продолжение, уже загружено {len(done)} коммитов")
+
+    def fetch(position, repo_name, member, commit):
+        check_cancelled(cancel_token)
+        commit_data = git_service.build_commit_data(commit)
+        commit_data["repo"] = repo_name
+        commit_data["member"] = member
+        if use_llm:
+            commit_data["llm_pending"] = True
+        queue.checkpoint(job["id"], position, commit_data, reviewed=not use_llm)
+
+    pending = [target for target in targets if target[3].sha not in done]
+    with span("analysis.fetch", total=len(targets), resumed=len(done)):
+        with ThreadPoolExecutor(
+            ORG_FETCH_WORKERS, thread_name_prefix="org-fetch"
+        ) as pool:
+            futures = [
+                pool.submit(contextvars.copy_context().run, fetch, *target)
+                for target in pending
+            ]
+            for future in futures:
+                future.result()
+
+
+def run_author_list(queue: JobQueue, job: Dict[str, Any], git_service: GitService):
+    """Список авторов репозитория (результат задачи — как у `get_all_commit_authors`)"""
+    repo_name = job["params"]["repo_name"]
+    with span("analysis.authors", job_id=job["id"], repo=repo_name):
+        queue.set_result(job["id"], git_service.get_all_commit_authors(repo_name))
+
+
+def run_quality_report(queue: JobQueue, job: Dict[str, Any]):
+    """
+    Итоговый LLM-отчёт по результатам завершённого анализа коммитов;
+    для командного анализа и анализа организации — по коммитам участника
+    (разработчика) `member`.
+    """
+    from app.services.full_quality_report import generate_full_quality_report
+
+    analysis_id = job["params"]["analysis_job"]
+    member = job["params"].get("member")
+    with span(
+        "analysis.report", job_id=job["id"], analysis_job=analysis_id, member=member
+    ):
+        analysis = queue.get(analysis_id)
+        if analysis is None or analysis["status"] != DONE:
+            raise ValueError(f"Анализ {analysis_id} не найден или не завершён")
+        commits = queue.results(analysis_id)
+        if member is not None:
+            commits = [commit for commit in commits if commit.get("member") == member]
+        check_cancelled(job.get("cancel_token"))
+        report = generate_full_quality_report(commits)
+        queue.set_result(job["id"], {"markdown": report, "commits": len(commits)})
+
+
+def request_review(queue: JobQueue, job_id: str, sha: str):
+    """Ставит ревью коммита первым в очередь (пользователь открыл его анализ)"""
+    queue.prioritize(job_id, sha, ON_DEMAND_PRIORITY)
+
+
+def find_recent_analysis(
+    queue: JobQueue,
+    selection: Dict[str, Any],
+    max_age_hours: float = ANALYSIS_REUSE_HOURS,
+    kind: str = COMMIT_ANALYSIS,
+) -> Optional[Dict[str, Any]]:
+    """
+    Завершённый анализ с теми же репозиторием, автором, периодом и режимом LLM
+    не старше `max_age_hours` — например, ночной прогон CLI для утреннего дашборда.
+    Для командного анализа (`kind=TEAM_ANALYSIS`) вместо автора сравнивается
+    состав команды (`member_keys`), для анализа организации — организация,
+    список репозиториев и разработчики.
+    """
+    if max_age_hours <= 0:
+        return None
+    keys = {TEAM_ANALYSIS: TEAM_SELECTION_KEYS, ORG_ANALYSIS: ORG_SELECTION_KEYS}.get(
+        kind, SELECTION_KEYS
+    )
+    params = {key: selection[key] for key in keys}
+    return queue.find_latest(kind, params, max_age=max_age_hours * 3600)
+
+
+def team_params(
+    repo_name: str,
+    members: List[Dict[str, Any]],
+    start_date,
+    end_date,
+    use_llm: bool = True,
+) -> Dict[str, Any]:
+    """Параметры командного анализа; `member_keys` — для поиска готового анализа"""
+    return {
+        "repo_name": repo_name,
+        "members": members,
+        "member_keys": sorted(member_key(member) for member in members),
+        "start_date": start_date,
+        "end_date": end_date,
+        "use_llm": use_llm,
+    }
+
+
+def org_params(
+    org: Optional[str],
+    repos: List[str],
+    members: List[str],
+    start_date,
+    end_date,
+    use_llm: bool = True,
+) -> Dict[str, Any]:
+    """
+    Параметры анализа организации. Списки сортируются, чтобы одинаковый выбор
+    в другом порядке находил готовый анализ.
+    """
+    return {
+        "org": org or None,
+        "repos": sorted(set(repos)),
+        "members": sorted({member.lower() for member in members}),
+        "start_date": start_date,
+        "end_date": end_date,
+        "use_llm": use_llm,
+    }
+
+
+def create_job_queue(git_service: GitService, workers: int = 2) -> JobQueue:
+    """
+    Создаёт очередь задач анализа и запускает рабочие потоки.
+    `workers=0` — без рабочих потоков: задачи выполняются через `JobQueue.run`.
+    """
+    queue = JobQueue()
+    queue.register_handler(
+        COMMIT_ANALYSIS, lambda q, job: run_commit_analysis(q, job, git_service)
+    )
+    queue.register_handler(
+        AUTHOR_LIST, lambda q, job: run_author_list(q, job, git_service)
+    )
+    queue.register_handler(
+        TEAM_ANALYSIS, lambda q, job: run_team_analysis(q, job, git_service)
+    )
+    queue.register_handler(
+        ORG_ANALYSIS, lambda q, job: run_org_analysis(q, job, git_service)
+    )
+    queue.register_handler(QUALITY_REPORT, run_quality_report)
+    if workers:
+        queue.start_workers(workers)
+    return queue
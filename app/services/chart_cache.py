@@ -0,0 +1,147 @@
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Tuple
+
+from app.utils.metrics import CACHE_BYTES, CACHE_REQUESTS
+from app.utils.tracing import set_attributes, span
+
+# Предел памяти под кэш графиков и агрегатов (общий для всех сессий процесса)
+CHART_CACHE_MAX_BYTES = int(os.getenv("CHART_CACHE_MAX_MB", "256")) * 2**20
+
+
+def dataset_fingerprint(commits) -> str:
+    """
+    Отпечаток набора коммитов: всё, от чего зависят таблицы и графики
+    (SHA, даты, статистика и файлы). LLM-ревью в отпечаток не входят, чтобы
+    догружаемые в фоне ревью не сбрасывали кэш графиков.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for commit in commits:
+        stats = commit.get("stats") or {}
+        digest.update(
+            f"{commit.get('sha')}|{commit.get('date')}|"
+            f"{stats.get('additions')}|{stats.get('deletions')}\n".encode()
+        )
+        for file in commit.get("files") or []:
+            if isinstance(file, Mapping):
+                digest.update(
+                    f"{file.get('filename')}|{file.get('additions')}|"
+                    f"{file.get('deletions')}\n".encode()
+                )
+    return digest.hexdigest()
+
+
+def _payload_size(value: Any) -> int:
+    """Объём данных трассы: массивы — по nbytes (плюс длина строк), прочее — грубо"""
+    if hasattr(value, "nbytes"):
+        size = value.nbytes
+        if value.dtype.kind == "O" and value.size:
+            # Длину строк оцениваем по выборке, чтобы не обходить весь массив
+            sample = value.ravel()[:: max(1, value.size // 256)]
+            size += value.size * sum(len(str(item)) for item in sample) // len(sample)
+        return int(size)
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, Mapping):
+        return sum(_payload_size(item) for item in value.values())
+    if isinstance(value, (tuple, list)):
+        return sum(_payload_size(item) for item in value)
+    return 8
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Примерный объём значения в памяти (DataFrame, Plotly-фигура или прочее).
+    Фигура не сериализуется и не копируется (`to_json`/`to_plotly_json` стоят
+    секунды на сотне тысяч точек): считаются только массивы её трасс.
+    """
+    if hasattr(value, "memory_usage"):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    if hasattr(value, "to_plotly_json"):
+        return sum(_payload_size(trace._props or {}) for trace in value.data)
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sum(estimate_size(item) for item in value.values())
+    return sys.getsizeof(value)
+
+
+class ChartCache:
+    """LRU-кэш с ограничением по суммарному объёму значений"""
+
+    def __init__(self, max_bytes: int = CHART_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Any, int]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: Tuple[str, str], compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                CACHE_REQUESTS.inc(cache="chart", result="hit")
+                set_attributes(cache="hit")
+                return self._entries[key][0]
+            self.misses += 1
+        CACHE_REQUESTS.inc(cache="chart", result="miss")
+        set_attributes(cache="miss")
+
+        value = compute()
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return value
+
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_chart_cache = ChartCache()
+CACHE_BYTES.set_function(lambda: _chart_cache.stats()["bytes"], cache="chart")
+
+
+def memoize(fingerprint: str, name: str, builder: Callable, *args, **kwargs) -> Any:
+    """
+    Возвращает результат `builder(*args, **kwargs)` для набора данных `fingerprint`,
+    вычисляя его только при первом обращении. Результаты считаются
+    неизменяемыми — вызывающий код не должен их модифицировать.
+    Обращение выполняется в span-е `chart.<name>` с атрибутом `cache` (hit/miss);
+    уточнение после двоеточия (`code_pulse:<окно>`) уходит в атрибут `variant`.
+    """
+    base_name, _, variant = name.partition(":")
+    with span(f"chart.{base_name}", variant=variant or None):
+        return _chart_cache.get_or_compute(
+            (fingerprint, name), lambda: builder(*args, **kwargs)
+        )
+
+
+def get_chart_cache() -> ChartCache:
+    return _chart_cache
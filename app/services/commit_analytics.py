@@ -0,0 +1,54 @@
+"""
+Аналитика коммитов в виде, пригодном для JSON (HTTP API): те же агрегаты, что
+строит дашборд, и тот же кэш таблицы и куба по отпечатку набора коммитов.
+"""
+
+from typing import Any, Dict, List
+
+from app.services.chart_cache import dataset_fingerprint, memoize
+from app.services.commit_cube import DAYS_ORDER, CommitCube
+from app.services.file_index import (
+    build_file_index,
+    extension_summary,
+    top_changed_files,
+)
+
+
+def _records(df) -> List[Dict[str, Any]]:
+    """Строки DataFrame как словари с обычными типами Python"""
+    return [
+        {key: value.item() if hasattr(value, "item") else value for key, value in row}
+        for row in (zip(df.columns, values) for values in df.itertuples(index=False))
+    ]
+
+
+def commit_analytics(commits: List[Dict[str, Any]], top: int = 15) -> Dict[str, Any]:
+    """
+    Итоги, активность по дням и неделям, распределение по дням недели и часам,
+    типы коммитов, расширения и самые изменяемые файлы.
+    """
+    # Таблица коммитов строится модулем дашборда (pandas и графики — лениво)
+    from app.services.visualization_service import prepare_commit_data
+
+    if not commits:
+        return {"commits": 0}
+    fingerprint = dataset_fingerprint(commits)
+    df_commits = memoize(fingerprint, "commit_frame", prepare_commit_data, commits)
+    cube = memoize(fingerprint, "commit_cube", CommitCube, df_commits)
+    file_index = memoize(fingerprint, "file_index", build_file_index, commits)
+
+    daily = cube.daily_activity()
+    daily["date"] = daily["date"].dt.strftime("%Y-%m-%d")
+    return {
+        "commits": len(commits),
+        "additions": int(df_commits["additions"].sum()),
+        "deletions": int(df_commits["deletions"].sum()),
+        "files_changed": int(df_commits["files_changed"].sum()),
+        "daily": _records(daily),
+        "weekly": _records(cube.weekly_stats()),
+        "weekdays": dict(zip(DAYS_ORDER, cube.weekday_counts().tolist())),
+        "weekday_hour": cube.weekday_hour.tolist(),
+        "types": {name: int(count) for name, count in cube.type_counts().items()},
+        "extensions": _records(extension_summary(file_index, top)),
+        "top_files": _records(top_changed_files(file_index, top)),
+    }
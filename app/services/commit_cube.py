@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+DAYS_ORDER = [
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Sunday",
+]
+COMMIT_TYPES = [
+    "Addition",
+    "Major Addition",
+    "Modification",
+    "Removal",
+    "Major Removal",
+]
+
+# Аддитивные меры: суммы можно складывать при дозагрузке коммитов,
+# а средние получаются делением на количество коммитов
+MEASURES = [
+    "commits",
+    "additions",
+    "deletions",
+    "files_changed",
+    "total_changes",
+    "complexity_sum",
+]
+
+
+def _empty_measures(index):
+    return pd.DataFrame(
+        {measure: pd.Series(dtype="float64") for measure in MEASURES}, index=index
+    )
+
+
+class CommitCube:
+    """
+    Предагрегированный куб коммитов для графиков дашборда: суммы по дате,
+    ISO-неделе, дню недели × часу и типу коммита. Строится один раз на набор
+    данных (DataFrame из `prepare_commit_data`) и дополняется через `append`.
+    """
+
+    def __init__(self, df_commits=None):
+        self.daily = _empty_measures(pd.DatetimeIndex([], name="date"))
+        self.weekly = _empty_measures(
+            pd.MultiIndex.from_arrays([[], []], names=["year", "week"])
+        )
+        self.weekday_hour = np.zeros((len(DAYS_ORDER), 24), dtype="int64")
+        self.types = pd.Series(0, index=COMMIT_TYPES, dtype="int64")
+        if df_commits is not None:
+            self.append(df_commits)
+
+    @property
+    def total_commits(self) -> int:
+        return int(self.types.sum())
+
+    def append(self, df_commits):
+        """
+        Добавляет в куб новые коммиты. Передавать нужно только ещё не учтённые
+        коммиты — повторная передача тех же строк удвоит суммы.
+        """
+        if df_commits is None or df_commits.empty:
+            return self
+
+        measures = pd.DataFrame(
+            {
+                "commits": 1.0,
+                "additions": df_commits["additions"].astype("float64"),
+                "deletions": df_commits["deletions"].astype("float64"),
+                "files_changed": df_commits["files_changed"].astype("float64"),
+                "total_changes": df_commits["total_changes"].astype("float64"),
+                "complexity_sum": df_commits["complexity"].astype("float64"),
+            },
+            index=df_commits.index,
+        )
+
+        daily = measures.groupby(df_commits["date"].rename("date")).sum()
+        self.daily = self.daily.add(daily, fill_value=0).sort_index()
+
+        iso = pd.to_datetime(df_commits["date"]).dt.isocalendar()
+        weekly = measures.groupby(
+            [iso["year"].rename("year"), iso["week"].rename("week")]
+        ).sum()
+        self.weekly = self.weekly.add(weekly, fill_value=0).sort_index()
+
+        day_codes = df_commits["day_of_week"].cat.codes.to_numpy()
+        hours = df_commits["hour"].to_numpy().astype("int64")
+        valid = day_codes >= 0
+        self.weekday_hour += np.bincount(
+            day_codes[valid].astype("int64") * 24 + hours[valid],
+            minlength=len(DAYS_ORDER) * 24,
+        ).reshape(len(DAYS_ORDER), 24)
+
+        self.types = self.types.add(
+            df_commits["commit_type"].value_counts(), fill_value=0
+        ).astype("int64")
+        return self
+
+    def daily_activity(self):
+        """Коммиты и изменения по дням (средняя сложность — по коммитам дня)"""
+        daily = self.daily.reset_index()
+        daily["complexity"] = daily["complexity_sum"] / daily["commits"]
+        for column in MEASURES:
+            if column != "complexity_sum":
+                daily[column] = daily[column].astype("int64")
+        return daily.drop(columns="complexity_sum")
+
+    def weekly_stats(self):
+        """Изменения кода по ISO-неделям"""
+        weekly = self.weekly.reset_index()
+        weekly["complexity"] = weekly["complexity_sum"] / weekly["commits"]
+        for column in MEASURES:
+            if column != "complexity_sum":
+                weekly[column] = weekly[column].astype("int64")
+        return weekly.drop(columns="complexity_sum")
+
+    def weekday_counts(self):
+        """Количество коммитов по дням недели"""
+        return pd.Series(self.weekday_hour.sum(axis=1), index=DAYS_ORDER)
+
+    def heatmap(self):
+        """Матрица день недели × час (только часы, в которые были коммиты)"""
+        matrix = pd.DataFrame(self.weekday_hour, index=DAYS_ORDER, columns=range(24))
+        return matrix.loc[:, matrix.sum(axis=0) > 0]
+
+    def type_counts(self):
+        """Количество коммитов по типам (в порядке COMMIT_TYPES)"""
+        return self.types.copy()
+
+    def memory_usage(self, deep=True) -> int:
+        return int(
+            self.daily.memory_usage(deep=deep).sum()
+            + self.weekly.memory_usage(deep=deep).sum()
+            + self.weekday_hour.nbytes
+            + self.types.memory_usage(deep=deep)
+        )
@@ -0,0 +1,164 @@
+"""
+Разбор трасс последнего запуска для панели диагностики: куда ушло время
+(GitHub, LLM-ревью, ревизия, подготовка данных, каждый график) и сколько было
+обращений к API и кэшам.
+"""
+
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.utils.metrics import CACHE_REQUESTS
+from app.utils.tracing import Span, get_tracer
+
+# Этапы по именам span-ов; время вложенных span-ов без собственного этапа
+# относится к ближайшему предку с этапом
+STAGES = {
+    "github.": "GitHub fetch",
+    "review.commit": "LLM review",
+    "llm.ask_qwen": "LLM review",
+    "llm.revise_code_review": "Revision",
+    "rate_limit.wait": "LLM rate limit wait",
+    "report.": "Quality report",
+    "llm.ask_yandex_gpt": "Quality report",
+    "chart.commit_frame": "DataFrame prep",
+    "chart.commit_cube": "Aggregates (cube)",
+    "dashboard.render": "Rendering (Streamlit / Plotly)",
+    "analysis.": "Job queue & storage",
+}
+
+
+def stage_of(span: Span) -> Optional[str]:
+    """Этап панели для span-а или None, если span относится к этапу родителя"""
+    if span.name in STAGES:
+        return STAGES[span.name]
+    if span.name.startswith("chart."):
+        return f"Chart: {span.name[len('chart.'):]}"
+    for prefix, stage in STAGES.items():
+        if prefix.endswith(".") and span.name.startswith(prefix):
+            return stage
+    return None
+
+
+def trace_spans(trace_ids: Iterable[str]) -> List[Span]:
+    """Завершённые span-ы трасс и их корни (незавершённый корень — по текущий момент)"""
+    tracer = get_tracer()
+    spans = []
+    for trace_id in trace_ids:
+        finished = tracer.get_trace(trace_id)
+        spans.extend(finished)
+        root = tracer.get_root(trace_id)
+        if root is not None and root.end_ns is None:
+            spans.append(root)
+    return spans
+
+
+def time_breakdown(spans: List[Span]) -> List[Dict[str, Any]]:
+    """
+    Собственное время span-ов (без вложенных), сгруппированное по этапам.
+    Возвращает строки {stage, seconds, share, calls}, самые долгие первыми.
+    """
+    by_id = {span.span_id: span for span in spans}
+    children = defaultdict(float)
+    for span in spans:
+        if span.parent_id in by_id:
+            children[span.parent_id] += span.duration
+
+    resolved: Dict[str, Optional[str]] = {}
+
+    def resolve(span: Span) -> Optional[str]:
+        """Этап span-а или ближайшего предка с этапом"""
+        if span.span_id not in resolved:
+            stage = stage_of(span)
+            parent = by_id.get(span.parent_id)
+            if stage is None and parent is not None:
+                stage = resolve(parent)
+            resolved[span.span_id] = stage
+        return resolved[span.span_id]
+
+    seconds = defaultdict(float)
+    calls = Counter()
+    for span in spans:
+        stage = resolve(span)
+        parent = by_id.get(span.parent_id)
+        # Вызовом этапа считается вход в него, а не каждый вложенный span
+        if stage is not None and (parent is None or resolve(parent) != stage):
+            calls[stage] += 1
+        seconds[stage or "Other"] += max(0.0, span.duration - children[span.span_id])
+
+    total = sum(seconds.values()) or 1.0
+    rows = [
+        {
+            "stage": stage,
+            "seconds": round(value, 3),
+            "share": round(value / total, 3),
+            "calls": calls[stage],
+        }
+        for stage, value in seconds.items()
+    ]
+    return sorted(rows, key=lambda row: -row["seconds"])
+
+
+def call_counts(spans: List[Span]) -> Dict[str, int]:
+    """Обращения к API и кэшу графиков по атрибутам span-ов"""
+    names = Counter(span.name for span in spans)
+    counts = {
+        # list_commits запрашивает репозиторий, страницы и число коммитов — отдельно
+        "github_requests": names["github.list_commits"]
+        + names["github.page"]
+        + names["github.total_count"]
+        + sum(
+            1
+            for span in spans
+            if span.name == "github.commit" and span.attributes.get("hydrated")
+        ),
+        "llm_requests": names["llm.request"],
+        "llm_rate_limited": sum(
+            1
+            for span in spans
+            if span.name == "llm.request" and span.attributes.get("status") == 429
+        ),
+        "llm_tokens": sum(
+            span.attributes.get("tokens_used", 0)
+            for span in spans
+            if span.name == "llm.request"
+        ),
+        "cache_hits": 0,
+        "cache_misses": 0,
+        "errors": sum(1 for span in spans if span.status == "error"),
+    }
+    for span in spans:
+        if span.name.startswith("chart."):
+            cache = span.attributes.get("cache")
+            if cache == "hit":
+                counts["cache_hits"] += 1
+            elif cache == "miss":
+                counts["cache_misses"] += 1
+    return counts
+
+
+def run_diagnostics(trace_ids: Iterable[str]) -> Optional[Dict[str, Any]]:
+    """Сводка по трассам одного запуска или None, если трассы уже вытеснены"""
+    spans = trace_spans(trace_ids)
+    if not spans:
+        return None
+    roots = [span for span in spans if span.parent_id is None]
+    return {
+        "wall_seconds": round(sum(root.duration for root in roots), 3),
+        "running": any(root.end_ns is None for root in roots),
+        "stages": time_breakdown(spans),
+        "counts": call_counts(spans),
+    }
+
+
+def cache_totals() -> Dict[str, Dict[str, float]]:
+    """Попадания и промахи кэшей процесса с момента запуска (по метрикам)"""
+    totals = {}
+    for cache in ("chart", "patch"):
+        hits = CACHE_REQUESTS.value(cache=cache, result="hit")
+        misses = CACHE_REQUESTS.value(cache=cache, result="miss")
+        totals[cache] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else None,
+        }
+    return totals
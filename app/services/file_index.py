@@ -0,0 +1,93 @@
+import os
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+# Категории файлов по расширению (для цветовой схемы графиков)
+FILE_CATEGORIES = ["Code", "UI", "Config", "Doc", "Other"]
+EXTENSION_CATEGORIES = {
+    **dict.fromkeys([".py", ".java", ".js", ".ts", ".jsx", ".tsx"], "Code"),
+    **dict.fromkeys([".html", ".css", ".scss", ".less"], "UI"),
+    **dict.fromkeys([".json", ".yaml", ".yml", ".xml", ".toml"], "Config"),
+    **dict.fromkeys([".md", ".txt", ".csv", ".rst"], "Doc"),
+}
+
+# Расширение имени файла по правилам os.path.splitext: точка в начале
+# имени (".gitignore") расширением не считается
+_EXTENSION_PATTERN = r"[^/.][^/]*?(\.[^./]*)$"
+
+
+def build_file_index(commits):
+    """
+    Строит индекс изменений файлов: одна строка на пару коммит × файл с
+    расширением, категорией и числом добавленных/удалённых строк.
+    Коммиты обходятся один раз, всё остальное вычисляется векторно.
+    Столбец `commit` — позиция коммита в исходном списке.
+    """
+    positions, filenames, additions, deletions = [], [], [], []
+    for position, commit in enumerate(commits):
+        for file in commit.get("files") or []:
+            if isinstance(file, Mapping) and "filename" in file:
+                positions.append(position)
+                filenames.append(file["filename"])
+                additions.append(file.get("additions", 0) or 0)
+                deletions.append(file.get("deletions", 0) or 0)
+
+    filenames = pd.Series(filenames, dtype="object")
+    extensions = (
+        filenames.str.extract(_EXTENSION_PATTERN, expand=False).fillna("").str.lower()
+    )
+    additions = np.asarray(additions, dtype="int32")
+    deletions = np.asarray(deletions, dtype="int32")
+
+    return pd.DataFrame(
+        {
+            "commit": np.asarray(positions, dtype="int32"),
+            "filename": filenames.astype("category"),
+            "extension": extensions.astype("category"),
+            "category": pd.Categorical(
+                extensions.map(EXTENSION_CATEGORIES).fillna("Other"),
+                categories=FILE_CATEGORIES,
+            ),
+            "additions": additions,
+            "deletions": deletions,
+            "changes": additions + deletions,
+        }
+    )
+
+
+def extension_summary(file_index, top=15):
+    """Изменения и количество файлов по расширениям (топ по числу изменённых строк)"""
+    with_extension = file_index[file_index["extension"] != ""]
+    summary = (
+        with_extension.groupby("extension", observed=True)
+        .agg(
+            changes=("changes", "sum"),
+            additions=("additions", "sum"),
+            deletions=("deletions", "sum"),
+            count=("filename", "size"),
+        )
+        .reset_index()
+    )
+    summary["extension"] = summary["extension"].astype(str)
+    return summary.sort_values("changes", ascending=False, kind="stable").head(top)
+
+
+def top_changed_files(file_index, top=15):
+    """Наиболее изменяемые файлы: путь, имя, категория и суммарные изменения"""
+    changes = file_index.groupby("filename", observed=True)["changes"].sum()
+    top_files = changes.sort_values(ascending=False, kind="stable").head(top)
+    paths = top_files.index.astype(str)
+    categories = file_index.drop_duplicates("filename").set_index("filename")[
+        "category"
+    ]
+    return pd.DataFrame(
+        {
+            "path": paths,
+            "name": [os.path.basename(path) for path in paths],
+            "category": categories.reindex(top_files.index).astype(str).to_numpy(),
+            "changes": top_files.to_numpy(),
+        }
+    )
+
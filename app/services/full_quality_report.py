@@ -1,12 +1,22 @@
 from app.models.llm_service import ask_yandex_gpt
+from app.utils.metrics import get_registry
+from app.utils.tracing import set_attributes, traced
 from datetime import datetime
 
+REPORTS = get_registry().counter(
+    "quality_reports_total",
+    "Сформированные отчёты (format — markdown или pdf, result — ok, empty, error)",
+    ("format", "result"),
+)
 
+
+@traced("report.full_quality")
 def generate_full_quality_report(commits: list) -> str:
     """
     Генерирует единый LLM-отчет на основе всех `llm_summary` из коммитов.
     """
     if not commits:
+        REPORTS.inc(format="markdown", result="empty")
         return "Нет коммитов для анализа."
 
     summaries = []
@@ -20,6 +30,11 @@ def generate_full_quality_report(commits: list) -> str:
             summaries.append(f"📦 Commit: {sha} — {author} — {date}\n{summary}")
 
     combined_diff_summary = "\n\n".join(summaries)
+    set_attributes(
+        commits=len(commits),
+        reviewed=len(summaries),
+        summary_bytes=len(combined_diff_summary),
+    )
     try:
         date_from = datetime.strptime(
             str(commits[-1].get("date")), "%Y-%m-%d %H:%M:%S%z"
@@ -68,11 +83,14 @@ def generate_full_quality_report(commits: list) -> str:
     Вот анализы коммитов:\n\n{combined_diff_summary}
         """
 
-    return ask_yandex_gpt(prompt)
+    report = ask_yandex_gpt(prompt)
+    REPORTS.inc(format="markdown", result="ok")
+    return report
 
 
-def get_pdf_download_link(markdown_content, filename, link_text):
-    """Создает ссылку для скачивания отчета в формате PDF с улучшенным стилем"""
+@traced("report.pdf")
+def render_pdf(markdown_content: str) -> bytes:
+    """Отчёт в PDF (байты) с фирменным оформлением"""
     from reportlab.lib.pagesizes import A4
     from reportlab.pdfbase import pdfmetrics
     from reportlab.pdfbase.ttfonts import TTFont
@@ -81,7 +99,7 @@ def get_pdf_download_link(markdown_content, filename, link_text):
     from reportlab.lib.units import inch
     from reportlab.lib.enums import TA_LEFT, TA_CENTER
     from reportlab.lib.colors import HexColor
-    import base64, io, os, traceback
+    import io, os
 
     try:
         font_path = os.path.join("fonts", "DejaVuSans.ttf")
@@ -144,9 +162,19 @@ def get_pdf_download_link(markdown_content, filename, link_text):
                 elements.append(Spacer(1, 0.1 * inch))
 
         doc.build(elements)
-        pdf_bytes.seek(0)
+    except Exception:
+        REPORTS.inc(format="pdf", result="error")
+        raise
+    REPORTS.inc(format="pdf", result="ok")
+    return pdf_bytes.getvalue()
+
 
-        b64 = base64.b64encode(pdf_bytes.read()).decode()
+def get_pdf_download_link(markdown_content, filename, link_text):
+    """Создает ссылку для скачивания отчета в формате PDF с улучшенным стилем"""
+    import base64, traceback
+
+    try:
+        b64 = base64.b64encode(render_pdf(markdown_content)).decode()
         href = f"""
         <a href="data:application/pdf;base64,{b64}" download="{filename}" 
            style="text-decoration: none; color: #EF3124; font-weight: 500; 
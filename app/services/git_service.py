@@ -1,27 +1,134 @@
 import os
+import time
 from typing import List, Dict, Any
 from datetime import datetime
-from github import Github
 from typing import Union
 from datetime import timedelta
 from dotenv import load_dotenv
+from collections.abc import Mapping
+from app.models.commit_record import as_record
 from app.models.llm_service import ask_qwen, revise_code_review_with_gemini
+from app.utils.cancellation import check_cancelled
 from app.utils.criteria_loader import load_review_criteria
+from app.utils.metrics import get_registry
+from app.utils.rate_limiter import get_rate_limiter
+from app.utils.tracing import set_attributes, span, traced
 
+load_dotenv()
 
-from app.services.full_quality_report import (
-    generate_full_quality_report,
-    get_pdf_download_link,
+# Адрес GitHub REST API; для бенчмарков можно указать локальный двойник (app/stand_ins)
+GITHUB_BASE_URL = os.getenv("GITHUB_BASE_URL", "https://api.github.com")
+# Остаток лимита GitHub API, при котором запросы всех потоков приостанавливаются
+# до его сброса (частоту запросов ограничивает GITHUB_RPM, см. rate_limiter)
+GITHUB_RATE_RESERVE = int(os.getenv("GITHUB_RATE_RESERVE", "50"))
+
+_metrics = get_registry()
+GITHUB_REQUESTS = _metrics.counter(
+    "github_requests_total",
+    "Запросы к GitHub API (repo, org, list — страница списка, commit, count)",
+    ("endpoint",),
+)
+GITHUB_RATE_LIMIT_REMAINING = _metrics.gauge(
+    "github_rate_limit_remaining", "Остаток лимита GitHub API по последнему ответу"
+)
+GITHUB_RATE_LIMIT_RESET = _metrics.gauge(
+    "github_rate_limit_reset_timestamp_seconds",
+    "Время сброса лимита GitHub API (Unix)",
+)
+REVIEWS = _metrics.counter(
+    "commit_reviews_total",
+    "LLM-ревью коммитов (revised — после ревизии, raw — без неё, failed — ошибка)",
+    ("result",),
 )
-
-load_dotenv()
 
 
 class GitService:
-    def __init__(self):
+    def __init__(self, base_url: str = None):
         self.github_token = os.getenv("GITHUB_TOKEN")
-        self.github_client = Github(self.github_token)
+        self.base_url = base_url or GITHUB_BASE_URL
+        self._github_client = None
+
+    @property
+    def github_client(self):
+        """Клиент PyGithub; создаётся при первом обращении к GitHub"""
+        if self._github_client is None:
+            from github import Github
 
+            self._github_client = Github(self.github_token, base_url=self.base_url)
+        return self._github_client
+
+    def _rate_limit_remaining(self):
+        """
+        Остаток лимита GitHub API из заголовков последнего ответа (без запроса);
+        заодно обновляет метрики лимита. Если остаток меньше GITHUB_RATE_RESERVE,
+        общий лимитер приостанавливает запросы всех потоков до сброса лимита.
+        """
+        requester = self.github_client.requester
+        remaining, _ = requester.rate_limiting
+        if remaining < 0:
+            return None
+        reset_at = requester.rate_limiting_resettime
+        GITHUB_RATE_LIMIT_REMAINING.set(remaining)
+        GITHUB_RATE_LIMIT_RESET.set(reset_at)
+        if remaining < GITHUB_RATE_RESERVE and reset_at > time.time():
+            print(
+                f"⏳ GitHub: осталось {remaining} запросов, "
+                f"пауза до сброса лимита ({reset_at - time.time():.0f} с)"
+            )
+            get_rate_limiter("github").pause(reset_at - time.time())
+        return remaining
+
+    def _throttle(self):
+        """
+        Ждёт места в общем для процесса бюджете запросов к GitHub API: его делят
+        все потоки (задачи интерфейса, параллельная загрузка репозиториев).
+        """
+        started = time.perf_counter()
+        get_rate_limiter("github").acquire(0)
+        waited = time.perf_counter() - started
+        if waited > 0.01:
+            set_attributes(rate_limit_wait=round(waited, 3))
+
+    def _get_repo(self, repo_name: str):
+        self._throttle()
+        GITHUB_REQUESTS.inc(endpoint="repo")
+        return self.github_client.get_repo(repo_name)
+
+    def count_commits(self, paginated_list, repo_name: str = None) -> int:
+        """Число коммитов в списке (отдельный запрос GitHub API с per_page=1)"""
+        with span("github.total_count", repo=repo_name):
+            self._throttle()
+            GITHUB_REQUESTS.inc(endpoint="count")
+            return paginated_list.totalCount
+
+    def iter_pages(self, paginated_list, repo_name: str = None):
+        """
+        Обходит PaginatedList PyGithub, оборачивая загрузку каждой страницы
+        в span `github.page` (номер страницы и остаток лимита после запроса).
+        """
+        per_page = self.github_client.per_page
+        iterator = iter(paginated_list)
+        end = object()
+        index = 0
+        while True:
+            if index % per_page:
+                item = next(iterator, end)
+            else:
+                with span(
+                    "github.page", repo=repo_name, page=index // per_page + 1
+                ) as current:
+                    self._throttle()
+                    GITHUB_REQUESTS.inc(endpoint="list")
+                    item = next(iterator, end)
+                    current.set_attribute(
+                        "rate_limit_remaining", self._rate_limit_remaining()
+                    )
+            if item is end:
+                return
+            index += 1
+            yield item
+
+    @traced("github.get_developer_mrs")
     def get_developer_mrs(
         self,
         developer_username: str,
@@ -55,12 +162,13 @@ class GitService:
         print(f"Поиск PR от {developer_username} в репозитории {repo_name}")
         print(f"Период: с {start_date} по {end_date}")
 
-        repo = self.github_client.get_repo(repo_name)
+        set_attributes(repo=repo_name, author=developer_username)
+        repo = self._get_repo(repo_name)
 
         pull_requests = repo.get_pulls(state="all")
 
         developer_mrs = []
-        for pr in pull_requests:
+        for pr in self.iter_pages(pull_requests, repo_name):
 
             if pr.user.login != developer_username:
                 continue
@@ -99,9 +207,11 @@ class GitService:
 
             developer_mrs.append(mr_data)
 
+        set_attributes(pull_requests=len(developer_mrs))
         print(f"Найдено {len(developer_mrs)} PR от разработчика {developer_username}")
         return developer_mrs
 
+    @traced("github.get_all_commit_authors")
     def get_all_commit_authors(self, repo_name: str) -> List[Dict[str, Any]]:
         """
         Получает список всех авторов коммитов в репозитории
@@ -114,8 +224,9 @@ class GitService:
         """
         try:
             print(f"Получение списка авторов коммитов для репозитория {repo_name}")
+            set_attributes(repo=repo_name)
 
-            repo = self.github_client.get_repo(repo_name)
+            repo = self._get_repo(repo_name)
 
             authors_dict = {}
 
@@ -123,7 +234,7 @@ class GitService:
 
             count = 0
 
-            for commit in all_commits:
+            for commit in self.iter_pages(all_commits, repo_name):
                 count += 1
                 if count % 100 == 0:
                     print(f"Обработано {count} коммитов...")
@@ -174,6 +285,7 @@ class GitService:
             authors_list = list(authors_dict.values())
             authors_list.sort(key=lambda x: x["commit_count"], reverse=True)
 
+            set_attributes(commits=count, authors=len(authors_list))
             print(f"Найдено {len(authors_list)} уникальных авторов")
             return authors_list
 
@@ -181,6 +293,36 @@ class GitService:
             print(f"Ошибка при получении авторов коммитов: {e}")
             return []
 
+    @traced("github.list_org_repositories")
+    def list_org_repositories(
+        self, org: str, include_forks: bool = False, include_archived: bool = False
+    ) -> List[str]:
+        """
+        Репозитории организации (или пользователя, если организации с таким
+        именем нет) в формате "владелец/репозиторий". Форки по умолчанию
+        пропускаются: их коммиты совпадают с коммитами исходного репозитория.
+        """
+        from github import UnknownObjectException
+
+        set_attributes(org=org)
+        self._throttle()
+        GITHUB_REQUESTS.inc(endpoint="org")
+        try:
+            owner = self.github_client.get_organization(org)
+            repos = owner.get_repos(type="all")
+        except UnknownObjectException:
+            owner = self.github_client.get_user(org)
+            repos = owner.get_repos()
+        names = [
+            repo.full_name
+            for repo in self.iter_pages(repos, org)
+            if (include_forks or not repo.fork)
+            and (include_archived or not repo.archived)
+        ]
+        set_attributes(repos=len(names))
+        print(f"{org}: найдено {len(names)} репозиториев")
+        return names
+
     def _count_files_changed(self, pull_request) -> int:
         """Подсчитывает количество измененных файлов в PR"""
         return pull_request.changed_files
@@ -244,24 +386,12 @@ class GitService:
         _, ext = os.path.splitext(filename)
         return ext.lower() in code_extensions
 
-    def get_repository_commits(
-        self,
-        repo_name: str,
-        developer_username: str = None,
-        start_date=None,
-        end_date=None,
-        load_all_history: bool = False,
-        use_llm: bool = True,  # 👈 добавили флаг
-        full_report: bool = False,
-    ) -> List[Dict[str, Any]]:
-        """
-        Получает историю коммитов репозитория с возможностью фильтрации и LLM-анализом.
-        """
+    def _normalize_period(self, start_date, end_date, load_all_history: bool = False):
+        """Приводит границы периода к datetime (строки 'YYYY-MM-DD', date или datetime)"""
         import datetime
 
         if load_all_history:
             start_date = None
-            print("Запрошена полная история коммитов")
         else:
             if isinstance(start_date, str):
                 start_date = datetime.datetime.strptime(start_date, "%Y-%m-%d")
@@ -287,6 +417,27 @@ class GitService:
         if end_date is None:
             end_date = datetime.datetime.now()
 
+        return start_date, end_date
+
+    @traced("github.list_commits")
+    def list_commits(
+        self,
+        repo_name: str,
+        developer_username: str = None,
+        start_date=None,
+        end_date=None,
+        load_all_history: bool = False,
+    ):
+        """
+        Возвращает ленивый постраничный список коммитов (PyGithub PaginatedList).
+        Файлы и статистика коммита подгружаются только при обращении к ним.
+        """
+        if load_all_history:
+            print("Запрошена полная история коммитов")
+        start_date, end_date = self._normalize_period(
+            start_date, end_date, load_all_history
+        )
+
         print(f"Поиск коммитов в репозитории {repo_name}")
         if developer_username:
             print(f"Автор: {developer_username}")
@@ -296,66 +447,70 @@ class GitService:
         else:
             print(f"Период: вся история по {end_date}")
 
-        repo = self.github_client.get_repo(repo_name)
-
-        commits = []
-        try:
-            author = developer_username if developer_username else None
-            all_commits = repo.get_commits(
-                author=author, since=start_date, until=end_date
+        set_attributes(repo=repo_name, author=developer_username)
+        repo = self._get_repo(repo_name)
+        filters = {"until": end_date}
+        if developer_username:
+            filters["author"] = developer_username
+        if start_date:
+            filters["since"] = start_date
+        return repo.get_commits(**filters)
+
+    def build_commit_data(self, commit) -> Dict[str, Any]:
+        """Собирает словарь коммита вместе с изменёнными файлами и патчами"""
+        with span("github.commit", sha=commit.sha) as current:
+            # Элемент списка коммитов неполный: файлы и статистика — отдельный запрос
+            hydrated = not getattr(commit, "completed", True)
+            current.set_attribute("hydrated", hydrated)
+            if hydrated:
+                self._throttle()
+                GITHUB_REQUESTS.inc(endpoint="commit")
+            commit_data = self._commit_to_dict(commit)
+            current.set_attributes(
+                files=len(commit_data["files"]),
+                patch_bytes=sum(
+                    len(file.get("patch", "")) for file in commit_data["files"]
+                ),
+                rate_limit_remaining=self._rate_limit_remaining(),
             )
-
-            for commit in all_commits:
-                commit_data = {
-                    "sha": commit.sha,
-                    "message": commit.commit.message,
-                    "author": commit.commit.author.name,
-                    "author_email": commit.commit.author.email,
-                    "date": commit.commit.author.date,
-                    "url": commit.html_url,
-                    "stats": {
-                        "additions": commit.stats.additions,
-                        "deletions": commit.stats.deletions,
-                        "total": commit.stats.total,
-                    },
-                    "files": [],
-                }
-                # Изменённые файлы
-                for file in commit.files:
-                    file_data = {
-                        "filename": file.filename,
-                        "status": file.status,
-                        "additions": file.additions,
-                        "deletions": file.deletions,
-                        "changes": file.changes,
-                    }
-                    if hasattr(file, "patch") and file.patch:
-                        file_data["patch"] = file.patch
-                    commit_data["files"].append(file_data)
-
-                # Добавляем LLM-анализа, если включён
-                if use_llm:
-
-                    def extract_attr(file, key, default=""):
-                        if isinstance(file, dict):
-                            return file.get(key, default)
-                        return getattr(file, key, default)
-
-                    try:
-                        file_patches = "\n\n".join(
-                            f"--- {extract_attr(file, 'filename')} ---\n{extract_attr(file, 'patch')}"
-                            for file in commit_data["files"]
-                            if extract_attr(file, "patch")
-                        )
-
-                        criteria = load_review_criteria()
-                        criteria_text = "Вот список критериев для оценки кода:\n\n"
-                        for section in criteria.get("sections", []):
-                            criteria_text += (
-                                f"## {section['title']}\n{section['description']}\n\n"
-                            )
-
-                        prompt = f"""
+        return commit_data
+
+    def _commit_to_dict(self, commit) -> Dict[str, Any]:
+        commit_data = {
+            "sha": commit.sha,
+            "message": commit.commit.message,
+            "author": commit.commit.author.name,
+            "author_email": commit.commit.author.email,
+            "date": commit.commit.author.date,
+            "url": commit.html_url,
+            "stats": {
+                "additions": commit.stats.additions,
+                "deletions": commit.stats.deletions,
+                "total": commit.stats.total,
+            },
+            "files": [],
+        }
+        # Изменённые файлы
+        for file in commit.files:
+            file_data = {
+                "filename": file.filename,
+                "status": file.status,
+                "additions": file.additions,
+                "deletions": file.deletions,
+                "changes": file.changes,
+            }
+            if hasattr(file, "patch") and file.patch:
+                file_data["patch"] = file.patch
+            commit_data["files"].append(file_data)
+        return commit_data
+
+    def _build_review_prompt(self, file_patches: str) -> str:
+        criteria = load_review_criteria()
+        criteria_text = "Вот список критериев для оценки кода:\n\n"
+        for section in criteria.get("sections", []):
+            criteria_text += f"## {section['title']}\n{section['description']}\n\n"
+
+        return f"""
                         Ты — опытный senior-разработчик на Java, Python и PHP с большим опытом code review. 
                         Проанализируй следующий diff кода и предоставь объективный, сбалансированный анализ на русском языке.
 
@@ -395,27 +550,100 @@ class GitService:
                         {file_patches}
                         """
 
-                        raw_review = ask_qwen(prompt)
-                        try:
-                            revised_review = revise_code_review_with_gemini(
-                                diff=file_patches, first_review=raw_review
-                            )
+    @traced("review.commit")
+    def review_commit(
+        self, commit_data: Dict[str, Any], cancel_token=None
+    ) -> Dict[str, Any]:
+        """
+        Добавляет в словарь коммита LLM-анализ (`llm_summary`) его diff.
+        Перед каждым обращением к LLM проверяется токен отмены.
+        """
+
+        def extract_attr(file, key, default=""):
+            if isinstance(file, Mapping):
+                return file.get(key, default)
+            return getattr(file, key, default)
+
+        try:
+            file_patches = "\n\n".join(
+                f"--- {extract_attr(file, 'filename')} ---\n{extract_attr(file, 'patch')}"
+                for file in commit_data["files"]
+                if extract_attr(file, "patch")
+            )
+
+            prompt = self._build_review_prompt(file_patches)
+            set_attributes(sha=commit_data["sha"], diff_bytes=len(file_patches))
 
-                            commit_data["llm_summary"] = revised_review
-                            commit_data["llm_summary_raw"] = raw_review
+            raw_review = ask_qwen(prompt, cancel_token=cancel_token)
+            try:
+                check_cancelled(cancel_token)
+                revised_review = revise_code_review_with_gemini(
+                    diff=file_patches, first_review=raw_review, cancel_token=cancel_token
+                )
+
+                commit_data["llm_summary"] = revised_review
+                commit_data["llm_summary_raw"] = raw_review
+                REVIEWS.inc(result="revised")
 
-                        except Exception as e:
-                            print(f"[Ошибка ревизора Gemini]: {e}")
+            except Exception as e:
+                print(f"[Ошибка ревизора Gemini]: {e}")
 
-                            commit_data["llm_summary"] = raw_review
+                commit_data["llm_summary"] = raw_review
+                REVIEWS.inc(result="raw")
 
-                    except Exception as e:
-                        commit_data["llm_summary"] = f"[Ошибка LLM]: {e}"
+        except Exception as e:
+            commit_data["llm_summary"] = f"[Ошибка LLM]: {e}"
+            REVIEWS.inc(result="failed")
 
-                commits.append(commit_data)
+        return commit_data
 
+    @traced("analysis.repository_commits")
+    def get_repository_commits(
+        self,
+        repo_name: str,
+        developer_username: str = None,
+        start_date=None,
+        end_date=None,
+        load_all_history: bool = False,
+        use_llm: bool = True,  # 👈 добавили флаг
+        full_report: bool = False,
+        cancel_token=None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Получает историю коммитов репозитория с возможностью фильтрации и LLM-анализом.
+        При отмене `cancel_token` бросает OperationCancelled между коммитами
+        (а значит, и между страницами GitHub API) и перед каждым вызовом LLM.
+        """
+        commits = []
+        try:
+            all_commits = self.list_commits(
+                repo_name,
+                developer_username=developer_username,
+                start_date=start_date,
+                end_date=end_date,
+                load_all_history=load_all_history,
+            )
+
+            set_attributes(repo=repo_name, use_llm=use_llm)
+            for commit in self.iter_pages(all_commits, repo_name):
+                check_cancelled(cancel_token)
+                commit_data = self.build_commit_data(commit)
+
+                # Добавляем LLM-анализа, если включён
+                if use_llm:
+                    self.review_commit(commit_data, cancel_token=cancel_token)
+
+                # Патчи уходят в хранилище, в списке остаётся компактная запись
+                commits.append(as_record(commit_data))
+
+            set_attributes(commits=len(commits))
             print(f"Найдено {len(commits)} коммитов")
             if full_report:
+                from app.services.full_quality_report import (
+                    generate_full_quality_report,
+                    get_pdf_download_link,
+                )
+
                 report = generate_full_quality_report(commits)
                 print(report)
 
@@ -0,0 +1,163 @@
+"""
+Объединение идентичностей авторов по нескольким репозиториям: один разработчик
+коммитит с разных email и под логином GitHub. Email и логины, встретившиеся
+в одном коммите, объединяются (система непересекающихся множеств), поэтому
+отчёт по разработчику охватывает все его адреса и репозитории.
+"""
+
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+# 12345+login@users.noreply.github.com или login@users.noreply.github.com
+_NOREPLY_RE = re.compile(r"^(?:\d+\+)?([^@]+)@users\.noreply\.github\.com$", re.I)
+
+
+def _nodes(email: Optional[str], login: Optional[str]) -> List[str]:
+    nodes = []
+    if email:
+        email = email.strip().lower()
+        nodes.append(f"email:{email}")
+        noreply = _NOREPLY_RE.match(email)
+        if noreply:
+            nodes.append(f"login:{noreply.group(1)}")
+    if login:
+        nodes.append(f"login:{login.strip().lower()}")
+    return nodes
+
+
+class IdentityResolver:
+    """
+    Разработчики по всем репозиториям: `add` для каждого коммита (имя, email,
+    логин, репозиторий), затем `resolve` и `developers`. Не потокобезопасен —
+    вызывающий код добавляет коммиты под своей блокировкой.
+    """
+
+    def __init__(self):
+        self._parent: Dict[str, str] = {}
+        self._names: Dict[str, Counter] = defaultdict(Counter)
+        self._repos: Dict[str, Counter] = defaultdict(Counter)
+        self._dates: Dict[str, list] = {}
+
+    def _find(self, node: str) -> str:
+        root = self._parent.setdefault(node, node)
+        while root != self._parent[root]:
+            root = self._parent[root]
+        # Сжатие путей: следующие поиски по этой цепочке — за один шаг
+        while node != root:
+            self._parent[node], node = root, self._parent[node]
+        return root
+
+    def _union(self, first: str, second: str):
+        first, second = self._find(first), self._find(second)
+        if first != second:
+            # Корень — логин, если он есть: `resolve` возвращает его как id
+            if first.startswith("email:") and second.startswith("login:"):
+                first, second = second, first
+            self._parent[second] = first
+
+    def add(
+        self,
+        name: Optional[str],
+        email: Optional[str],
+        login: Optional[str] = None,
+        repo: Optional[str] = None,
+        date=None,
+    ):
+        """Учитывает коммит; возвращает узел автора или None без email и логина"""
+        nodes = _nodes(email, login)
+        if not nodes:
+            return None
+        node = nodes[0]
+        self._find(node)
+        for other in nodes[1:]:
+            self._union(node, other)
+        if name:
+            self._names[node][name] += 1
+        if repo:
+            self._repos[node][repo] += 1
+        if date is not None:
+            first, last = self._dates.get(node, (date, date))
+            self._dates[node] = (min(first, date), max(last, date))
+        return node
+
+    def resolve(self, email: Optional[str], login: Optional[str] = None):
+        """
+        Идентификатор разработчика: логин GitHub, если известен, иначе email;
+        None — такой автор в коммитах не встречался.
+        """
+        for node in _nodes(email, login):
+            if node in self._parent:
+                return self._find(node).partition(":")[2]
+        return None
+
+    def developers(self) -> List[Dict[str, Any]]:
+        """
+        Объединённые разработчики в формате `get_all_commit_authors` (name,
+        email, github_login, commit_count) с дополнительными полями: `id`,
+        все `emails` и `logins`, коммиты по репозиториям. По убыванию коммитов.
+        """
+        groups = defaultdict(list)
+        for node in list(self._parent):
+            groups[self._find(node)].append(node)
+
+        developers = []
+        for root, nodes in groups.items():
+            names, repos = Counter(), Counter()
+            dates = [self._dates[node] for node in nodes if node in self._dates]
+            for node in nodes:
+                names.update(self._names.get(node, {}))
+                repos.update(self._repos.get(node, {}))
+            # Основной email — тот, с которого сделано больше всего коммитов
+            email_nodes = sorted(
+                (node for node in nodes if node.startswith("email:")),
+                key=lambda node: -sum(self._repos.get(node, {}).values()),
+            )
+            emails = [node.partition(":")[2] for node in email_nodes]
+            logins = sorted(
+                node.partition(":")[2] for node in nodes if node.startswith("login:")
+            )
+            developer_id = root.partition(":")[2]
+            developers.append(
+                {
+                    "id": developer_id,
+                    "name": names.most_common(1)[0][0] if names else developer_id,
+                    "email": emails[0] if emails else None,
+                    "github_login": developer_id if root.startswith("login:") else None,
+                    "emails": emails,
+                    "logins": logins,
+                    "repos": dict(repos.most_common()),
+                    "commit_count": sum(repos.values()),
+                    "first_commit_date": min((d[0] for d in dates), default=None),
+                    "last_commit_date": max((d[1] for d in dates), default=None),
+                }
+            )
+        developers.sort(key=lambda developer: developer["commit_count"], reverse=True)
+        return developers
+
+
+def author_from_identity(value: str) -> Dict[str, Any]:
+    """Автор, указанный логином GitHub или email, в формате `get_all_commit_authors`"""
+    is_email = "@" in value
+    return {
+        "name": value,
+        "email": value if is_email else None,
+        "github_login": None if is_email else value,
+        "commit_count": 0,
+    }
+
+
+def select_developers(
+    resolver: IdentityResolver, identities: Iterable[str]
+) -> Optional[set]:
+    """
+    Идентификаторы разработчиков по логинам или email (как в `--author`);
+    None — фильтр не задан, подходят все разработчики.
+    """
+    identities = list(identities)
+    if not identities:
+        return None
+    return {
+        resolver.resolve(*((value, None) if "@" in value else (None, value)))
+        for value in identities
+    }
@@ -0,0 +1,676 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.models.commit_record import CommitRecord, as_record, get_patch_store
+from app.utils.cancellation import CancellationToken, OperationCancelled
+
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", os.path.join("data", "jobs.sqlite3"))
+# Аренда выполняющейся задачи: владелец продлевает её, пока задача идёт; задачу
+# с истёкшей арендой (процесс-владелец остановлен) другие процессы возвращают
+# в очередь
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+# Сколько дней хранить завершённые задачи (0 — не удалять) и как часто (в часах)
+# рабочие потоки удаляют устаревшие задачи и патчи, на которые больше нет ссылок
+JOBS_RETENTION_DAYS = float(os.getenv("JOBS_RETENTION_DAYS", "30"))
+JOBS_GC_INTERVAL_HOURS = float(os.getenv("JOBS_GC_INTERVAL_HOURS", "24"))
+
+# Статусы задач
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress_done INTEGER NOT NULL DEFAULT 0,
+    progress_total INTEGER,
+    error TEXT,
+    result TEXT,
+    owner TEXT,
+    heartbeat_at REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_results (
+    job_id TEXT NOT NULL,
+    sha TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    reviewed INTEGER NOT NULL DEFAULT 1,
+    priority INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (job_id, sha)
+);
+"""
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Не удаётся сериализовать {type(value).__name__}")
+
+
+def encode_commit(commit: Dict[str, Any]) -> str:
+    """
+    Сериализует коммит в JSON (даты — в ISO-формате). Патчи файлов уходят в
+    общее хранилище патчей, в JSON остаются только их ключи.
+    """
+    return json.dumps(
+        as_record(commit).to_dict(), default=_json_default, ensure_ascii=False
+    )
+
+
+def decode_commit(payload: str) -> CommitRecord:
+    """Восстанавливает коммит из JSON как `CommitRecord` с `date` в datetime"""
+    commit = json.loads(payload)
+    if isinstance(commit.get("date"), str):
+        try:
+            commit["date"] = datetime.fromisoformat(commit["date"])
+        except ValueError:
+            pass
+    return CommitRecord.from_dict(commit)
+
+
+class JobQueue:
+    """
+    Персистентная очередь фоновых задач на SQLite.
+    Задачи выполняются рабочими потоками вне обработчиков Streamlit, поэтому
+    переживают перезапуски скрипта, обновление страницы и истечение сессии.
+    Результаты по каждому коммиту сохраняются сразу (checkpoint), и прерванная
+    задача после перезапуска процесса продолжается с места остановки.
+
+    Одну базу могут использовать несколько процессов (интерфейс, HTTP API, CLI).
+    Выполняющаяся задача принадлежит очереди, которая её забрала (`owner`),
+    и та продлевает аренду (`heartbeat_at`); в очередь возвращаются только
+    задачи, чья аренда истекла или чей процесс-владелец на этом хосте завершён.
+    """
+
+    def __init__(self, db_path: str = JOBS_DB_PATH, lease_seconds: float = None):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds or JOB_LEASE_SECONDS
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._handlers: Dict[str, Callable] = {}
+        self._workers: List[threading.Thread] = []
+        self._wakeup = threading.Event()
+        self._tokens: Dict[str, CancellationToken] = {}
+        self._tokens_lock = threading.Lock()
+        self._heartbeat: Optional[threading.Thread] = None
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            columns = {
+                row["name"]
+                for row in conn.execute("PRAGMA table_info(job_results)").fetchall()
+            }
+            # Базы, созданные до появления приоритетов ревью
+            if "reviewed" not in columns:
+                conn.execute(
+                    "ALTER TABLE job_results ADD COLUMN reviewed INTEGER NOT NULL DEFAULT 1"
+                )
+                conn.execute(
+                    "ALTER TABLE job_results ADD COLUMN priority INTEGER NOT NULL DEFAULT 0"
+                )
+            # Базы, созданные до появления задач с общим результатом (не по коммитам)
+            job_columns = {
+                row["name"]
+                for row in conn.execute("PRAGMA table_info(jobs)").fetchall()
+            }
+            if "result" not in job_columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN result TEXT")
+            # Базы, созданные до появления аренды выполняющихся задач
+            if "owner" not in job_columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+                conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at REAL")
+
+    @contextmanager
+    def _connect(self):
+        """Короткоживущее соединение: commit при успехе, rollback при ошибке"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def register_handler(self, kind: str, handler: Callable):
+        """Регистрирует обработчик `handler(queue, job)` для задач типа `kind`"""
+        self._handlers[kind] = handler
+
+    def _insert(
+        self, kind: str, params: Dict[str, Any], status: str, owner: str = None
+    ) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, params, status, owner, heartbeat_at, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_id,
+                    kind,
+                    json.dumps(params, default=_json_default, ensure_ascii=False),
+                    status,
+                    owner,
+                    now if owner else None,
+                    now,
+                    now,
+                ),
+            )
+        return job_id
+
+    def submit(self, kind: str, params: Dict[str, Any]) -> str:
+        """Ставит задачу в очередь и возвращает её идентификатор"""
+        job_id = self._insert(kind, params, QUEUED)
+        self._wakeup.set()
+        return job_id
+
+    def run(
+        self,
+        kind: str,
+        params: Dict[str, Any],
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> Dict[str, Any]:
+        """
+        Выполняет задачу в текущем потоке, минуя рабочие потоки, и возвращает
+        её итоговое состояние. Задача сразу записывается как выполняющаяся
+        в аренде этой очереди; пока аренда продлевается, `recover` других
+        процессов с той же базой её не возвращает в очередь. Результаты видны
+        им (и интерфейсу) так же, как у обычных задач.
+        `cancel_token` позволяет отменить сразу несколько таких задач.
+        """
+        job_id = self._insert(kind, params, RUNNING, owner=self.owner)
+        self._run_job(self.get(job_id), cancel_token)
+        return self.get(job_id)
+
+    def find_latest(
+        self,
+        kind: str,
+        params: Dict[str, Any],
+        status: str = DONE,
+        max_age: Optional[float] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Последняя задача типа `kind` со статусом `status`, параметры которой
+        совпадают с `params` (сравниваются только переданные ключи).
+        `max_age` — максимальный возраст результата в секундах.
+        """
+        expected = json.loads(json.dumps(params, default=_json_default))
+        since = time.time() - max_age if max_age is not None else 0
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, params FROM jobs "
+                "WHERE kind = ? AND status = ? AND updated_at >= ? "
+                "ORDER BY updated_at DESC",
+                (kind, status, since),
+            ).fetchall()
+        for row in rows:
+            job_params = json.loads(row["params"])
+            if all(job_params.get(key) == value for key, value in expected.items()):
+                return self.get(row["id"])
+        return None
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Возвращает состояние задачи или None, если такой задачи нет.
+        Помимо полей задачи содержит `reviews_done` и `reviews_pending`;
+        `result` — результат задачи из `set_result` (или None).
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            counts = conn.execute(
+                "SELECT SUM(reviewed = 1) AS done, SUM(reviewed = 0) AS pending "
+                "FROM job_results WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["reviews_done"] = counts["done"] or 0
+        job["reviews_pending"] = counts["pending"] or 0
+        return job
+
+    def update_progress(self, job_id: str, done: int = None, total: int = None):
+        with self._connect() as conn:
+            if done is not None:
+                conn.execute(
+                    "UPDATE jobs SET progress_done = ?, updated_at = ? WHERE id = ?",
+                    (done, time.time(), job_id),
+                )
+            if total is not None:
+                conn.execute(
+                    "UPDATE jobs SET progress_total = ?, updated_at = ? WHERE id = ?",
+                    (total, time.time(), job_id),
+                )
+
+    def set_result(self, job_id: str, result: Any):
+        """Сохраняет результат задачи целиком (список авторов, текст отчёта)"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET result = ?, updated_at = ? WHERE id = ?",
+                (
+                    json.dumps(result, default=_json_default, ensure_ascii=False),
+                    time.time(),
+                    job_id,
+                ),
+            )
+
+    def checkpoint(
+        self,
+        job_id: str,
+        position: int,
+        commit: Dict[str, Any],
+        reviewed: bool = True,
+    ):
+        """
+        Сохраняет результат по одному коммиту и обновляет счётчик прогресса.
+        `reviewed=False` — коммит загружен, но LLM-ревью ещё предстоит.
+        OperationCancelled — задачу отменили (в том числе из другого процесса).
+        """
+        with self._connect() as conn:
+            self._check_active(conn, job_id)
+            conn.execute(
+                "INSERT INTO job_results (job_id, sha, position, payload, reviewed) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (job_id, sha) DO UPDATE SET "
+                "payload = excluded.payload, reviewed = excluded.reviewed",
+                (job_id, commit["sha"], position, encode_commit(commit), int(reviewed)),
+            )
+            now = time.time()
+            conn.execute(
+                "UPDATE jobs SET progress_done = "
+                "(SELECT COUNT(*) FROM job_results WHERE job_id = ?), updated_at = ?, "
+                "heartbeat_at = CASE WHEN owner = ? THEN ? ELSE heartbeat_at END "
+                "WHERE id = ?",
+                (job_id, now, self.owner, now, job_id),
+            )
+
+    def set_priorities(self, job_id: str, priorities: Dict[str, int]):
+        """Задаёт приоритеты ревью, не затрагивая запрошенные пользователем вручную"""
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE job_results SET priority = ? "
+                "WHERE job_id = ? AND sha = ? AND priority >= 0",
+                [(priority, job_id, sha) for sha, priority in priorities.items()],
+            )
+
+    def prioritize(self, job_id: str, sha: str, priority: int):
+        """Поднимает приоритет ревью коммита (допускается сокращённый SHA)"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE job_results SET priority = ? "
+                "WHERE job_id = ? AND sha LIKE ? AND reviewed = 0",
+                (priority, job_id, f"{sha}%"),
+            )
+
+    def next_pending_review(
+        self, job_id: str, exclude: Iterable[str] = ()
+    ) -> Optional[Tuple[int, CommitRecord]]:
+        """
+        Позиция и данные следующего коммита для ревью с наивысшим приоритетом.
+        `exclude` — SHA коммитов, ревью которых уже выполняется другими потоками.
+        OperationCancelled — задачу отменили (в том числе из другого процесса).
+        """
+        exclude = list(exclude)
+        placeholders = ", ".join("?" * len(exclude))
+        with self._connect() as conn:
+            self._check_active(conn, job_id)
+            row = conn.execute(
+                "SELECT position, payload FROM job_results "
+                "WHERE job_id = ? AND reviewed = 0 "
+                f"AND sha NOT IN ({placeholders}) "
+                "ORDER BY priority, position LIMIT 1",
+                (job_id, *exclude),
+            ).fetchone()
+        if row is None:
+            return None
+        return row["position"], decode_commit(row["payload"])
+
+    def done_shas(self, job_id: str) -> set:
+        """SHA коммитов, результаты по которым уже сохранены"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT sha FROM job_results WHERE job_id = ?", (job_id,)
+            ).fetchall()
+        return {row["sha"] for row in rows}
+
+    def results(self, job_id: str, reviews: bool = True) -> List[CommitRecord]:
+        """
+        Сохранённые коммиты задачи в исходном порядке выдачи GitHub API.
+        Патчи в память не загружаются — они читаются из хранилища по обращению.
+        `reviews=False` — без текстов LLM-ревью (список коммитов в интерфейсе):
+        у проверенных коммитов только флаг `llm_reviewed`, а само ревью
+        выбранного коммита читает `result()`.
+        """
+        columns = "payload, 0 AS llm_reviewed"
+        if not reviews:
+            columns = (
+                "json_remove(payload, '$.llm_summary', '$.llm_summary_raw') AS payload, "
+                "COALESCE(json_extract(payload, '$.llm_summary'), '') != '' "
+                "AS llm_reviewed"
+            )
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {columns} FROM job_results WHERE job_id = ? ORDER BY position",
+                (job_id,),
+            ).fetchall()
+        commits = []
+        for row in rows:
+            commit = decode_commit(row["payload"])
+            if row["llm_reviewed"]:
+                commit["llm_reviewed"] = True
+            commits.append(commit)
+        return commits
+
+    def result(self, job_id: str, sha: str) -> Optional[CommitRecord]:
+        """Сохранённый коммит задачи целиком (с LLM-ревью) или None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT payload FROM job_results WHERE job_id = ? AND sha = ?",
+                (job_id, sha),
+            ).fetchone()
+        return decode_commit(row["payload"]) if row else None
+
+    def _check_active(self, conn: sqlite3.Connection, job_id: str):
+        """
+        Бросает OperationCancelled, если задачу отменили или её аренду забрал
+        другой процесс: отмена через базу (HTTP API, другой процесс) не доходит
+        до токена отмены этой очереди иначе, чем через общую базу.
+        """
+        row = conn.execute(
+            "SELECT status, owner FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return
+        lost = row["status"] == RUNNING and row["owner"] not in (None, self.owner)
+        if row["status"] == CANCELLED or lost:
+            self._signal_cancelled(job_id)
+            raise OperationCancelled()
+
+    def _signal_cancelled(self, job_id: str):
+        with self._tokens_lock:
+            token = self._tokens.get(job_id)
+        if token is not None:
+            token.cancel()
+
+    def prune(self, max_age_days: float = JOBS_RETENTION_DAYS) -> int:
+        """
+        Удаляет завершённые задачи (и их результаты по коммитам), которые
+        не обновлялись дольше `max_age_days` дней. Возвращает число задач.
+        """
+        if max_age_days <= 0:
+            return 0
+        since = time.time() - max_age_days * 86400
+        with self._connect() as conn:
+            finished = (DONE, FAILED, CANCELLED)
+            conn.execute(
+                "DELETE FROM job_results WHERE job_id IN (SELECT id FROM jobs "
+                "WHERE status IN (?, ?, ?) AND updated_at < ?)",
+                (*finished, since),
+            )
+            return conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?, ?) AND updated_at < ?",
+                (*finished, since),
+            ).rowcount
+
+    def patch_keys(self) -> set:
+        """Ключи патчей, на которые ссылаются сохранённые коммиты всех задач"""
+        keys = set()
+        with self._connect() as conn:
+            for row in conn.execute("SELECT payload FROM job_results"):
+                for file in json.loads(row["payload"]).get("files") or []:
+                    if file.get("patch_key"):
+                        keys.add(file["patch_key"])
+        return keys
+
+    def collect_garbage(
+        self, retention_days: float = JOBS_RETENTION_DAYS
+    ) -> Dict[str, int]:
+        """
+        Удаляет устаревшие задачи, затем патчи, на которые больше не ссылается
+        ни один сохранённый коммит. Хранилище патчей (`PATCHES_DIR`) должно
+        принадлежать этой базе задач.
+        """
+        jobs = self.prune(retention_days)
+        patches = get_patch_store().sweep(self.patch_keys())
+        if jobs or patches:
+            print(f"Очистка: удалено задач {jobs}, патчей {patches}")
+        return {"jobs": jobs, "patches": patches}
+
+    def _maintenance_loop(self):
+        while True:
+            try:
+                self.collect_garbage()
+            except (OSError, sqlite3.Error) as e:
+                print(f"Ошибка очистки задач и патчей: {e}")
+            time.sleep(JOBS_GC_INTERVAL_HOURS * 3600)
+
+    def _set_status(self, job_id: str, status: str, error: str = None):
+        """
+        Завершает выполняющуюся задачу этой очереди (отменённую задачу или
+        задачу, аренду которой уже забрал другой процесс, статус не меняет).
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ?, "
+                "owner = NULL, heartbeat_at = NULL "
+                "WHERE id = ? AND status = ? AND owner = ?",
+                (status, error, time.time(), job_id, RUNNING, self.owner),
+            )
+
+    def _claim_next(self) -> Optional[Dict[str, Any]]:
+        """Атомарно забирает самую старую задачу из очереди и берёт её в аренду"""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                (QUEUED,),
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            conn.execute(
+                "UPDATE jobs SET status = ?, owner = ?, heartbeat_at = ?, "
+                "updated_at = ? WHERE id = ?",
+                (RUNNING, self.owner, now, now, row["id"]),
+            )
+        return self.get(row["id"])
+
+    def _is_stale(self, owner: Optional[str], heartbeat_at: Optional[float]) -> bool:
+        """Аренда истекла или процесс-владелец на этом хосте уже завершён"""
+        if owner is None or heartbeat_at is None:
+            return True
+        if heartbeat_at < time.time() - self.lease_seconds:
+            return True
+        host, _, rest = owner.partition(":")
+        pid = rest.partition(":")[0]
+        if host != socket.gethostname() or not pid.isdigit():
+            return False
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            pass
+        return False
+
+    def recover(self) -> int:
+        """
+        Возвращает в очередь задачи, прерванные остановкой процесса-владельца.
+        Задачи, которые другой процесс выполняет и продлевает, не трогает.
+        Возвращает число возвращённых задач.
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, owner, heartbeat_at FROM jobs WHERE status = ?",
+                (RUNNING,),
+            ).fetchall()
+            recovered = 0
+            for row in rows:
+                if not self._is_stale(row["owner"], row["heartbeat_at"]):
+                    continue
+                # Условие на владельца и аренду: если её успели продлить, не трогаем
+                recovered += conn.execute(
+                    "UPDATE jobs SET status = ?, owner = NULL, heartbeat_at = NULL, "
+                    "updated_at = ? WHERE id = ? AND status = ? "
+                    "AND owner IS ? AND heartbeat_at IS ?",
+                    (
+                        QUEUED,
+                        time.time(),
+                        row["id"],
+                        RUNNING,
+                        row["owner"],
+                        row["heartbeat_at"],
+                    ),
+                ).rowcount
+        if recovered:
+            print(f"Возвращено в очередь прерванных задач: {recovered}")
+        return recovered
+
+    def _renew_leases(self):
+        """
+        Продлевает аренду задач, которые сейчас выполняет эта очередь, и
+        сигналит токены задач, отменённых через базу или потерявших аренду:
+        так прерываются и текущие HTTP-запросы, а не только следующий checkpoint.
+        """
+        with self._tokens_lock:
+            job_ids = list(self._tokens)
+        if not job_ids:
+            return
+        placeholders = ", ".join("?" * len(job_ids))
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? "
+                f"WHERE owner = ? AND status = ? AND id IN ({placeholders})",
+                (time.time(), self.owner, RUNNING, *job_ids),
+            )
+            rows = conn.execute(
+                f"SELECT id, status, owner FROM jobs WHERE id IN ({placeholders})",
+                job_ids,
+            ).fetchall()
+        for row in rows:
+            lost = row["status"] == RUNNING and row["owner"] != self.owner
+            if row["status"] == CANCELLED or lost:
+                self._signal_cancelled(row["id"])
+
+    def _heartbeat_loop(self):
+        # Не реже раза в 5 секунд: по продлению видна и отмена из другого процесса
+        interval = min(5.0, max(0.5, self.lease_seconds / 4))
+        while True:
+            time.sleep(interval)
+            try:
+                self._renew_leases()
+            except sqlite3.Error as e:
+                print(f"Ошибка продления аренды задач: {e}")
+
+    def _ensure_heartbeat(self):
+        with self._tokens_lock:
+            if self._heartbeat is not None:
+                return
+            self._heartbeat = threading.Thread(
+                target=self._heartbeat_loop, name="job-heartbeat", daemon=True
+            )
+        self._heartbeat.start()
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Отменяет задачу: из очереди она снимается сразу, а выполняющаяся
+        получает сигнал через токен отмены (прерываются и текущие HTTP-запросы).
+        Задачу другого процесса с той же базой владелец останавливает сам:
+        при следующем checkpoint или продлении аренды.
+        """
+        with self._connect() as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? "
+                "WHERE id = ? AND status IN (?, ?)",
+                (CANCELLED, time.time(), job_id, *ACTIVE_STATUSES),
+            ).rowcount
+        with self._tokens_lock:
+            token = self._tokens.get(job_id)
+        if token is not None:
+            token.cancel()
+        return bool(updated)
+
+    def _run_job(self, job: Dict[str, Any], token: Optional[CancellationToken] = None):
+        handler = self._handlers.get(job["kind"])
+        if handler is None:
+            self._set_status(job["id"], FAILED, f"Неизвестный тип задачи: {job['kind']}")
+            return
+        # Свой токен у каждой задачи: отмена одной задачи через базу не должна
+        # отменять остальные, которым передан тот же общий `token` (пакет CLI)
+        job_token = CancellationToken()
+        unlink = token.add_callback(job_token.cancel) if token is not None else None
+        job["cancel_token"] = job_token
+        with self._tokens_lock:
+            self._tokens[job["id"]] = job_token
+        self._ensure_heartbeat()
+        # Задачу могли отменить между выборкой из очереди и регистрацией токена
+        current = self.get(job["id"])
+        if current is None or current["status"] == CANCELLED:
+            job_token.cancel()
+        try:
+            handler(self, job)
+            self._set_status(job["id"], DONE)
+        except OperationCancelled:
+            print(f"Задача {job['id']} отменена")
+            self._set_status(job["id"], CANCELLED)
+        except Exception as e:
+            print(f"❌ Ошибка задачи {job['id']}: {e}")
+            self._set_status(job["id"], FAILED, traceback.format_exc())
+        finally:
+            if unlink is not None:
+                unlink()
+            with self._tokens_lock:
+                self._tokens.pop(job["id"], None)
+
+    def _worker_loop(self):
+        next_recovery = time.time() + self.lease_seconds
+        while True:
+            # Задачи остановленных процессов подхватываются и без перезапуска
+            if time.time() >= next_recovery:
+                next_recovery = time.time() + self.lease_seconds
+                self.recover()
+            job = self._claim_next()
+            if job is None:
+                self._wakeup.wait(timeout=1.0)
+                self._wakeup.clear()
+                continue
+            self._run_job(job)
+
+    def start_workers(self, count: int = 2):
+        """Запускает рабочие потоки (повторный вызов ничего не делает)"""
+        if self._workers:
+            return
+        self.recover()
+        for i in range(count):
+            worker = threading.Thread(
+                target=self._worker_loop, name=f"job-worker-{i}", daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+        if JOBS_GC_INTERVAL_HOURS > 0:
+            threading.Thread(
+                target=self._maintenance_loop, name="job-maintenance", daemon=True
+            ).start()
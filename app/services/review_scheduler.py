@@ -0,0 +1,34 @@
+from typing import Any, Dict, List
+
+# Сколько последних коммитов видно на первой странице браузера коммитов
+VISIBLE_COMMITS = 10
+
+# Уровни приоритета LLM-ревью (меньше — раньше)
+ON_DEMAND_PRIORITY = -1
+_TIER_SIZE = 1_000_000
+_VISIBLE_TIER = 0
+_BACKGROUND_TIER = 1
+
+
+def _commit_size(commit: Dict[str, Any]) -> int:
+    stats = commit.get("stats") or {}
+    return stats.get("additions", 0) + stats.get("deletions", 0)
+
+
+def review_priorities(commits: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Рассчитывает приоритет ревью для каждого коммита.
+    Сначала — коммиты, которые пользователь увидит первыми (самые новые),
+    затем остальные по убыванию размера изменений.
+    Коммиты, открытые пользователем вручную, получают ON_DEMAND_PRIORITY отдельно.
+    """
+    by_date = sorted(commits, key=lambda c: str(c.get("date", "")), reverse=True)
+    visible = by_date[:VISIBLE_COMMITS]
+    background = sorted(by_date[VISIBLE_COMMITS:], key=_commit_size, reverse=True)
+
+    priorities = {}
+    for rank, commit in enumerate(visible):
+        priorities[commit["sha"]] = _VISIBLE_TIER * _TIER_SIZE + rank
+    for rank, commit in enumerate(background):
+        priorities[commit["sha"]] = _BACKGROUND_TIER * _TIER_SIZE + rank
+    return priorities
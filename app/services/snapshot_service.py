@@ -0,0 +1,329 @@
+import functools
+import json
+import os
+import re
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+# pyarrow, pandas и numpy загружаются при первой работе со снимками,
+# чтобы не замедлять старт приложения
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+SNAPSHOTS_DIR = os.getenv("SNAPSHOTS_DIR", os.path.join("data", "snapshots"))
+
+# Форматы снимков: Parquet (сжатый, для хранения) и Arrow IPC (без сжатия,
+# читается через memory map без копирования в память процесса)
+PARQUET = "parquet"
+ARROW = "arrow"
+_EXTENSIONS = {PARQUET: ".parquet", ARROW: ".arrow"}
+
+COMMITS = "commits"
+FILES = "files"
+REVIEWS = "reviews"
+TABLES = (COMMITS, FILES, REVIEWS)
+
+_METADATA_KEY = b"snapshot"
+
+
+@functools.lru_cache(maxsize=None)
+def table_schema(name: str) -> "pa.Schema":
+    """Схема таблицы снимка (commits, files или reviews)"""
+    import pyarrow as pa
+
+    schemas = {
+        COMMITS: [
+            ("position", pa.int32()),
+            ("sha", pa.string()),
+            ("message", pa.string()),
+            ("author", pa.dictionary(pa.int32(), pa.string())),
+            ("author_email", pa.dictionary(pa.int32(), pa.string())),
+            ("date", pa.timestamp("us", tz="UTC")),
+            ("url", pa.string()),
+            ("additions", pa.int32()),
+            ("deletions", pa.int32()),
+            ("total", pa.int32()),
+            ("llm_pending", pa.bool_()),
+        ],
+        FILES: [
+            ("commit", pa.int32()),
+            ("filename", pa.dictionary(pa.int32(), pa.string())),
+            ("status", pa.dictionary(pa.int8(), pa.string())),
+            ("additions", pa.int32()),
+            ("deletions", pa.int32()),
+            ("changes", pa.int32()),
+            ("patch", pa.large_string()),
+        ],
+        REVIEWS: [("commit", pa.int32()), ("llm_summary", pa.large_string())],
+    }
+    return pa.schema(schemas[name])
+
+
+def _int_column(values) -> "pa.Array":
+    import pyarrow as pa
+
+    return pa.array([value or 0 for value in values], type=pa.int32())
+
+
+def commits_to_tables(commits: List[Dict[str, Any]]) -> Dict[str, "pa.Table"]:
+    """
+    Раскладывает список коммитов на три таблицы: коммиты, файлы и ревью.
+    Файлы и ревью ссылаются на коммит по его позиции (`commit`).
+    """
+    import pandas as pd
+    import pyarrow as pa
+
+    dates = pd.to_datetime([commit.get("date") for commit in commits], utc=True)
+    commits_table = pa.Table.from_pydict(
+        {
+            "position": pa.array(range(len(commits)), type=pa.int32()),
+            "sha": [commit["sha"] for commit in commits],
+            "message": [commit.get("message") for commit in commits],
+            "author": pa.array(
+                [commit.get("author") for commit in commits], pa.string()
+            ).dictionary_encode(),
+            "author_email": pa.array(
+                [commit.get("author_email") for commit in commits], pa.string()
+            ).dictionary_encode(),
+            "date": pa.array(dates, type=pa.timestamp("us", tz="UTC")),
+            "url": [commit.get("url") for commit in commits],
+            "additions": _int_column(c["stats"].get("additions") for c in commits),
+            "deletions": _int_column(c["stats"].get("deletions") for c in commits),
+            "total": _int_column(c["stats"].get("total") for c in commits),
+            "llm_pending": [bool(commit.get("llm_pending")) for commit in commits],
+        },
+        schema=table_schema(COMMITS),
+    )
+
+    files = {name: [] for name in table_schema(FILES).names}
+    reviews = {name: [] for name in table_schema(REVIEWS).names}
+    for position, commit in enumerate(commits):
+        for file in commit.get("files") or []:
+            files["commit"].append(position)
+            files["filename"].append(file.get("filename"))
+            files["status"].append(file.get("status"))
+            files["additions"].append(file.get("additions") or 0)
+            files["deletions"].append(file.get("deletions") or 0)
+            files["changes"].append(file.get("changes") or 0)
+            files["patch"].append(file.get("patch"))
+        if commit.get("llm_summary"):
+            reviews["commit"].append(position)
+            reviews["llm_summary"].append(commit["llm_summary"])
+
+    files["filename"] = pa.array(files["filename"], pa.string()).dictionary_encode()
+    files["status"] = pa.array(files["status"], pa.string()).dictionary_encode()
+    return {
+        COMMITS: commits_table,
+        FILES: pa.Table.from_pydict(files).cast(table_schema(FILES)),
+        REVIEWS: pa.Table.from_pydict(reviews, schema=table_schema(REVIEWS)),
+    }
+
+
+def tables_to_commits(
+    commits_table: "pa.Table", files_table: "pa.Table", reviews_table: "pa.Table"
+) -> List[Dict[str, Any]]:
+    """Собирает словари коммитов (как у `GitService`) из таблиц снимка"""
+    import numpy as np
+
+    names = [
+        "sha",
+        "message",
+        "author",
+        "author_email",
+        "date",
+        "url",
+        "additions",
+        "deletions",
+        "total",
+    ]
+    rows = zip(*(commits_table.column(name).to_pylist() for name in names))
+    commits = [
+        {
+            "sha": sha,
+            "message": message,
+            "author": author,
+            "author_email": author_email,
+            "date": commit_date,
+            "url": url,
+            "stats": {"additions": additions, "deletions": deletions, "total": total},
+            "files": [],
+        }
+        for (
+            sha,
+            message,
+            author,
+            author_email,
+            commit_date,
+            url,
+            additions,
+            deletions,
+            total,
+        ) in rows
+    ]
+    pending = commits_table.column("llm_pending").to_numpy(zero_copy_only=False)
+    for position in np.flatnonzero(pending):
+        commits[position]["llm_pending"] = True
+
+    # Файлы раскладываются по коммитам столбцами, без построчного to_pylist()
+    file_columns = [name for name in files_table.column_names if name != "commit"]
+    values = [files_table.column(name).to_pylist() for name in file_columns]
+    positions = files_table.column("commit").to_pylist()
+    for position, *file_values in zip(positions, *values):
+        file = dict(zip(file_columns, file_values))
+        if file.get("patch", "") is None:
+            del file["patch"]
+        commits[position]["files"].append(file)
+
+    for position, summary in zip(
+        reviews_table.column("commit").to_pylist(),
+        reviews_table.column("llm_summary").to_pylist(),
+    ):
+        commits[position]["llm_summary"] = summary
+    return commits
+
+
+def snapshot_name(metadata: Dict[str, Any]) -> str:
+    """Имя каталога снимка по репозиторию, автору и периоду"""
+    parts = [
+        metadata.get("repo_name", "commits"),
+        metadata.get("developer", ""),
+        metadata.get("start_date", ""),
+        metadata.get("end_date", ""),
+        time.strftime("%Y%m%d-%H%M%S"),
+    ]
+    return re.sub(r"[^\w.-]+", "_", "_".join(str(part) for part in parts if part))
+
+
+def export_snapshot(
+    commits: List[Dict[str, Any]],
+    path: str,
+    metadata: Optional[Dict[str, Any]] = None,
+    fmt: str = PARQUET,
+) -> str:
+    """
+    Сохраняет проанализированные коммиты в каталог `path`: по файлу на таблицу
+    (commits, files, reviews). Метаданные (автор, параметры анализа) пишутся
+    в схему таблицы коммитов.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(path, exist_ok=True)
+    tables = commits_to_tables(commits)
+    info = {"format": fmt, "commits": len(commits), "created_at": time.time()}
+    info.update(metadata or {})
+    tables[COMMITS] = tables[COMMITS].replace_schema_metadata(
+        {_METADATA_KEY: json.dumps(info, ensure_ascii=False, default=str)}
+    )
+
+    for name, table in tables.items():
+        target = os.path.join(path, name + _EXTENSIONS[fmt])
+        if fmt == PARQUET:
+            pq.write_table(table, target, compression="zstd")
+        else:
+            with pa.OSFile(target, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table, max_chunksize=64_000)
+    return path
+
+
+class Snapshot:
+    """
+    Снимок проанализированных коммитов на диске. Таблицы читаются лениво через
+    memory map и только с нужными столбцами — например, без патчей для дашборда.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.format = next(
+            (
+                fmt
+                for fmt, extension in _EXTENSIONS.items()
+                if os.path.exists(os.path.join(path, COMMITS + extension))
+            ),
+            None,
+        )
+        if self.format is None:
+            raise FileNotFoundError(f"Снимок не найден: {path}")
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name + _EXTENSIONS[self.format])
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self.format == PARQUET:
+            schema = pq.read_schema(self._file(COMMITS), memory_map=True)
+        else:
+            with pa.memory_map(self._file(COMMITS)) as source:
+                schema = pa.ipc.open_file(source).schema
+        raw = (schema.metadata or {}).get(_METADATA_KEY)
+        return json.loads(raw) if raw else {}
+
+    def table(self, name: str, columns: Optional[List[str]] = None) -> "pa.Table":
+        """Таблица снимка; для Arrow IPC данные остаются в отображённом файле"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self.format == PARQUET:
+            return pq.read_table(self._file(name), columns=columns, memory_map=True)
+        source = pa.memory_map(self._file(name))
+        table = pa.ipc.open_file(source).read_all()
+        return table.select(columns) if columns else table
+
+    def iter_batches(
+        self, name: str, columns: Optional[List[str]] = None, batch_size: int = 64_000
+    ) -> Iterator["pa.RecordBatch"]:
+        """Потоковое чтение таблицы пакетами — для обработки больших снимков"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self.format == PARQUET:
+            parquet_file = pq.ParquetFile(self._file(name), memory_map=True)
+            yield from parquet_file.iter_batches(batch_size=batch_size, columns=columns)
+            return
+        with pa.memory_map(self._file(name)) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                yield batch.select(columns) if columns else batch
+
+    def to_commits(self, include_patches: bool = False) -> List[Dict[str, Any]]:
+        """
+        Словари коммитов для дашборда и отчёта. Патчи по умолчанию не читаются —
+        они нужны только для повторного LLM-ревью.
+        """
+        file_columns = [
+            name
+            for name in table_schema(FILES).names
+            if include_patches or name != "patch"
+        ]
+        return tables_to_commits(
+            self.table(COMMITS),
+            self.table(FILES, columns=file_columns),
+            self.table(REVIEWS),
+        )
+
+
+def open_snapshot(path: str) -> Snapshot:
+    return Snapshot(path)
+
+
+def list_snapshots(directory: str = SNAPSHOTS_DIR) -> List[Dict[str, Any]]:
+    """Сохранённые снимки (новые первыми) с их метаданными"""
+    names = os.listdir(directory) if os.path.isdir(directory) else []
+    if not names:
+        return []
+    import pyarrow as pa
+
+    snapshots = []
+    for name in names:
+        path = os.path.join(directory, name)
+        try:
+            metadata = Snapshot(path).metadata
+        except (FileNotFoundError, OSError, pa.ArrowException, ValueError):
+            continue
+        snapshots.append({"name": name, "path": path, **metadata})
+    return sorted(snapshots, key=lambda item: item.get("created_at", 0), reverse=True)
@@ -0,0 +1,102 @@
+"""
+Командный режим: коммиты репозитория за период загружаются одним списком
+и распределяются по участникам команды в памяти — вместо отдельного списка
+коммитов GitHub API на каждого разработчика.
+"""
+
+import re
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+# Оценка из раздела «Итоговая оценка» LLM-ревью: «7/10», «7.5 / 10» или «7 из 10»
+_SCORE_RE = re.compile(
+    r"Итоговая оценка.*?(\d+(?:[.,]\d+)?)\s*(?:/|из)\s*10", re.IGNORECASE | re.DOTALL
+)
+
+
+def member_key(author: Dict[str, Any]) -> Optional[str]:
+    """Идентификатор участника — как `developer_username` в интерфейсе"""
+    return author.get("github_login") or author.get("email")
+
+
+class TeamRoster:
+    """
+    Участники команды с поиском по логину GitHub и email коммита.
+    Пустой состав — вся команда: участником считается любой автор.
+    """
+
+    def __init__(self, members: Iterable[Dict[str, Any]] = ()):
+        self.members = {member_key(member): member for member in members}
+        self._by_identity = {}
+        for key, member in self.members.items():
+            for identity in (member.get("github_login"), member.get("email")):
+                if identity:
+                    self._by_identity[identity.lower()] = key
+
+    def match(self, login: Optional[str], email: Optional[str]) -> Optional[str]:
+        """Участник, которому принадлежит коммит, или None, если он не в команде"""
+        for identity in (login, email):
+            if identity and identity.lower() in self._by_identity:
+                return self._by_identity[identity.lower()]
+        if self.members:
+            return None
+        return login or email
+
+
+def partition_by_member(commits: Iterable[Dict[str, Any]]) -> Dict[str, List]:
+    """Коммиты командного анализа по участникам (порядок коммитов сохраняется)"""
+    by_member = defaultdict(list)
+    for commit in commits:
+        by_member[commit.get("member") or "unknown"].append(commit)
+    return dict(by_member)
+
+
+def review_score(summary: Optional[str]) -> Optional[float]:
+    """Итоговая оценка из текста LLM-ревью (0–10) или None"""
+    if not summary:
+        return None
+    match = _SCORE_RE.search(summary)
+    if match is None:
+        return None
+    score = float(match.group(1).replace(",", "."))
+    return score if 0 <= score <= 10 else None
+
+
+def team_summary(
+    by_member: Dict[str, List], members: Dict[str, Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Сравнительные показатели участников: коммиты, строки, файлы, активные дни,
+    проверенные LLM коммиты и средняя оценка ревью. По убыванию числа коммитов.
+    """
+    rows = []
+    for key, commits in by_member.items():
+        additions = sum(commit["stats"]["additions"] for commit in commits)
+        deletions = sum(commit["stats"]["deletions"] for commit in commits)
+        scores = [
+            score
+            for score in (review_score(commit.get("llm_summary")) for commit in commits)
+            if score is not None
+        ]
+        active_days = {
+            commit["date"].date() if hasattr(commit["date"], "date") else commit["date"]
+            for commit in commits
+            if commit.get("date")
+        }
+        author = members.get(key) or {}
+        rows.append(
+            {
+                "member": key,
+                "name": author.get("name") or commits[0].get("author") or key,
+                "commits": len(commits),
+                "additions": additions,
+                "deletions": deletions,
+                "files_changed": sum(len(commit["files"]) for commit in commits),
+                "avg_commit_size": (additions + deletions) / len(commits),
+                "active_days": len(active_days),
+                "reviewed": sum(1 for commit in commits if commit.get("llm_summary")),
+                "avg_score": sum(scores) / len(scores) if scores else None,
+            }
+        )
+    rows.sort(key=lambda row: row["commits"], reverse=True)
+    return rows
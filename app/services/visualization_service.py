@@ -1,4 +1,3 @@
-import os
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
@@ -7,6 +6,20 @@ from datetime import datetime, timedelta
 import streamlit as st
 import numpy as np
 import colorsys
+from app.services.chart_cache import dataset_fingerprint, memoize
+from app.services.commit_cube import COMMIT_TYPES, DAYS_ORDER, CommitCube
+from app.services.file_index import (
+    build_file_index,
+    extension_summary,
+    top_changed_files,
+)
+from app.services.review_scheduler import VISIBLE_COMMITS
+from app.utils.downsampling import (
+    MAX_CHART_POINTS,
+    WEBGL_THRESHOLD,
+    lttb_indices,
+    minmax_indices,
+)
 
 # Корпоративные цвета Альфа Банка
 ALFA_RED = "#EF3124"
@@ -46,88 +59,155 @@ def generate_color_palette(base_color, num_colors=10):
 ALFA_EXTENDED_PALETTE = generate_color_palette(ALFA_RED, 20)
 
 
+MONTHS_ORDER = [
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+]
+
+
+def _to_datetime_column(values):
+    """Приводит даты коммитов к datetime64 без часового пояса (локальное время коммита)"""
+    try:
+        dates = pd.to_datetime(pd.Series(values), errors="coerce")
+    except (TypeError, ValueError):
+        # Смешаны даты с разными часовыми поясами — приводим к UTC
+        dates = pd.to_datetime(pd.Series(values), errors="coerce", utc=True)
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    return dates
+
+
+def _categorical_from_codes(codes, categories):
+    """Категориальный столбец из целочисленных кодов (-1 — пропуск)"""
+    codes = np.nan_to_num(np.asarray(codes, dtype="float64"), nan=-1).astype("int8")
+    return pd.Categorical.from_codes(codes, categories=categories, ordered=True)
+
+
+# Описания и цвета типов коммитов (см. `prepare_commit_data`)
+COMMIT_TYPE_DESCRIPTIONS = {
+    "Addition": "New code or features added",
+    "Major Addition": "Significant new code or features",
+    "Modification": "Balanced changes to existing code",
+    "Removal": "Code cleanup or feature removal",
+    "Major Removal": "Significant code removal or refactoring",
+}
+COMMIT_TYPE_COLORS = {
+    "Addition": "#4CAF50",
+    "Major Addition": "#2E7D32",
+    "Modification": "#FF9800",
+    "Removal": "#F44336",
+    "Major Removal": "#B71C1C",
+}
+
+
+def _scatter_trace(x, **kwargs):
+    """go.Scatter для небольших трасс и go.Scattergl (WebGL) — для больших"""
+    trace_class = go.Scattergl if len(x) > WEBGL_THRESHOLD else go.Scatter
+    return trace_class(x=x, **kwargs)
+
+
+def _filter_window(frame, column, window):
+    """Строки, попадающие в окно дат `window=(start, end)` включительно"""
+    if not window:
+        return frame
+    start, end = pd.Timestamp(window[0]), pd.Timestamp(window[1])
+    dates = frame[column].dt.normalize()
+    return frame[(dates >= start) & (dates <= end)]
+
+
+def _downsampled(frame, x_column, y_column, max_points):
+    """Строки, оставшиеся после LTTB-прореживания линии `y_column`"""
+    indices = lttb_indices(
+        frame[x_column].to_numpy(), frame[y_column].to_numpy(), max_points
+    )
+    return frame.iloc[indices]
+
+
 def prepare_commit_data(commits):
-    """Преобразует данные коммитов в DataFrame для анализа с расширенными метриками"""
-    commit_data = []
-    for commit in commits:
-        commit_date = (
-            commit["date"].date()
-            if isinstance(commit["date"], datetime)
-            else commit["date"]
-        )
-        commit_time = (
-            commit["date"].time()
-            if isinstance(commit["date"], datetime)
-            else datetime.min.time()
-        )
+    """
+    Преобразует данные коммитов в DataFrame для анализа с расширенными метриками.
+    Столбцы собираются целиком (без построчного цикла): календарные признаки,
+    сложность и тип коммита вычисляются векторно, а для экономии памяти
+    используются категориальные и компактные целочисленные типы.
+    """
+    if not commits:
+        return pd.DataFrame()
 
-        # Расчет дополнительных метрик
-        additions = commit["stats"]["additions"]
-        deletions = commit["stats"]["deletions"]
-        files_changed = len(commit["files"])
-        total_changes = additions + deletions
-
-        # Рассчитываем сложность изменений (соотношение изменений к файлам)
-        complexity = total_changes / max(1, files_changed)
-
-        # Определяем тип коммита на основе соотношения добавлений/удалений
-        if additions == 0 and deletions > 0:
-            commit_type = "Removal"
-        elif deletions == 0 and additions > 0:
-            commit_type = "Addition"
-        elif additions > deletions * 3:
-            commit_type = "Major Addition"
-        elif deletions > additions * 3:
-            commit_type = "Major Removal"
-        else:
-            commit_type = "Modification"
-
-        commit_data.append(
-            {
-                "date": commit_date,
-                "time": commit_time,
-                "datetime": (
-                    commit["date"]
-                    if isinstance(commit["date"], datetime)
-                    else datetime.combine(commit_date, commit_time)
-                ),
-                "additions": additions,
-                "deletions": deletions,
-                "files_changed": files_changed,
-                "total_changes": total_changes,
-                "complexity": complexity,
-                "commit_type": commit_type,
-                "hour": (
-                    commit["date"].hour if isinstance(commit["date"], datetime) else 0
-                ),
-                "day_of_week": (
-                    commit["date"].strftime("%A")
-                    if isinstance(commit["date"], datetime)
-                    else "Unknown"
-                ),
-                "week_of_year": (
-                    commit["date"].isocalendar()[1]
-                    if isinstance(commit["date"], datetime)
-                    else 0
-                ),
-                "month": (
-                    commit["date"].strftime("%B")
-                    if isinstance(commit["date"], datetime)
-                    else "Unknown"
-                ),
-                "message": (
-                    commit["message"].splitlines()[0]
-                    if commit["message"]
-                    else "No message"
-                ),
-                "commit_url": commit["url"],
-                "sha": commit["sha"][:7],
-                # Добавляем LLM резюме
-                "llm_summary": commit.get("llm_summary", ""),
-            }
-        )
+    commit_datetimes = _to_datetime_column([commit["date"] for commit in commits])
+    additions = np.fromiter(
+        (commit["stats"]["additions"] for commit in commits), dtype="int64"
+    )
+    deletions = np.fromiter(
+        (commit["stats"]["deletions"] for commit in commits), dtype="int64"
+    )
+    files_changed = np.fromiter((len(commit["files"]) for commit in commits), dtype="int64")
+    total_changes = additions + deletions
+
+    # Рассчитываем сложность изменений (соотношение изменений к файлам)
+    complexity = total_changes / np.maximum(1, files_changed)
 
-    df = pd.DataFrame(commit_data)
+    # Определяем тип коммита на основе соотношения добавлений/удалений
+    commit_type_codes = np.select(
+        [
+            (additions == 0) & (deletions > 0),
+            (deletions == 0) & (additions > 0),
+            additions > deletions * 3,
+            deletions > additions * 3,
+        ],
+        [
+            COMMIT_TYPES.index("Removal"),
+            COMMIT_TYPES.index("Addition"),
+            COMMIT_TYPES.index("Major Addition"),
+            COMMIT_TYPES.index("Major Removal"),
+        ],
+        default=COMMIT_TYPES.index("Modification"),
+    )
+
+    messages = pd.Series([commit["message"] or "" for commit in commits], dtype="object")
+    first_lines = messages.str.partition("\n")[0].str.rstrip("\r")
+    first_lines = first_lines.where(messages != "", "No message")
+
+    df = pd.DataFrame(
+        {
+            "date": commit_datetimes.dt.normalize(),
+            "datetime": commit_datetimes,
+            "additions": additions.astype("int32"),
+            "deletions": deletions.astype("int32"),
+            "files_changed": files_changed.astype("int32"),
+            "total_changes": total_changes.astype("int32"),
+            "complexity": complexity.astype("float32"),
+            "commit_type": pd.Categorical.from_codes(
+                commit_type_codes, categories=COMMIT_TYPES
+            ),
+            "hour": commit_datetimes.dt.hour.fillna(0).astype("int8"),
+            "day_of_week": _categorical_from_codes(
+                commit_datetimes.dt.dayofweek, DAYS_ORDER
+            ),
+            "week_of_year": commit_datetimes.dt.isocalendar()
+            .week.fillna(0)
+            .astype("int8"),
+            "month": _categorical_from_codes(commit_datetimes.dt.month - 1, MONTHS_ORDER),
+            "message": first_lines,
+            "commit_url": [commit["url"] for commit in commits],
+            "sha": pd.Series([commit["sha"] for commit in commits]).str[:7],
+            "author": pd.Categorical(
+                [commit.get("author") or "Unknown" for commit in commits]
+            ),
+            # Ревью в таблицу не попадают: отпечаток набора коммитов их не учитывает,
+            # и в кэшированной таблице они бы устаревали по мере готовности ревью.
+            # Их читают из самих коммитов (`commits[position]`)
+        }
+    )
 
     if len(df) > 1:
         df = df.sort_values("datetime")
@@ -138,23 +218,12 @@ def prepare_commit_data(commits):
     return df
 
 
-def create_enhanced_daily_activity_chart(df_commits):
+def create_enhanced_daily_activity_chart(df_commits, cube=None):
     """Создает улучшенный график активности по дням без анимации"""
-    # Группируем данные по дате
-    daily_activity = (
-        df_commits.groupby("date")
-        .agg(
-            {
-                "date": "count",
-                "additions": "sum",
-                "deletions": "sum",
-                "files_changed": "sum",
-                "complexity": "mean",
-            }
-        )
-        .rename(columns={"date": "commits"})
-        .reset_index()
-    )
+    # Берем дневные агрегаты из куба
+    if cube is None:
+        cube = CommitCube(df_commits)
+    daily_activity = cube.daily_activity()
 
     daily_activity["bubble_size"] = np.sqrt(daily_activity["commits"] * 5) + 10
 
@@ -211,23 +280,12 @@ def create_enhanced_daily_activity_chart(df_commits):
     return fig
 
 
-def create_weekly_activity_chart(df_commits):
+def create_weekly_activity_chart(df_commits, cube=None):
     """Создает график активности по дням недели без детализации по типам коммитов"""
-    # Определяем порядок дней недели для правильной сортировки
-    days_order = [
-        "Monday",
-        "Tuesday",
-        "Wednesday",
-        "Thursday",
-        "Friday",
-        "Saturday",
-        "Sunday",
-    ]
-
-    # Группируем по дню недели без детализации по типам коммитов
-    day_of_week_counts = (
-        df_commits["day_of_week"].value_counts().reindex(days_order).fillna(0)
-    )
+    # Количество коммитов по дням недели (в порядке DAYS_ORDER)
+    if cube is None:
+        cube = CommitCube(df_commits)
+    day_of_week_counts = cube.weekday_counts()
 
     # Создаем график с цветами в стиле Альфа
     fig = px.bar(
@@ -260,105 +318,174 @@ def create_weekly_activity_chart(df_commits):
     return fig
 
 
-def create_activity_heatmap(df_commits):
-    """Создает двумерную тепловую карту активности"""
-    days_order = [
-        "Monday",
-        "Tuesday",
-        "Wednesday",
-        "Thursday",
-        "Friday",
-        "Saturday",
-        "Sunday",
-    ]
-
-    # Создаем сводную таблицу: дни недели vs часы
-    heatmap_data = pd.crosstab(df_commits["day_of_week"], df_commits["hour"])
+def _heatmap_text(counts, zmax):
+    """
+    Подписи ячеек тепловой карты: пустые для нулей, белые на насыщенных
+    ячейках и темные на светлых. Считаются для всей матрицы сразу.
+    """
+    counts = np.asarray(counts)
+    colors = np.where(counts > max(1, zmax) / 2, "white", ALFA_BLACK)
+    text = np.char.add(
+        np.char.add(np.char.add('<span style="color:', colors), '">'),
+        np.char.add(counts.astype(str), "</span>"),
+    )
+    return np.where(counts > 0, text, "")
+
+
+def _heatmap_trace(counts, hours, days, zmax, **kwargs):
+    """Одна трасса go.Heatmap с подписями, встроенными через texttemplate"""
+    return go.Heatmap(
+        z=counts,
+        x=hours,
+        y=days,
+        text=_heatmap_text(counts, zmax),
+        texttemplate="%{text}",
+        textfont=dict(size=9),
+        zmin=0,
+        zmax=max(1, zmax),
+        hovertemplate="<b>%{y}</b>, %{x}:00<br>Commits: %{z}<extra></extra>",
+        **kwargs,
+    )
 
-    # Переупорядочиваем строки, чтобы дни недели шли в правильном порядке
-    if set(days_order).issubset(set(heatmap_data.index)):
-        heatmap_data = heatmap_data.reindex(days_order)
 
-    # Создаем улучшенную тепловую карту с кастомными цветами
-    fig = px.imshow(
-        heatmap_data,
-        labels=dict(x="Hour of Day", y="Day of Week", color="Commits"),
-        x=heatmap_data.columns,
-        y=heatmap_data.index,
-        color_continuous_scale=ALFA_SEQUENTIAL,
-        title="Activity Heatmap",
-        aspect="auto",  # Для лучшего соотношения сторон
-    )
-
-    # Добавляем текст значений в ячейки для лучшей читаемости
-    for i, day in enumerate(heatmap_data.index):
-        for j, hour in enumerate(heatmap_data.columns):
-            value = heatmap_data.iloc[i, j]
-            if value > 0:  # Показываем только ненулевые значения
-                fig.add_annotation(
-                    x=hour,
-                    y=day,
-                    text=str(value),
-                    showarrow=False,
-                    font=dict(
-                        color=(
-                            "white" if value > 3 else "black"
-                        ),  # Адаптивный цвет текста
-                        size=9,
-                    ),
-                )
+def create_activity_heatmap(df_commits, cube=None):
+    """Создает двумерную тепловую карту активности"""
+    # Сводная таблица из куба: дни недели vs часы
+    if cube is None:
+        cube = CommitCube(df_commits)
+    heatmap_data = cube.heatmap()
+
+    # Одна трасса вместо отдельной аннотации на каждую ячейку
+    fig = go.Figure(
+        _heatmap_trace(
+            heatmap_data.to_numpy(),
+            heatmap_data.columns,
+            heatmap_data.index,
+            heatmap_data.to_numpy().max(initial=0),
+            coloraxis="coloraxis",
+        )
+    )
 
     # Настраиваем макет
     fig.update_layout(
+        title="Activity Heatmap",
         xaxis=dict(
+            title="Hour of Day",
             tickmode="linear",
             tick0=0,
             dtick=2,  # Показывать каждый второй час для меньшей загруженности
             title_font=dict(size=14),
         ),
         yaxis=dict(
+            title="Day of Week",
             tickmode="linear",
+            autorange="reversed",
             title_font=dict(size=14),
         ),
         plot_bgcolor="rgba(0,0,0,0)",
         paper_bgcolor="rgba(0,0,0,0)",
         font=dict(family="Arial, sans-serif", size=12, color=ALFA_BLACK),
         margin=dict(l=10, r=10, t=50, b=10),
-        coloraxis_colorbar=dict(
-            title="Commits",
-            thicknessmode="pixels",
-            thickness=20,
-            lenmode="pixels",
-            len=300,
-            yanchor="top",
-            y=1,
-            xanchor="right",
-            x=1.02,
+        coloraxis=dict(
+            colorscale=ALFA_SEQUENTIAL[::-1],
+            colorbar=dict(
+                title="Commits",
+                thicknessmode="pixels",
+                thickness=20,
+                lenmode="pixels",
+                len=300,
+                yanchor="top",
+                y=1,
+                xanchor="right",
+                x=1.02,
+            ),
         ),
     )
 
     return fig
 
 
-def create_enhanced_code_changes_chart(df_commits):
-    """Создает улучшенный график изменений кода по времени без анимации"""
-    # Создаем фрейм данных с накопленными изменениями по дням
-    code_changes = (
-        df_commits.groupby("date")
-        .agg(
-            {
-                "additions": "sum",
-                "deletions": "sum",
-                "files_changed": "sum",
-                "complexity": "mean",
-            }
+def create_author_heatmaps(df_commits, max_authors=12, columns=3):
+    """
+    Тепловые карты день недели × час для нескольких авторов (small multiples).
+    Матрицы всех авторов считаются одним bincount, у карт общая цветовая шкала.
+    Показываются `max_authors` самых активных авторов.
+    """
+    authors = df_commits["author"].astype("category")
+    top_authors = authors.value_counts().head(max_authors)
+    top_authors = top_authors[top_authors > 0]
+    if top_authors.empty:
+        return None
+
+    author_codes = authors.cat.codes.to_numpy().astype("int64")
+    day_codes = df_commits["day_of_week"].cat.codes.to_numpy().astype("int64")
+    hours = df_commits["hour"].to_numpy().astype("int64")
+    valid = (author_codes >= 0) & (day_codes >= 0)
+    cells = len(DAYS_ORDER) * 24
+    counts = np.bincount(
+        author_codes[valid] * cells + day_codes[valid] * 24 + hours[valid],
+        minlength=len(authors.cat.categories) * cells,
+    ).reshape(len(authors.cat.categories), len(DAYS_ORDER), 24)
+
+    positions = {name: code for code, name in enumerate(authors.cat.categories)}
+    selected = counts[[positions[name] for name in top_authors.index]]
+    zmax = selected.max(initial=0)
+
+    rows = -(-len(top_authors) // columns)
+    fig = make_subplots(
+        rows=rows,
+        cols=columns,
+        subplot_titles=[
+            f"{name} ({count})" for name, count in top_authors.items()
+        ],
+        shared_xaxes=True,
+        shared_yaxes=True,
+        horizontal_spacing=0.03,
+        vertical_spacing=0.08 if rows > 1 else 0.1,
+    )
+    for i, matrix in enumerate(selected):
+        fig.add_trace(
+            _heatmap_trace(
+                matrix, list(range(24)), DAYS_ORDER, zmax, coloraxis="coloraxis"
+            ),
+            row=i // columns + 1,
+            col=i % columns + 1,
         )
-        .reset_index()
+
+    fig.update_yaxes(autorange="reversed", tickfont=dict(size=9))
+    fig.update_xaxes(dtick=6, tickfont=dict(size=9))
+    fig.update_layout(
+        title="Activity Heatmap by Author",
+        coloraxis=dict(colorscale=ALFA_SEQUENTIAL[::-1], colorbar=dict(title="Commits")),
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        font=dict(family="Arial, sans-serif", size=12, color=ALFA_BLACK),
+        margin=dict(l=10, r=10, t=80, b=10),
+        height=max(300, 230 * rows),
     )
+    return fig
+
+
+def create_enhanced_code_changes_chart(
+    df_commits, cube=None, window=None, max_points=MAX_CHART_POINTS
+):
+    """
+    Создает улучшенный график изменений кода по времени без анимации.
+    Линии прореживаются до `max_points` точек (LTTB); `window=(start, end)`
+    ограничивает график окном дат, в узком окне точки идут без прореживания.
+    """
+    # Создаем фрейм данных с накопленными изменениями по дням
+    if cube is None:
+        cube = CommitCube(df_commits)
+    code_changes = cube.daily_activity()
 
-    # Добавляем кумулятивные суммы
+    # Добавляем кумулятивные суммы (по всей истории, до выбора окна)
     code_changes["cumulative_additions"] = code_changes["additions"].cumsum()
     code_changes["cumulative_deletions"] = code_changes["deletions"].cumsum()
+    code_changes["net_changes"] = (
+        code_changes["cumulative_additions"] - code_changes["cumulative_deletions"]
+    )
+    code_changes = _filter_window(code_changes, "date", window)
 
     # Создаем subplot с двумя графиками
     fig = make_subplots(
@@ -371,10 +498,11 @@ def create_enhanced_code_changes_chart(df_commits):
     )
 
     # 2. Кумулятивный рост (нижний график)
+    additions = _downsampled(code_changes, "date", "cumulative_additions", max_points)
     fig.add_trace(
-        go.Scatter(
-            x=code_changes["date"],
-            y=code_changes["cumulative_additions"],
+        _scatter_trace(
+            x=additions["date"],
+            y=additions["cumulative_additions"],
             name="Cumulative Additions",
             line=dict(color="#4CAF50", width=2),
             fill="tozeroy",
@@ -385,10 +513,11 @@ def create_enhanced_code_changes_chart(df_commits):
         col=1,
     )
 
+    deletions = _downsampled(code_changes, "date", "cumulative_deletions", max_points)
     fig.add_trace(
-        go.Scatter(
-            x=code_changes["date"],
-            y=code_changes["cumulative_deletions"],
+        _scatter_trace(
+            x=deletions["date"],
+            y=deletions["cumulative_deletions"],
             name="Cumulative Deletions",
             line=dict(color=ALFA_RED, width=2),
             fill="tozeroy",
@@ -400,11 +529,11 @@ def create_enhanced_code_changes_chart(df_commits):
     )
 
     # Добавляем линию чистого изменения
+    net = _downsampled(code_changes, "date", "net_changes", max_points)
     fig.add_trace(
-        go.Scatter(
-            x=code_changes["date"],
-            y=code_changes["cumulative_additions"]
-            - code_changes["cumulative_deletions"],
+        _scatter_trace(
+            x=net["date"],
+            y=net["net_changes"],
             name="Net Code Growth",
             line=dict(color="#2196F3", width=3),
             hovertemplate="<b>%{x}</b><br>Net Code: %{y}<extra></extra>",
@@ -469,58 +598,15 @@ def create_enhanced_code_changes_chart(df_commits):
     return fig
 
 
-def create_interactive_file_types_chart(commits):
+def create_interactive_file_types_chart(commits, file_index=None):
     """Создает интерактивную визуализацию типов файлов"""
-    # Собираем расширения файлов и их изменения
-    file_data = []
-    for commit in commits:
-        for file in commit["files"]:
-            if isinstance(file, dict) and "filename" in file:
-                _, ext = os.path.splitext(file["filename"])
-                if ext:  # Если есть расширение
-                    ext = ext.lower()
-                    additions = file.get("additions", 0)
-                    deletions = file.get("deletions", 0)
-                    changes = additions + deletions
-                    commit_date = (
-                        commit["date"].date()
-                        if isinstance(commit["date"], datetime)
-                        else commit["date"]
-                    )
-
-                    file_data.append(
-                        {
-                            "extension": ext,
-                            "filename": file["filename"],
-                            "additions": additions,
-                            "deletions": deletions,
-                            "changes": changes,
-                            "date": commit_date,
-                        }
-                    )
-
-    if not file_data:
-        return None
-
-    # Создаем DataFrame
-    df_files = pd.DataFrame(file_data)
-
-    # Группируем по расширению
-    ext_summary = (
-        df_files.groupby("extension")
-        .agg(
-            {
-                "changes": "sum",
-                "additions": "sum",
-                "deletions": "sum",
-                "filename": "count",
-            }
-        )
-        .reset_index()
-    )
+    # Группируем изменения файлов по расширению
+    if file_index is None:
+        file_index = build_file_index(commits)
+    ext_summary = extension_summary(file_index, top=15)
 
-    ext_summary = ext_summary.rename(columns={"filename": "count"})
-    ext_summary = ext_summary.sort_values("changes", ascending=False).head(15)
+    if ext_summary.empty:
+        return None
 
     # Создаем интерактивную визуализацию
     fig = make_subplots(
@@ -577,15 +663,17 @@ def create_interactive_file_types_chart(commits):
     return fig
 
 
-def create_enhanced_commits_calendar(df_commits):
+def create_enhanced_commits_calendar(df_commits, cube=None):
     """Создает улучшенный календарь коммитов без анимации"""
-    # Подготавливаем данные для календаря
-    calendar_data = df_commits.groupby("date").size().reset_index(name="count")
+    # Подготавливаем данные для календаря из дневных агрегатов куба
+    if cube is None:
+        cube = CommitCube(df_commits)
+    calendar_data = cube.daily_activity()[["date", "commits"]].rename(
+        columns={"commits": "count"}
+    )
 
     # Добавляем информацию о дне недели для лучшей визуализации
-    calendar_data["day_of_week"] = pd.to_datetime(calendar_data["date"]).dt.strftime(
-        "%A"
-    )
+    calendar_data["day_of_week"] = calendar_data["date"].dt.day_name()
 
     # Создаем улучшенный календарь
     fig = px.scatter(
@@ -599,17 +687,7 @@ def create_enhanced_commits_calendar(df_commits):
         hover_name="date",
         hover_data={"count": True, "day_of_week": True},
         title="Commit Calendar",
-        category_orders={
-            "day_of_week": [
-                "Monday",
-                "Tuesday",
-                "Wednesday",
-                "Thursday",
-                "Friday",
-                "Saturday",
-                "Sunday",
-            ]
-        },
+        category_orders={"day_of_week": DAYS_ORDER},
     )
 
     # Настраиваем макет
@@ -710,8 +788,16 @@ def create_commit_impact_chart(df_commits):
     return fig
 
 
-def create_code_pulse_visualization(df_commits):
-    """Создает визуализацию 'пульса кода' без анимации"""
+def create_code_pulse_visualization(
+    df_commits, window=None, max_points=MAX_CHART_POINTS
+):
+    """
+    Создает визуализацию 'пульса кода' без анимации.
+    На длинной истории линии прореживаются до `max_points` точек (LTTB), а из
+    маркеров коммитов в каждом интервале остается самый крупный.
+    `window=(start, end)` ограничивает график окном дат: в узком окне
+    коммиты показываются в полном разрешении.
+    """
     # Подготавливаем данные для визуализации
     pulse_data = df_commits.sort_values("datetime").copy()
 
@@ -726,6 +812,11 @@ def create_code_pulse_visualization(df_commits):
     pulse_data["change_velocity"] = (
         pulse_data["total_changes"].rolling(window=5, min_periods=1).mean()
     )
+    pulse_data = _filter_window(pulse_data, "datetime", window)
+    markers = pulse_data.iloc[
+        minmax_indices(pulse_data["total_changes"], buckets=max_points, keep="max")
+    ]
+    max_changes = max(1, pulse_data["total_changes"].max())
 
     # Создаем subplot с несколькими графиками
     fig = make_subplots(
@@ -737,11 +828,16 @@ def create_code_pulse_visualization(df_commits):
         row_heights=[0.7, 0.3],
     )
 
+    line_points = {
+        column: _downsampled(pulse_data, "datetime", column, max_points)
+        for column in ["cumulative_additions", "cumulative_deletions", "net_changes"]
+    }
+
     # Добавляем линию кумулятивных добавлений
     fig.add_trace(
-        go.Scatter(
-            x=pulse_data["datetime"],
-            y=pulse_data["cumulative_additions"],
+        _scatter_trace(
+            x=line_points["cumulative_additions"]["datetime"],
+            y=line_points["cumulative_additions"]["cumulative_additions"],
             mode="lines",
             name="Cumulative Additions",
             line=dict(color="#4CAF50", width=2),
@@ -754,9 +850,9 @@ def create_code_pulse_visualization(df_commits):
 
     # Добавляем линию кумулятивных удалений
     fig.add_trace(
-        go.Scatter(
-            x=pulse_data["datetime"],
-            y=pulse_data["cumulative_deletions"],
+        _scatter_trace(
+            x=line_points["cumulative_deletions"]["datetime"],
+            y=line_points["cumulative_deletions"]["cumulative_deletions"],
             mode="lines",
             name="Cumulative Deletions",
             line=dict(color=ALFA_RED, width=2),
@@ -769,9 +865,9 @@ def create_code_pulse_visualization(df_commits):
 
     # Добавляем линию чистого изменения
     fig.add_trace(
-        go.Scatter(
-            x=pulse_data["datetime"],
-            y=pulse_data["net_changes"],
+        _scatter_trace(
+            x=line_points["net_changes"]["datetime"],
+            y=line_points["net_changes"]["net_changes"],
             mode="lines",
             name="Net Code Growth",
             line=dict(color="#2196F3", width=3),
@@ -782,31 +878,20 @@ def create_code_pulse_visualization(df_commits):
 
     # Добавляем маркеры фактических коммитов
     fig.add_trace(
-        go.Scatter(
-            x=pulse_data["datetime"],
-            y=pulse_data["net_changes"],
+        _scatter_trace(
+            x=markers["datetime"],
+            y=markers["net_changes"],
             mode="markers",
             name="Commits",
             marker=dict(
-                color=pulse_data["commit_type"].map(
-                    {
-                        "Addition": "#4CAF50",
-                        "Major Addition": "#2E7D32",
-                        "Modification": "#FF9800",
-                        "Removal": "#F44336",
-                        "Major Removal": "#B71C1C",
-                    }
-                ),
-                size=pulse_data["total_changes"]
-                / pulse_data["total_changes"].max()
-                * 15
-                + 5,
+                color=markers["commit_type"].astype(str).map(COMMIT_TYPE_COLORS),
+                size=markers["total_changes"] / max_changes * 15 + 5,
                 symbol="circle",
                 line=dict(width=1, color="#333333"),
             ),
             hovertemplate="<b>%{text}</b><br>Date: %{x}<br>Net Code: %{y}<br>Changes: %{customdata[0]}<extra></extra>",
-            text=pulse_data["message"],
-            customdata=pulse_data[["total_changes", "sha"]],
+            text=markers["message"],
+            customdata=markers[["total_changes", "sha"]],
             showlegend=False,
         ),
         row=1,
@@ -868,1013 +953,1372 @@ def create_code_pulse_visualization(df_commits):
     return fig
 
 
-def display_commit_analytics(commits, author_data):
-    """Отображает аналитику коммитов в Streamlit с улучшенной визуализацией без анимации"""
-    if not commits:
-        st.info("No commits found for the selected period")
-        return
+def compute_weekly_stats(df_commits, cube=None):
+    """
+    Статистика изменений кода по ISO-неделям с метрикой эффективности
+    """
+    if cube is None:
+        cube = CommitCube(df_commits)
+    weekly_stats = cube.weekly_stats()[
+        [
+            "year",
+            "week",
+            "additions",
+            "deletions",
+            "files_changed",
+            "total_changes",
+            "complexity",
+        ]
+    ]
 
-    # Применяем стилизацию к Streamlit
-    st.markdown(
-        """
-    <style>
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 24px;
-    }
-    .stTabs [data-baseweb="tab"] {
-        height: 50px;
-        white-space: pre-wrap;
-        background-color: transparent;
-        border-radius: 4px 4px 0px 0px;
-        color: #333333;
-        font-size: 14px;
-        font-weight: 400;
-        transition: all 0.3s ease;
-    }
-    .stTabs [aria-selected="true"] {
-        background-color: #EF3124 !important;
-        color: white !important;
-        font-weight: bold !important;
-        transform: translateY(-3px);
-        box-shadow: 0 4px 10px rgba(239, 49, 36, 0.2);
-    }
-    .stTabs [data-baseweb="tab"]:hover {
-        background-color: #FFEBE9;
-        transform: translateY(-2px);
-    }
-    div[data-testid="stMetricValue"] {
-        font-size: 28px;
-        color: #EF3124;
-        font-weight: 700;
-        transition: all 0.3s ease;
-    }
-    div[data-testid="stMetricValue"]:hover {
-        transform: scale(1.05);
-    }
-    div[data-testid="stMetricLabel"] {
-        font-weight: 600;
-    }
-    h1, h2, h3 {
-        color: #333333;
-    }
-    .stDataFrame {
-        border-radius: 8px;
-        overflow: hidden;
-        border: 1px solid #E5E5E5;
-        transition: all 0.3s ease;
-    }
-    .stDataFrame:hover {
-        box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1);
-    }
-    .css-1ht1j8u {
-        overflow-x: auto;
-    }
-    .metric-card {
-        background-color: #F5F5F5;
-        border-radius: 10px;
-        padding: 1rem;
-        transition: all 0.3s ease;
-        height: 100%;
-    }
-    .metric-card:hover {
-        background-color: #FFEBE9;
-        transform: translateY(-5px);
-        box-shadow: 0 6px 15px rgba(239, 49, 36, 0.15);
-    }
-    .commit-card {
-        transition: all 0.3s ease;
-    }
-    .commit-card:hover {
-        transform: translateY(-3px);
-        box-shadow: 0 4px 8px rgba(0, 0, 0, 0.1);
-    }
-    </style>
-    """,
-        unsafe_allow_html=True,
+    # Добавляем столбец эффективности
+    weekly_stats["efficiency"] = (
+        weekly_stats["additions"] / weekly_stats["total_changes"] * 100
+    ).round(1)
+    return weekly_stats
+
+
+def create_top_files_chart(commits, file_index=None):
+    """
+    Горизонтальная диаграмма топ-15 наиболее изменяемых файлов
+    """
+    if file_index is None:
+        file_index = build_file_index(commits)
+    top_files = top_changed_files(file_index, top=15)
+
+    # Создаем интерактивную горизонтальную гистограмму
+    fig = px.bar(
+        x=top_files["changes"],
+        y=top_files["name"],
+        color=top_files["category"],
+        orientation="h",
+        labels={"x": "Lines Changed", "y": "File"},
+        title="Top Changed Files",
+        color_discrete_sequence=ALFA_SEQUENTIAL,
+        hover_data={"path": top_files["path"]},
+    )
+    # Настраиваем макет с меньшей высотой
+    fig.update_layout(
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        font=dict(family="Arial, sans-serif", size=12, color=ALFA_BLACK),
+        height=520,  # Увеличиваем высоту с 350 до 450
+        margin=dict(l=10, r=10, t=50, b=10),
+        yaxis={"categoryorder": "total ascending"},
+        legend=dict(
+            title="File Type",
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1,
+        ),
+    )
+    # Настраиваем подсказки
+    fig.update_traces(
+        hovertemplate="<b>%{y}</b><br>Changes: %{x}<br>Path: %{customdata[0]}<br>Type: %{marker.color}<extra></extra>"
     )
+    return fig
 
-    # Создаем красивый заголовок с иконкой и метриками
-    st.markdown(
-        f"""
-    <div style="display: flex; align-items: center; margin-bottom: 1rem; background-color: #F5F5F5; padding: 1.5rem; border-radius: 10px; box-shadow: 0 2px 8px rgba(0,0,0,0.05);">
-        <div style="font-size: 3rem; margin-right: 20px; color: #EF3124;">👨‍💻</div>
-        <div style="flex-grow: 1;">
-            <h2 style="margin: 0; padding: 0; font-size: 1.8rem;">{author_data["name"]}</h2>
-            <div style="color: #666; font-size: 1.1rem; margin-top: 5px;">
-                {author_data.get("github_login", "")} • {author_data.get("email", "")}
-            </div>
-        </div>
-        <div style="background-color: #EF3124; color: white; padding: 0.5rem 1rem; border-radius: 30px; font-weight: bold; display: flex; align-items: center;">
-            <span style="margin-right: 5px;">⭐</span> Commit Analytics
-        </div>
-    </div>
-    """,
-        unsafe_allow_html=True,
+
+def compute_commit_type_counts(df_commits, cube=None):
+    """
+    Количество коммитов каждого типа (ненулевые) с описаниями типов
+    """
+    if cube is None:
+        cube = CommitCube(df_commits)
+    commit_types = cube.type_counts().sort_values(ascending=False, kind="stable")
+    commit_types = commit_types[commit_types > 0].reset_index()
+    commit_types.columns = ["type", "count"]
+    commit_types["description"] = commit_types["type"].map(COMMIT_TYPE_DESCRIPTIONS)
+    return commit_types
+
+
+def create_commit_types_chart(commit_types):
+    """
+    Круговая диаграмма распределения типов коммитов
+    """
+    fig = px.pie(
+        commit_types,
+        values="count",
+        names="type",
+        title="Commit Types Distribution",
+        color="type",
+        color_discrete_map=COMMIT_TYPE_COLORS,
+        hover_data=["description", "count"],
     )
 
-    # Преобразуем данные в DataFrame
-    df_commits = prepare_commit_data(commits)
+    # Настраиваем макет
+    fig.update_layout(
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        font=dict(family="Arial, sans-serif", size=12, color=ALFA_BLACK),
+        margin=dict(l=10, r=10, t=50, b=10),
+        legend=dict(
+            orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5
+        ),
+    )
 
-    # Отображаем ключевые метрики в красивых карточках
-    st.markdown('<div style="margin-bottom: 1.5rem;">', unsafe_allow_html=True)
-    col1, col2, col3, col4 = st.columns(4)
+    # Настраиваем подсказки
+    fig.update_traces(
+        textinfo="percent+label",
+        hovertemplate="<b>%{label}</b><br>%{customdata[0]}<br>Count: %{customdata[1]} (%{percent})<extra></extra>",
+    )
+    return fig
 
-    with col1:
-        st.markdown(
-            f"""
-        <div class="metric-card">
-            <div style="font-size: 0.9rem; color: #666; margin-bottom: 0.3rem;">Total Commits</div>
-            <div style="font-size: 1.8rem; font-weight: 700; color: #EF3124;">{len(commits)}</div>
-            <div style="display: flex; align-items: center; margin-top: 0.5rem;">
-                <div style="font-size: 1.2rem; margin-right: 5px;">📊</div>
-                <div style="font-size: 0.8rem; color: #666;">Activity Metric</div>
-            </div>
-        </div>
-        """,
-            unsafe_allow_html=True,
+
+def compute_productivity_metrics(df_commits):
+    """
+    Продвинутые метрики продуктивности разработчика
+    """
+    productivity_metrics = {}
+
+    # Средний размер коммита
+    productivity_metrics["avg_commit_size"] = df_commits["total_changes"].mean()
+
+    # Среднее количество файлов на коммит
+    productivity_metrics["avg_files_per_commit"] = df_commits["files_changed"].mean()
+
+    # Коэффициент качества (соотношение добавлений к общим изменениям)
+    productivity_metrics["quality_ratio"] = (
+        df_commits["additions"].sum() / max(1, df_commits["total_changes"].sum())
+    ) * 100
+
+    # Коэффициент сложности (средняя сложность коммитов)
+    productivity_metrics["complexity"] = df_commits["complexity"].mean()
+
+    # Частота коммитов (коммитов в день)
+    if len(df_commits) > 0:
+        date_range = (df_commits["date"].max() - df_commits["date"].min()).days + 1
+        productivity_metrics["commit_frequency"] = len(df_commits) / max(
+            1, date_range
         )
+    else:
+        productivity_metrics["commit_frequency"] = 0
+
+    # Коэффициент изменения кода (соотношение изменений к количеству коммитов)
+    productivity_metrics["code_churn_ratio"] = df_commits[
+        "total_changes"
+    ].sum() / max(1, len(df_commits))
+    return productivity_metrics
+
+
+def create_productivity_radar_chart(productivity_metrics):
+    """
+    Радарный график продуктивности разработчика относительно эталона
+    """
+    categories = [
+        "Commit Size",
+        "Files per Commit",
+        "Quality Ratio",
+        "Complexity",
+        "Commit Frequency",
+        "Code Churn",
+    ]
 
-    with col2:
-        total_additions = df_commits["additions"].sum()
-        st.markdown(
-            f"""
-        <div class="metric-card">
-            <div style="font-size: 0.9rem; color: #666; margin-bottom: 0.3rem;">Lines Added</div>
-            <div style="font-size: 1.8rem; font-weight: 700; color: #4CAF50;">{total_additions:,}</div>
-            <div style="display: flex; align-items: center; margin-top: 0.5rem;">
-                <div style="font-size: 1.2rem; margin-right: 5px;">➕</div>
-                <div style="font-size: 0.8rem; color: #666;">Code Growth</div>
-            </div>
-        </div>
-        """,
-            unsafe_allow_html=True,
+    # Нормализуем значения для радарного графика
+    # Для некоторых метрик меньше значит лучше, для других - больше
+    radar_values = [
+        min(
+            100, productivity_metrics["avg_commit_size"] / 2
+        ),  # Меньше лучше, ограничиваем 100
+        min(
+            100, productivity_metrics["avg_files_per_commit"] * 10
+        ),  # Меньше лучше, ограничиваем 100
+        productivity_metrics["quality_ratio"],  # Больше лучше (0-100)
+        min(
+            100, productivity_metrics["complexity"] * 10
+        ),  # Меньше лучше, ограничиваем 100
+        min(
+            100, productivity_metrics["commit_frequency"] * 20
+        ),  # Больше лучше, ограничиваем 100
+        min(
+            100, productivity_metrics["code_churn_ratio"] / 5
+        ),  # Меньше лучше, ограничиваем 100
+    ]
+
+    # Инвертируем значения для метрик, где меньше значит лучше
+    radar_values[0] = 100 - radar_values[0]
+    radar_values[1] = 100 - radar_values[1]
+    radar_values[3] = 100 - radar_values[3]
+    radar_values[5] = 100 - radar_values[5]
+
+    # Создаем радарный график
+    fig = go.Figure()
+
+    fig.add_trace(
+        go.Scatterpolar(
+            r=radar_values,
+            theta=categories,
+            fill="toself",
+            name="Developer Metrics",
+            line=dict(color=ALFA_RED),
+            fillcolor=f"rgba({int(ALFA_RED[1:3], 16)}, {int(ALFA_RED[3:5], 16)}, {int(ALFA_RED[5:7], 16)}, 0.2)",
         )
+    )
 
-    with col3:
-        total_deletions = df_commits["deletions"].sum()
-        st.markdown(
-            f"""
-        <div class="metric-card">
-            <div style="font-size: 0.9rem; color: #666; margin-bottom: 0.3rem;">Lines Deleted</div>
-            <div style="font-size: 1.8rem; font-weight: 700; color: #EF3124;">{total_deletions:,}</div>
-            <div style="display: flex; align-items: center; margin-top: 0.5rem;">
-                <div style="font-size: 1.2rem; margin-right: 5px;">➖</div>
-                <div style="font-size: 0.8rem; color: #666;">Code Reduction</div>
-            </div>
-        </div>
-        """,
-            unsafe_allow_html=True,
+    # Добавляем эталонные значения
+    fig.add_trace(
+        go.Scatterpolar(
+            r=[70, 70, 70, 70, 70, 70],  # Эталонные значения
+            theta=categories,
+            fill="toself",
+            name="Reference",
+            line=dict(color="#333333", dash="dot"),
+            fillcolor="rgba(200, 200, 200, 0.2)",
         )
+    )
 
-    with col4:
-        total_files = df_commits["files_changed"].sum()
-        st.markdown(
-            f"""
-        <div class="metric-card">
-            <div style="font-size: 0.9rem; color: #666; margin-bottom: 0.3rem;">Files Changed</div>
-            <div style="font-size: 1.8rem; font-weight: 700; color: #2196F3;">{total_files:,}</div>
-            <div style="display: flex; align-items: center; margin-top: 0.5rem;">
-                <div style="font-size: 1.2rem; margin-right: 5px;">📁</div>
-                <div style="font-size: 0.8rem; color: #666;">Scope Impact</div>
-            </div>
-        </div>
-        """,
-            unsafe_allow_html=True,
-        )
+    # Настраиваем макет
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(visible=True, range=[0, 100]),
+            angularaxis=dict(
+                rotation=90,  # Начинаем с верхней точки
+                direction="clockwise",  # Направление по часовой стрелке
+            ),
+        ),
+        title="Developer Performance Radar",
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=-0.15,  # Смещаем легенду ниже
+            xanchor="center",
+            x=0.5,
+        ),
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        font=dict(family="Arial, sans-serif", size=12, color=ALFA_BLACK),
+        margin=dict(l=80, r=80, t=50, b=80),  # Увеличиваем нижний отступ
+        height=550,  # Увеличиваем высоту еще больше
+    )
+    return fig
 
-    st.markdown("</div>", unsafe_allow_html=True)
 
-    # Добавляем компактный улучшенный календарь коммитов вверху
-    calendar = create_enhanced_commits_calendar(df_commits)
-    st.plotly_chart(
-        calendar, use_container_width=True, config={"displayModeBar": False}
+def create_trend_analysis_chart(df_commits):
+    """
+    Графики трендов активности: скользящие средние и распределение размеров коммитов
+    """
+    # Подготавливаем данные для анализа трендов
+    trend_data = df_commits.sort_values("datetime").copy()
+
+    # Добавляем скользящие средние и другие метрики трендов
+    window_size = max(1, len(trend_data) // 10)  # Адаптивный размер окна
+
+    # Добавляем скользящие средние для различных метрик
+    trend_data["additions_ma"] = (
+        trend_data["additions"].rolling(window=window_size, min_periods=1).mean()
+    )
+    trend_data["deletions_ma"] = (
+        trend_data["deletions"].rolling(window=window_size, min_periods=1).mean()
+    )
+    trend_data["complexity_ma"] = (
+        trend_data["complexity"].rolling(window=window_size, min_periods=1).mean()
+    )
+    trend_data["files_ma"] = (
+        trend_data["files_changed"]
+        .rolling(window=window_size, min_periods=1)
+        .mean()
     )
 
-    # Добавляем стилизованные вкладки для разных категорий графиков
-    viz_tabs = st.tabs(
-        [
-            "📈 Activity",
-            "🔄 Code Changes",
-            "📁 File Analysis",
-            "🔍 Impact Analysis",
-            "📊 Advanced Metrics",
-        ]
+    # Создаем интерактивный график трендов без анимации
+    fig = make_subplots(
+        rows=2,
+        cols=2,
+        subplot_titles=(
+            "Code Changes Trend",
+            "Complexity Trend",
+            "Files Changed Trend",
+            "Commit Size Distribution",
+        ),
+        shared_xaxes=True,
+        vertical_spacing=0.1,
+        horizontal_spacing=0.1,
     )
 
-    with viz_tabs[0]:
-        # Графики активности без анимации
-        st.markdown("### 📊 Developer Activity Patterns")
+    # 1. Тренд изменений кода
+    fig.add_trace(
+        go.Scatter(
+            x=trend_data["datetime"],
+            y=trend_data["additions_ma"],
+            mode="lines",
+            name="Additions Trend",
+            line=dict(color="#4CAF50", width=2),
+        ),
+        row=1,
+        col=1,
+    )
 
-        col1, col2 = st.columns(2)
-        with col1:
-            daily_chart = create_enhanced_daily_activity_chart(df_commits)
-            st.plotly_chart(
-                daily_chart, use_container_width=True, config={"displayModeBar": True}
-            )
+    fig.add_trace(
+        go.Scatter(
+            x=trend_data["datetime"],
+            y=trend_data["deletions_ma"],
+            mode="lines",
+            name="Deletions Trend",
+            line=dict(color=ALFA_RED, width=2),
+        ),
+        row=1,
+        col=1,
+    )
 
-        with col2:
-            weekly_chart = create_weekly_activity_chart(df_commits)
-            st.plotly_chart(
-                weekly_chart, use_container_width=True, config={"displayModeBar": True}
-            )
+    # 2. Тренд сложности
+    fig.add_trace(
+        go.Scatter(
+            x=trend_data["datetime"],
+            y=trend_data["complexity_ma"],
+            mode="lines",
+            name="Complexity Trend",
+            line=dict(color="#FF9800", width=2),
+            fill="tozeroy",
+            fillcolor="rgba(255, 152, 0, 0.2)",
+        ),
+        row=1,
+        col=2,
+    )
 
-    with viz_tabs[1]:
+    # 3. Тренд количества файлов
+    fig.add_trace(
+        go.Scatter(
+            x=trend_data["datetime"],
+            y=trend_data["files_ma"],
+            mode="lines",
+            name="Files Trend",
+            line=dict(color="#2196F3", width=2),
+            fill="tozeroy",
+            fillcolor="rgba(33, 150, 243, 0.2)",
+        ),
+        row=2,
+        col=1,
+    )
 
-        # Добавляем статистику по изменениям кода
-        col1, col2 = st.columns(2)
-        with col1:
-            # Вычисляем статистику по неделям с интерактивным форматированием
-            df_commits["week"] = (
-                pd.to_datetime(df_commits["date"]).dt.isocalendar().week
-            )
-            weekly_stats = (
-                df_commits.groupby("week")
-                .agg(
-                    {
-                        "additions": "sum",
-                        "deletions": "sum",
-                        "files_changed": "sum",
-                        "total_changes": "sum",
-                        "complexity": "mean",
-                    }
-                )
-                .reset_index()
-            )
+    # 4. Распределение размеров коммитов
+    fig.add_trace(
+        go.Histogram(
+            x=trend_data["total_changes"],
+            name="Commit Size",
+            marker=dict(color=ALFA_RED),
+            nbinsx=20,
+            histnorm="probability",
+        ),
+        row=2,
+        col=2,
+    )
 
-            # Добавляем столбец эффективности
-            weekly_stats["efficiency"] = (
-                weekly_stats["additions"] / weekly_stats["total_changes"] * 100
-            ).round(1)
+    # Настраиваем макет
+    fig.update_layout(
+        title="Developer Activity Trends",
+        showlegend=True,
+        legend=dict(
+            orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5
+        ),
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        font=dict(family="Arial, sans-serif", size=12, color=ALFA_BLACK),
+        margin=dict(l=10, r=10, t=80, b=50),
+        height=600,
+    )
 
-            st.markdown(
-                """
-            <div style="background-color: #F5F5F5; padding: 1rem; border-radius: 8px; margin-bottom: 1rem;">
-                <h4 style="margin-top: 0;">Weekly Code Change Statistics</h4>
-                <p style="color: #666; margin-bottom: 0;">Breakdown of code changes by week with efficiency metrics</p>
-            </div>
-            """,
-                unsafe_allow_html=True,
+    # Настраиваем оси
+    for i in range(1, 3):
+        for j in range(1, 3):
+            fig.update_xaxes(
+                showgrid=True,
+                gridwidth=1,
+                gridcolor=ALFA_LIGHT_GRAY,
+                zeroline=False,
+                row=i,
+                col=j,
             )
-
-            # Создаем интерактивную таблицу
-            st.dataframe(
-                weekly_stats,
-                column_config={
-                    "week": st.column_config.NumberColumn("Week", format="%d"),
-                    "additions": st.column_config.NumberColumn("Added", format="%d"),
-                    "deletions": st.column_config.NumberColumn("Deleted", format="%d"),
-                    "files_changed": st.column_config.NumberColumn(
-                        "Files", format="%d"
-                    ),
-                    "total_changes": st.column_config.NumberColumn(
-                        "Total", format="%d"
-                    ),
-                    "complexity": st.column_config.NumberColumn(
-                        "Complexity", format="%.2f"
-                    ),
-                    "efficiency": st.column_config.ProgressColumn(
-                        "Efficiency",
-                        format="%d%%",
-                        min_value=0,
-                        max_value=100,
-                    ),
-                },
-                hide_index=True,
-                use_container_width=True,
+            fig.update_yaxes(
+                showgrid=True,
+                gridwidth=1,
+                gridcolor=ALFA_LIGHT_GRAY,
+                zeroline=False,
+                row=i,
+                col=j,
             )
 
-        with col2:
-            # Вычисляем соотношение добавленных/удаленных строк с улучшенным индикатором
-            if total_additions + total_deletions > 0:
-                add_ratio = total_additions / (total_additions + total_deletions) * 100
-                del_ratio = 100 - add_ratio
-
-                st.markdown(
-                    """
-                <div style="background-color: #F5F5F5; padding: 1rem; border-radius: 8px; margin-bottom: 1rem;">
-                    <h4 style="margin-top: 0;">Code Change Ratio</h4>
-                    <p style="color: #666; margin-bottom: 0;">Balance between code additions and deletions</p>
-                </div>
-                """,
-                    unsafe_allow_html=True,
-                )
+    return fig
 
-                st.markdown(
-                    f"""
-                <div style="display: flex; height: 40px; width: 100%; background-color: #F5F5F5; border-radius: 5px; overflow: hidden; margin-top: 10px; position: relative;">
-                    <div style="width: {add_ratio}%; background-color: #4CAF50; height: 100%; display: flex; align-items: center; justify-content: center; color: white; font-weight: bold;">
-                        {add_ratio:.1f}%
-                    </div>
-                    <div style="width: {del_ratio}%; background-color: #EF3124; height: 100%; display: flex; align-items: center; justify-content: center; color: white; font-weight: bold;">
-                        {del_ratio:.1f}%
-                    </div>
-                </div>
-                <div style="display: flex; justify-content: space-between; margin-top: 10px;">
-                    <div style="display: flex; align-items: center;"><div style="width: 12px; height: 12px; background-color: #4CAF50; border-radius: 50%; margin-right: 5px;"></div> Added</div>
-                    <div style="display: flex; align-items: center;"><div style="width: 12px; height: 12px; background-color: #EF3124; border-radius: 50%; margin-right: 5px;"></div> Deleted</div>
-                </div>
-                """,
-                    unsafe_allow_html=True,
-                )
 
-                # Средний размер коммита с визуальным индикатором
-                avg_changes = (total_additions + total_deletions) / len(commits)
-                avg_files = total_files / len(commits)
+def _zoom_window(df_commits, key):
+    """Слайдер окна дат для графиков с прореживанием (None — вся история)"""
+    first, last = df_commits["date"].min().date(), df_commits["date"].max().date()
+    if first >= last:
+        return None
+    window = st.slider(
+        "Zoom window",
+        min_value=first,
+        max_value=last,
+        value=(first, last),
+        format="YYYY-MM-DD",
+        key=key,
+    )
+    return None if tuple(window) == (first, last) else tuple(window)
 
-                st.markdown("<div style='height: 20px;'></div>", unsafe_allow_html=True)
 
-                st.markdown(
-                    """
-                <div style="background-color: #F5F5F5; padding: 1rem; border-radius: 8px; margin-bottom: 1rem;">
-                    <h4 style="margin-top: 0;">Commit Size Metrics</h4>
-                    <p style="color: #666; margin-bottom: 0;">Average size and complexity of commits</p>
-                </div>
-                """,
-                    unsafe_allow_html=True,
-                )
+def _render_activity_tab(commits, df_commits, cube, fingerprint):
+    """Вкладка «Activity»: паттерны активности по дням и неделям"""
+    # Графики активности без анимации
+    st.markdown("### 📊 Developer Activity Patterns")
 
-                col1, col2 = st.columns(2)
-                with col1:
-                    # Определяем размер коммита
-                    size_category = "Large"
-                    size_color = "#EF3124"
-                    if avg_changes < 50:
-                        size_category = "Small"
-                        size_color = "#4CAF50"
-                    elif avg_changes < 200:
-                        size_category = "Medium"
-                        size_color = "#FF9800"
-
-                    st.markdown(
-                        f"""
-                    <div style="background-color: #F8F8F8; padding: 1rem; border-radius: 8px; text-align: center;">
-                        <div style="font-size: 0.9rem; color: #666;">Average Changes</div>
-                        <div style="font-size: 1.8rem; font-weight: 700; color: {size_color};">{avg_changes:.1f}</div>
-                        <div style="font-size: 0.9rem; color: #666; margin-top: 5px;">lines per commit</div>
-                        <div style="margin-top: 10px; font-weight: 600; color: {size_color};">{size_category} Commits</div>
-                    </div>
-                    """,
-                        unsafe_allow_html=True,
-                    )
-
-                with col2:
-                    # Определяем сложность коммита по количеству файлов
-                    complexity_category = "High"
-                    complexity_color = "#EF3124"
-                    if avg_files < 2:
-                        complexity_category = "Low"
-                        complexity_color = "#4CAF50"
-                    elif avg_files < 5:
-                        complexity_category = "Medium"
-                        complexity_color = "#FF9800"
-
-                    st.markdown(
-                        f"""
-                    <div style="background-color: #F8F8F8; padding: 1rem; border-radius: 8px; text-align: center;">
-                        <div style="font-size: 0.9rem; color: #666;">Average Scope</div>
-                        <div style="font-size: 1.8rem; font-weight: 700; color: {complexity_color};">{avg_files:.1f}</div>
-                        <div style="font-size: 0.9rem; color: #666; margin-top: 5px;">files per commit</div>
-                        <div style="margin-top: 10px; font-weight: 600; color: {complexity_color};">{complexity_category} Complexity</div>
-                    </div>
-                    """,
-                        unsafe_allow_html=True,
-                    )
-
-    with viz_tabs[2]:
-        # Анализ типов файлов с интерактивными элементами
-        st.markdown("### 📂 File Types Distribution and Analysis")
-        if commits[0].get("files"):
-            # Интерактивная визуализация типов файлов
-            file_types_chart = create_interactive_file_types_chart(commits)
-
-            # Собираем топ измененных файлов
-            file_changes = {}
-            for commit in commits:
-                for file in commit["files"]:
-                    if isinstance(file, dict) and "filename" in file:
-                        filename = file["filename"]
-                        changes = file.get("additions", 0) + file.get("deletions", 0)
-                        if filename in file_changes:
-                            file_changes[filename] += changes
-                        else:
-                            file_changes[filename] = changes
-            # Сортируем и берем топ-15
-            top_files = sorted(file_changes.items(), key=lambda x: x[1], reverse=True)[
-                :15
-            ]
-
-            # Создаем данные для горизонтальной диаграммы
-            file_names = [os.path.basename(file) for file, _ in top_files]
-            file_paths = [file for file, _ in top_files]
-            file_changes_values = [changes for _, changes in top_files]
-            # Определяем типы файлов для цветовой схемы
-            file_types = []
-            for file in file_paths:
-                _, ext = os.path.splitext(file)
-                if ext in [".py", ".java", ".js", ".ts", ".jsx", ".tsx"]:
-                    file_types.append("Code")
-                elif ext in [".html", ".css", ".scss", ".less"]:
-                    file_types.append("UI")
-                elif ext in [".json", ".yaml", ".yml", ".xml", ".toml"]:
-                    file_types.append("Config")
-                elif ext in [".md", ".txt", ".csv", ".rst"]:
-                    file_types.append("Doc")
-                else:
-                    file_types.append("Other")
-
-            # Отображаем диаграммы в двух колонках
-            col1, col2 = st.columns(2)
-            with col1:
-                if file_types_chart:
-                    st.plotly_chart(
-                        file_types_chart,
-                        use_container_width=True,
-                        config={"displayModeBar": False},
-                    )
+    col1, col2 = st.columns(2)
+    with col1:
+        daily_chart = memoize(
+            fingerprint,
+            "daily_chart",
+            create_enhanced_daily_activity_chart,
+            df_commits,
+            cube,
+        )
+        st.plotly_chart(
+            daily_chart, use_container_width=True, config={"displayModeBar": True}
+        )
 
-            with col2:
-                # Создаем интерактивную горизонтальную гистограмму
-                fig = px.bar(
-                    x=file_changes_values,
-                    y=file_names,
-                    color=file_types,
-                    orientation="h",
-                    labels={"x": "Lines Changed", "y": "File"},
-                    title="Top Changed Files",
-                    color_discrete_sequence=ALFA_SEQUENTIAL,
-                    hover_data={"path": file_paths},
-                )
-                # Настраиваем макет с меньшей высотой
-                fig.update_layout(
-                    plot_bgcolor="rgba(0,0,0,0)",
-                    paper_bgcolor="rgba(0,0,0,0)",
-                    font=dict(family="Arial, sans-serif", size=12, color=ALFA_BLACK),
-                    height=520,  # Увеличиваем высоту с 350 до 450
-                    margin=dict(l=10, r=10, t=50, b=10),
-                    yaxis={"categoryorder": "total ascending"},
-                    legend=dict(
-                        title="File Type",
-                        orientation="h",
-                        yanchor="bottom",
-                        y=1.02,
-                        xanchor="right",
-                        x=1,
-                    ),
-                )
-                # Настраиваем подсказки
-                fig.update_traces(
-                    hovertemplate="<b>%{y}</b><br>Changes: %{x}<br>Path: %{customdata[0]}<br>Type: %{marker.color}<extra></extra>"
-                )
-                st.plotly_chart(
-                    fig, use_container_width=True, config={"displayModeBar": False}
-                )
+    with col2:
+        weekly_chart = memoize(
+            fingerprint, "weekly_chart", create_weekly_activity_chart, df_commits, cube
+        )
+        st.plotly_chart(
+            weekly_chart, use_container_width=True, config={"displayModeBar": True}
+        )
 
-    with viz_tabs[3]:
-        # Анализ влияния коммитов
-        st.markdown("### 🔍 Commit Impact Analysis")
+    heatmap = memoize(
+        fingerprint, "activity_heatmap", create_activity_heatmap, df_commits, cube
+    )
+    st.plotly_chart(heatmap, use_container_width=True, config={"displayModeBar": False})
 
-        # График влияния коммитов
-        impact_chart = create_commit_impact_chart(df_commits)
+    # Если в выборке несколько авторов — сравнительные карты по каждому
+    if df_commits["author"].nunique() > 1:
+        author_heatmaps = memoize(
+            fingerprint, "author_heatmaps", create_author_heatmaps, df_commits
+        )
         st.plotly_chart(
-            impact_chart, use_container_width=True, config={"displayModeBar": True}
+            author_heatmaps, use_container_width=True, config={"displayModeBar": False}
+        )
+
+
+def _render_code_changes_tab(commits, df_commits, cube, fingerprint):
+    """Вкладка «Code Changes»: статистика по неделям и размер коммитов"""
+    total_additions = df_commits["additions"].sum()
+    total_deletions = df_commits["deletions"].sum()
+    total_files = df_commits["files_changed"].sum()
+
+    # Добавляем статистику по изменениям кода
+    col1, col2 = st.columns(2)
+    with col1:
+        # Статистика по неделям (из кэша — DataFrame не модифицируем)
+        weekly_stats = memoize(
+            fingerprint, "weekly_stats", compute_weekly_stats, df_commits, cube
         )
 
-        # Добавляем информацию о том, как интерпретировать
         st.markdown(
             """
-        <div style="background-color: #F5F5F5; padding: 1rem; border-radius: 8px; margin: 1rem 0;">
-            <div style="display: flex; align-items: center; margin-bottom: 0.5rem;">
-                <div style="font-size: 1.2rem; margin-right: 10px;">ℹ️</div>
-                <div style="font-weight: 600; color: #333;">About Impact Analysis</div>
-            </div>
-            <p style="margin: 0; color: #666;">
-                The impact analysis visualizes the significance of each commit based on size (lines changed) and complexity (number of files and type of changes).
-                                Larger bubbles represent commits with higher overall impact on the codebase.
-            </p>
+        <div style="background-color: #F5F5F5; padding: 1rem; border-radius: 8px; margin-bottom: 1rem;">
+            <h4 style="margin-top: 0;">Weekly Code Change Statistics</h4>
+            <p style="color: #666; margin-bottom: 0;">Breakdown of code changes by week with efficiency metrics</p>
         </div>
         """,
             unsafe_allow_html=True,
         )
 
-        # Анализ типов коммитов
-        st.markdown("### 📊 Commit Types Distribution")
+        # Создаем интерактивную таблицу
+        st.dataframe(
+            weekly_stats,
+            column_config={
+                "year": st.column_config.NumberColumn("Year", format="%d"),
+                "week": st.column_config.NumberColumn("Week", format="%d"),
+                "additions": st.column_config.NumberColumn("Added", format="%d"),
+                "deletions": st.column_config.NumberColumn("Deleted", format="%d"),
+                "files_changed": st.column_config.NumberColumn(
+                    "Files", format="%d"
+                ),
+                "total_changes": st.column_config.NumberColumn(
+                    "Total", format="%d"
+                ),
+                "complexity": st.column_config.NumberColumn(
+                    "Complexity", format="%.2f"
+                ),
+                "efficiency": st.column_config.ProgressColumn(
+                    "Efficiency",
+                    format="%d%%",
+                    min_value=0,
+                    max_value=100,
+                ),
+            },
+            hide_index=True,
+            use_container_width=True,
+        )
 
-        # Подсчитываем типы коммитов
-        commit_types = df_commits["commit_type"].value_counts().reset_index()
-        commit_types.columns = ["type", "count"]
+    with col2:
+        # Вычисляем соотношение добавленных/удаленных строк с улучшенным индикатором
+        if total_additions + total_deletions > 0:
+            add_ratio = total_additions / (total_additions + total_deletions) * 100
+            del_ratio = 100 - add_ratio
 
-        # Добавляем описания типов коммитов
-        type_descriptions = {
-            "Addition": "New code or features added",
-            "Major Addition": "Significant new code or features",
-            "Modification": "Balanced changes to existing code",
-            "Removal": "Code cleanup or feature removal",
-            "Major Removal": "Significant code removal or refactoring",
-        }
+            st.markdown(
+                """
+            <div style="background-color: #F5F5F5; padding: 1rem; border-radius: 8px; margin-bottom: 1rem;">
+                <h4 style="margin-top: 0;">Code Change Ratio</h4>
+                <p style="color: #666; margin-bottom: 0;">Balance between code additions and deletions</p>
+            </div>
+            """,
+                unsafe_allow_html=True,
+            )
 
-        commit_types["description"] = commit_types["type"].map(type_descriptions)
-
-        # Создаем интерактивную визуализацию
-        fig = px.pie(
-            commit_types,
-            values="count",
-            names="type",
-            title="Commit Types Distribution",
-            color="type",
-            color_discrete_map={
-                "Addition": "#4CAF50",
-                "Major Addition": "#2E7D32",
-                "Modification": "#FF9800",
-                "Removal": "#F44336",
-                "Major Removal": "#B71C1C",
-            },
-            hover_data=["description", "count"],
-        )
+            st.markdown(
+                f"""
+            <div style="display: flex; height: 40px; width: 100%; background-color: #F5F5F5; border-radius: 5px; overflow: hidden; margin-top: 10px; position: relative;">
+                <div style="width: {add_ratio}%; background-color: #4CAF50; height: 100%; display: flex; align-items: center; justify-content: center; color: white; font-weight: bold;">
+                    {add_ratio:.1f}%
+                </div>
+                <div style="width: {del_ratio}%; background-color: #EF3124; height: 100%; display: flex; align-items: center; justify-content: center; color: white; font-weight: bold;">
+                    {del_ratio:.1f}%
+                </div>
+            </div>
+            <div style="display: flex; justify-content: space-between; margin-top: 10px;">
+                <div style="display: flex; align-items: center;"><div style="width: 12px; height: 12px; background-color: #4CAF50; border-radius: 50%; margin-right: 5px;"></div> Added</div>
+                <div style="display: flex; align-items: center;"><div style="width: 12px; height: 12px; background-color: #EF3124; border-radius: 50%; margin-right: 5px;"></div> Deleted</div>
+            </div>
+            """,
+                unsafe_allow_html=True,
+            )
 
-        # Настраиваем макет
-        fig.update_layout(
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            font=dict(family="Arial, sans-serif", size=12, color=ALFA_BLACK),
-            margin=dict(l=10, r=10, t=50, b=10),
-            legend=dict(
-                orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5
-            ),
-        )
+            # Средний размер коммита с визуальным индикатором
+            avg_changes = (total_additions + total_deletions) / len(df_commits)
+            avg_files = total_files / len(df_commits)
 
-        # Настраиваем подсказки
-        fig.update_traces(
-            textinfo="percent+label",
-            hovertemplate="<b>%{label}</b><br>%{customdata[0]}<br>Count: %{customdata[1]} (%{percent})<extra></extra>",
-        )
+            st.markdown("<div style='height: 20px;'></div>", unsafe_allow_html=True)
 
-        col1, col2 = st.columns([3, 2])
-        with col1:
-            st.plotly_chart(
-                fig, use_container_width=True, config={"displayModeBar": False}
+            st.markdown(
+                """
+            <div style="background-color: #F5F5F5; padding: 1rem; border-radius: 8px; margin-bottom: 1rem;">
+                <h4 style="margin-top: 0;">Commit Size Metrics</h4>
+                <p style="color: #666; margin-bottom: 0;">Average size and complexity of commits</p>
+            </div>
+            """,
+                unsafe_allow_html=True,
             )
 
-        with col2:
-            # Добавляем объяснение типов коммитов
-            st.markdown("<h4>Commit Type Definitions</h4>", unsafe_allow_html=True)
-
-            for commit_type, description in type_descriptions.items():
-                color = {
-                    "Addition": "#4CAF50",
-                    "Major Addition": "#2E7D32",
-                    "Modification": "#FF9800",
-                    "Removal": "#F44336",
-                    "Major Removal": "#B71C1C",
-                }.get(commit_type, "#333333")
-
-                count = (
-                    commit_types[commit_types["type"] == commit_type]["count"].values[0]
-                    if commit_type in commit_types["type"].values
-                    else 0
-                )
-                percentage = (
-                    (count / len(df_commits) * 100) if len(df_commits) > 0 else 0
-                )
+            col1, col2 = st.columns(2)
+            with col1:
+                # Определяем размер коммита
+                size_category = "Large"
+                size_color = "#EF3124"
+                if avg_changes < 50:
+                    size_category = "Small"
+                    size_color = "#4CAF50"
+                elif avg_changes < 200:
+                    size_category = "Medium"
+                    size_color = "#FF9800"
 
                 st.markdown(
                     f"""
-                <div style="display: flex; align-items: center; margin-bottom: 0.8rem; background-color: #F8F8F8; padding: 0.8rem; border-radius: 8px;">
-                    <div style="width: 15px; height: 15px; background-color: {color}; border-radius: 50%; margin-right: 10px;"></div>
-                    <div style="flex-grow: 1;">
-                        <div style="font-weight: 600;">{commit_type} ({count}, {percentage:.1f}%)</div>
-                        <div style="font-size: 0.9rem; color: #666;">{description}</div>
-                    </div>
+                <div style="background-color: #F8F8F8; padding: 1rem; border-radius: 8px; text-align: center;">
+                    <div style="font-size: 0.9rem; color: #666;">Average Changes</div>
+                    <div style="font-size: 1.8rem; font-weight: 700; color: {size_color};">{avg_changes:.1f}</div>
+                    <div style="font-size: 0.9rem; color: #666; margin-top: 5px;">lines per commit</div>
+                    <div style="margin-top: 10px; font-weight: 600; color: {size_color};">{size_category} Commits</div>
                 </div>
                 """,
                     unsafe_allow_html=True,
                 )
 
-    with viz_tabs[4]:
-        # Продвинутые метрики и анализ
-        st.markdown("### 📈 Developer Productivity Metrics")
+            with col2:
+                # Определяем сложность коммита по количеству файлов
+                complexity_category = "High"
+                complexity_color = "#EF3124"
+                if avg_files < 2:
+                    complexity_category = "Low"
+                    complexity_color = "#4CAF50"
+                elif avg_files < 5:
+                    complexity_category = "Medium"
+                    complexity_color = "#FF9800"
 
-        # Рассчитываем продвинутые метрики
-        productivity_metrics = {}
+                st.markdown(
+                    f"""
+                <div style="background-color: #F8F8F8; padding: 1rem; border-radius: 8px; text-align: center;">
+                    <div style="font-size: 0.9rem; color: #666;">Average Scope</div>
+                    <div style="font-size: 1.8rem; font-weight: 700; color: {complexity_color};">{avg_files:.1f}</div>
+                    <div style="font-size: 0.9rem; color: #666; margin-top: 5px;">files per commit</div>
+                    <div style="margin-top: 10px; font-weight: 600; color: {complexity_color};">{complexity_category} Complexity</div>
+                </div>
+                """,
+                    unsafe_allow_html=True,
+                )
 
-        # Средний размер коммита
-        productivity_metrics["avg_commit_size"] = df_commits["total_changes"].mean()
+    # Пульс кода: на длинной истории график прореживается, а окно дат
+    # позволяет рассмотреть выбранный участок в полном разрешении
+    st.markdown("### 💓 Code Pulse")
+    window = _zoom_window(df_commits, key=f"code_pulse_window_{fingerprint[:8]}")
+    pulse_chart = memoize(
+        fingerprint,
+        f"code_pulse:{window}",
+        create_code_pulse_visualization,
+        df_commits,
+        window,
+    )
+    st.plotly_chart(
+        pulse_chart, use_container_width=True, config={"displayModeBar": True}
+    )
 
-        # Среднее количество файлов на коммит
-        productivity_metrics["avg_files_per_commit"] = df_commits[
-            "files_changed"
-        ].mean()
 
-        # Коэффициент качества (соотношение добавлений к общим изменениям)
-        productivity_metrics["quality_ratio"] = (
-            df_commits["additions"].sum() / max(1, df_commits["total_changes"].sum())
-        ) * 100
+def _render_file_analysis_tab(commits, df_commits, cube, fingerprint):
+    """Вкладка «File Analysis»: типы файлов и наиболее изменяемые файлы"""
+    # Анализ типов файлов с интерактивными элементами
+    st.markdown("### 📂 File Types Distribution and Analysis")
+    if commits[0].get("files"):
+        # Интерактивная визуализация типов файлов и топ измененных файлов
+        file_index = memoize(fingerprint, "file_index", build_file_index, commits)
+        file_types_chart = memoize(
+            fingerprint,
+            "file_types_chart",
+            create_interactive_file_types_chart,
+            commits,
+            file_index,
+        )
+        top_files_chart = memoize(
+            fingerprint, "top_files_chart", create_top_files_chart, commits, file_index
+        )
 
-        # Коэффициент сложности (средняя сложность коммитов)
-        productivity_metrics["complexity"] = df_commits["complexity"].mean()
+        # Отображаем диаграммы в двух колонках
+        col1, col2 = st.columns(2)
+        with col1:
+            if file_types_chart:
+                st.plotly_chart(
+                    file_types_chart,
+                    use_container_width=True,
+                    config={"displayModeBar": False},
+                )
 
-        # Частота коммитов (коммитов в день)
-        if len(df_commits) > 0:
-            date_range = (df_commits["date"].max() - df_commits["date"].min()).days + 1
-            productivity_metrics["commit_frequency"] = len(df_commits) / max(
-                1, date_range
+        with col2:
+            st.plotly_chart(
+                top_files_chart,
+                use_container_width=True,
+                config={"displayModeBar": False},
             )
-        else:
-            productivity_metrics["commit_frequency"] = 0
-
-        # Коэффициент изменения кода (соотношение изменений к количеству коммитов)
-        productivity_metrics["code_churn_ratio"] = df_commits[
-            "total_changes"
-        ].sum() / max(1, len(df_commits))
-
-        # Создаем радарный график продуктивности
-        categories = [
-            "Commit Size",
-            "Files per Commit",
-            "Quality Ratio",
-            "Complexity",
-            "Commit Frequency",
-            "Code Churn",
-        ]
 
-        # Нормализуем значения для радарного графика
-        # Для некоторых метрик меньше значит лучше, для других - больше
-        radar_values = [
-            min(
-                100, productivity_metrics["avg_commit_size"] / 2
-            ),  # Меньше лучше, ограничиваем 100
-            min(
-                100, productivity_metrics["avg_files_per_commit"] * 10
-            ),  # Меньше лучше, ограничиваем 100
-            productivity_metrics["quality_ratio"],  # Больше лучше (0-100)
-            min(
-                100, productivity_metrics["complexity"] * 10
-            ),  # Меньше лучше, ограничиваем 100
-            min(
-                100, productivity_metrics["commit_frequency"] * 20
-            ),  # Больше лучше, ограничиваем 100
-            min(
-                100, productivity_metrics["code_churn_ratio"] / 5
-            ),  # Меньше лучше, ограничиваем 100
-        ]
 
-        # Инвертируем значения для метрик, где меньше значит лучше
-        radar_values[0] = 100 - radar_values[0]
-        radar_values[1] = 100 - radar_values[1]
-        radar_values[3] = 100 - radar_values[3]
-        radar_values[5] = 100 - radar_values[5]
+def _render_impact_tab(commits, df_commits, cube, fingerprint):
+    """Вкладка «Impact Analysis»: влияние и типы коммитов"""
+    # Анализ влияния коммитов
+    st.markdown("### 🔍 Commit Impact Analysis")
 
-        # Создаем радарный график
-        fig = go.Figure()
+    # График влияния коммитов
+    impact_chart = memoize(
+        fingerprint, "impact_chart", create_commit_impact_chart, df_commits
+    )
+    st.plotly_chart(
+        impact_chart, use_container_width=True, config={"displayModeBar": True}
+    )
 
-        fig.add_trace(
-            go.Scatterpolar(
-                r=radar_values,
-                theta=categories,
-                fill="toself",
-                name="Developer Metrics",
-                line=dict(color=ALFA_RED),
-                fillcolor=f"rgba({int(ALFA_RED[1:3], 16)}, {int(ALFA_RED[3:5], 16)}, {int(ALFA_RED[5:7], 16)}, 0.2)",
-            )
-        )
+    # Добавляем информацию о том, как интерпретировать
+    st.markdown(
+        """
+    <div style="background-color: #F5F5F5; padding: 1rem; border-radius: 8px; margin: 1rem 0;">
+        <div style="display: flex; align-items: center; margin-bottom: 0.5rem;">
+            <div style="font-size: 1.2rem; margin-right: 10px;">ℹ️</div>
+            <div style="font-weight: 600; color: #333;">About Impact Analysis</div>
+        </div>
+        <p style="margin: 0; color: #666;">
+            The impact analysis visualizes the significance of each commit based on size (lines changed) and complexity (number of files and type of changes).
+                            Larger bubbles represent commits with higher overall impact on the codebase.
+        </p>
+    </div>
+    """,
+        unsafe_allow_html=True,
+    )
 
-        # Добавляем эталонные значения
-        fig.add_trace(
-            go.Scatterpolar(
-                r=[70, 70, 70, 70, 70, 70],  # Эталонные значения
-                theta=categories,
-                fill="toself",
-                name="Reference",
-                line=dict(color="#333333", dash="dot"),
-                fillcolor="rgba(200, 200, 200, 0.2)",
-            )
-        )
+    # Анализ типов коммитов
+    st.markdown("### 📊 Commit Types Distribution")
 
-        # Настраиваем макет
-        fig.update_layout(
-            polar=dict(
-                radialaxis=dict(visible=True, range=[0, 100]),
-                angularaxis=dict(
-                    rotation=90,  # Начинаем с верхней точки
-                    direction="clockwise",  # Направление по часовой стрелке
-                ),
-            ),
-            title="Developer Performance Radar",
-            showlegend=True,
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=-0.15,  # Смещаем легенду ниже
-                xanchor="center",
-                x=0.5,
-            ),
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            font=dict(family="Arial, sans-serif", size=12, color=ALFA_BLACK),
-            margin=dict(l=80, r=80, t=50, b=80),  # Увеличиваем нижний отступ
-            height=550,  # Увеличиваем высоту еще больше
+    commit_types = memoize(
+        fingerprint, "commit_type_counts", compute_commit_type_counts, df_commits, cube
+    )
+    fig = memoize(
+        fingerprint, "commit_types_chart", create_commit_types_chart, commit_types
+    )
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        st.plotly_chart(
+            fig, use_container_width=True, config={"displayModeBar": False}
         )
 
-        col1, col2 = st.columns([3, 2])
-        with col1:
-            st.plotly_chart(
-                fig, use_container_width=True, config={"displayModeBar": False}
+    with col2:
+        # Добавляем объяснение типов коммитов
+        st.markdown("<h4>Commit Type Definitions</h4>", unsafe_allow_html=True)
+
+        for commit_type, description in COMMIT_TYPE_DESCRIPTIONS.items():
+            color = COMMIT_TYPE_COLORS.get(commit_type, "#333333")
+
+            count = (
+                commit_types[commit_types["type"] == commit_type]["count"].values[0]
+                if commit_type in commit_types["type"].values
+                else 0
+            )
+            percentage = (
+                (count / len(df_commits) * 100) if len(df_commits) > 0 else 0
             )
 
-        with col2:
-            # Добавляем объяснение метрик
             st.markdown(
-                "<h4>Productivity Metrics Explained</h4>", unsafe_allow_html=True
+                f"""
+            <div style="display: flex; align-items: center; margin-bottom: 0.8rem; background-color: #F8F8F8; padding: 0.8rem; border-radius: 8px;">
+                <div style="width: 15px; height: 15px; background-color: {color}; border-radius: 50%; margin-right: 10px;"></div>
+                <div style="flex-grow: 1;">
+                    <div style="font-weight: 600;">{commit_type} ({count}, {percentage:.1f}%)</div>
+                    <div style="font-size: 0.9rem; color: #666;">{description}</div>
+                </div>
+            </div>
+            """,
+                unsafe_allow_html=True,
             )
 
-            metrics_explanation = {
-                "Commit Size": {
-                    "value": f"{productivity_metrics['avg_commit_size']:.1f} lines",
-                    "description": "Average number of lines changed per commit. Smaller, focused commits are generally better.",
-                    "score": 100
-                    - min(100, productivity_metrics["avg_commit_size"] / 2),
-                },
-                "Files per Commit": {
-                    "value": f"{productivity_metrics['avg_files_per_commit']:.1f} files",
-                    "description": "Average number of files changed in each commit. Lower values indicate more focused changes.",
-                    "score": 100
-                    - min(100, productivity_metrics["avg_files_per_commit"] * 10),
-                },
-                "Quality Ratio": {
-                    "value": f"{productivity_metrics['quality_ratio']:.1f}%",
-                    "description": "Percentage of additions relative to total changes. Higher values suggest more new code vs. rewrites.",
-                    "score": productivity_metrics["quality_ratio"],
-                },
-                "Complexity": {
-                    "value": f"{productivity_metrics['complexity']:.2f}",
-                    "description": "Average complexity of commits based on lines changed per file. Lower is better.",
-                    "score": 100 - min(100, productivity_metrics["complexity"] * 10),
-                },
-                "Commit Frequency": {
-                    "value": f"{productivity_metrics['commit_frequency']:.2f} per day",
-                    "description": "Average number of commits per day. Higher values indicate more regular contributions.",
-                    "score": min(100, productivity_metrics["commit_frequency"] * 20),
-                },
-                "Code Churn": {
-                    "value": f"{productivity_metrics['code_churn_ratio']:.1f} lines/commit",
-                    "description": "Rate of code changes relative to commit count. Lower values suggest more efficient changes.",
-                    "score": 100
-                    - min(100, productivity_metrics["code_churn_ratio"] / 5),
-                },
-            }
-
-            for metric, data in metrics_explanation.items():
-                # Определяем цвет на основе оценки
-                if data["score"] >= 70:
-                    color = "#4CAF50"  # Зеленый для хороших оценок
-                elif data["score"] >= 40:
-                    color = "#FF9800"  # Оранжевый для средних оценок
-                else:
-                    color = "#F44336"  # Красный для низких оценок
 
-                st.markdown(
-                    f"""
-                <div style="margin-bottom: 0.8rem; background-color: #F8F8F8; padding: 0.8rem; border-radius: 8px;">
-                    <div style="display: flex; justify-content: space-between; align-items: center;">
-                        <div style="font-weight: 600;">{metric}</div>
-                        <div style="font-weight: 600; color: {color};">{data["score"]:.0f}/100</div>
-                    </div>
-                    <div style="font-size: 1.1rem; font-weight: 500; margin: 5px 0;">{data["value"]}</div>
-                    <div style="font-size: 0.9rem; color: #666;">{data["description"]}</div>
-                    <div style="margin-top: 8px; height: 6px; background-color: #E0E0E0; border-radius: 3px;">
-                        <div style="height: 100%; width: {data["score"]}%; background-color: {color}; border-radius: 3px;"></div>
-                    </div>
+def _render_advanced_metrics_tab(commits, df_commits, cube, fingerprint):
+    """Вкладка «Advanced Metrics»: метрики продуктивности и тренды"""
+    # Продвинутые метрики и анализ
+    st.markdown("### 📈 Developer Productivity Metrics")
+
+    productivity_metrics = memoize(
+        fingerprint,
+        "productivity_metrics",
+        compute_productivity_metrics,
+        df_commits,
+    )
+    fig = memoize(
+        fingerprint,
+        "productivity_radar",
+        create_productivity_radar_chart,
+        productivity_metrics,
+    )
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        st.plotly_chart(
+            fig, use_container_width=True, config={"displayModeBar": False}
+        )
+
+    with col2:
+        # Добавляем объяснение метрик
+        st.markdown(
+            "<h4>Productivity Metrics Explained</h4>", unsafe_allow_html=True
+        )
+
+        metrics_explanation = {
+            "Commit Size": {
+                "value": f"{productivity_metrics['avg_commit_size']:.1f} lines",
+                "description": "Average number of lines changed per commit. Smaller, focused commits are generally better.",
+                "score": 100
+                - min(100, productivity_metrics["avg_commit_size"] / 2),
+            },
+            "Files per Commit": {
+                "value": f"{productivity_metrics['avg_files_per_commit']:.1f} files",
+                "description": "Average number of files changed in each commit. Lower values indicate more focused changes.",
+                "score": 100
+                - min(100, productivity_metrics["avg_files_per_commit"] * 10),
+            },
+            "Quality Ratio": {
+                "value": f"{productivity_metrics['quality_ratio']:.1f}%",
+                "description": "Percentage of additions relative to total changes. Higher values suggest more new code vs. rewrites.",
+                "score": productivity_metrics["quality_ratio"],
+            },
+            "Complexity": {
+                "value": f"{productivity_metrics['complexity']:.2f}",
+                "description": "Average complexity of commits based on lines changed per file. Lower is better.",
+                "score": 100 - min(100, productivity_metrics["complexity"] * 10),
+            },
+            "Commit Frequency": {
+                "value": f"{productivity_metrics['commit_frequency']:.2f} per day",
+                "description": "Average number of commits per day. Higher values indicate more regular contributions.",
+                "score": min(100, productivity_metrics["commit_frequency"] * 20),
+            },
+            "Code Churn": {
+                "value": f"{productivity_metrics['code_churn_ratio']:.1f} lines/commit",
+                "description": "Rate of code changes relative to commit count. Lower values suggest more efficient changes.",
+                "score": 100
+                - min(100, productivity_metrics["code_churn_ratio"] / 5),
+            },
+        }
+
+        for metric, data in metrics_explanation.items():
+            # Определяем цвет на основе оценки
+            if data["score"] >= 70:
+                color = "#4CAF50"  # Зеленый для хороших оценок
+            elif data["score"] >= 40:
+                color = "#FF9800"  # Оранжевый для средних оценок
+            else:
+                color = "#F44336"  # Красный для низких оценок
+
+            st.markdown(
+                f"""
+            <div style="margin-bottom: 0.8rem; background-color: #F8F8F8; padding: 0.8rem; border-radius: 8px;">
+                <div style="display: flex; justify-content: space-between; align-items: center;">
+                    <div style="font-weight: 600;">{metric}</div>
+                    <div style="font-weight: 600; color: {color};">{data["score"]:.0f}/100</div>
                 </div>
-                """,
-                    unsafe_allow_html=True,
-                )
+                <div style="font-size: 1.1rem; font-weight: 500; margin: 5px 0;">{data["value"]}</div>
+                <div style="font-size: 0.9rem; color: #666;">{data["description"]}</div>
+                <div style="margin-top: 8px; height: 6px; background-color: #E0E0E0; border-radius: 3px;">
+                    <div style="height: 100%; width: {data["score"]}%; background-color: {color}; border-radius: 3px;"></div>
+                </div>
+            </div>
+            """,
+                unsafe_allow_html=True,
+            )
 
-        # Добавляем анализ трендов
-        st.markdown("### 📊 Trend Analysis")
+    # Добавляем анализ трендов
+    st.markdown("### 📊 Trend Analysis")
 
-        # Подготавливаем данные для анализа трендов
-        trend_data = df_commits.sort_values("datetime").copy()
+    fig = memoize(
+        fingerprint, "trend_chart", create_trend_analysis_chart, df_commits
+    )
+    st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": True})
 
-        # Добавляем скользящие средние и другие метрики трендов
-        window_size = max(1, len(trend_data) // 10)  # Адаптивный размер окна
+    # Добавляем выводы и рекомендации
+    st.markdown(
+        """
+    <div style="background-color: #F5F5F5; padding: 1.2rem; border-radius: 8px; margin-top: 1.5rem;">
+        <h4 style="margin-top: 0;">Summary and Recommendations</h4>
+        <p style="color: #666;">
+            Based on the analysis of commit patterns and code changes, here are some insights and recommendations:
+        </p>
+        <ul style="color: #666;">
+            <li><strong>Code Quality:</strong> Consider the balance between additions and deletions in your commits. A healthy ratio suggests good code evolution.</li>
+            <li><strong>Commit Size:</strong> Aim for smaller, more focused commits that are easier to review and less prone to introducing bugs.</li>
+            <li><strong>Complexity Management:</strong> Monitor the complexity trend to ensure it stays manageable over time.</li>
+            <li><strong>File Organization:</strong> Pay attention to which file types see the most changes, as this can indicate areas that might benefit from refactoring.</li>
+        </ul>
+    </div>
+    """,
+        unsafe_allow_html=True,
+    )
 
-        # Добавляем скользящие средние для различных метрик
-        trend_data["additions_ma"] = (
-            trend_data["additions"].rolling(window=window_size, min_periods=1).mean()
-        )
-        trend_data["deletions_ma"] = (
-            trend_data["deletions"].rolling(window=window_size, min_periods=1).mean()
+
+# Разделы дашборда: отрисовывается только выбранный, остальные не вычисляются
+ANALYTICS_TABS = {
+    "📈 Activity": _render_activity_tab,
+    "🔄 Code Changes": _render_code_changes_tab,
+    "📁 File Analysis": _render_file_analysis_tab,
+    "🔍 Impact Analysis": _render_impact_tab,
+    "📊 Advanced Metrics": _render_advanced_metrics_tab,
+}
+
+
+# Столбцы таблицы браузера коммитов и варианты сортировки
+BROWSER_COLUMNS = [
+    "datetime",
+    "sha",
+    "commit_type",
+    "message",
+    "additions",
+    "deletions",
+    "files_changed",
+    "commit_url",
+]
+BROWSER_SORT_OPTIONS = {
+    "Newest first": ("datetime", False),
+    "Oldest first": ("datetime", True),
+    "Largest first": ("total_changes", False),
+    "Most files first": ("files_changed", False),
+}
+BROWSER_PAGE_SIZES = [VISIBLE_COMMITS, 25, 50, 100]
+
+
+def _review_status(commit):
+    if commit.get("llm_summary") or commit.get("llm_reviewed"):
+        return "🤖"
+    if commit.get("llm_pending"):
+        return "⏳"
+    return ""
+
+
+def _render_commit_details(commit, row, on_request_review, load_commit):
+    """Карточка выбранного коммита с его LLM-ревью"""
+    # В списке коммитов задачи ревью нет, только флаг — читаем сам коммит целиком
+    if load_commit and commit.get("llm_reviewed"):
+        commit = load_commit(commit["sha"]) or commit
+    commit_type = str(row["commit_type"])
+    type_color = COMMIT_TYPE_COLORS.get(commit_type, "#333333")
+    commit_sha = row["sha"]
+
+    st.markdown(
+        f"""
+    <div class="commit-card" style="display: flex; padding: 15px; border-radius: 10px; background-color: {ALFA_GRAY}; margin-bottom: 10px; align-items: center; border-left: 4px solid {type_color};">
+        <div style="flex: 0 0 120px; display: flex; flex-direction: column;">
+            <div style="font-weight: 500; color: #333;">{row["datetime"].strftime("%Y-%m-%d")}</div>
+            <div style="font-size: 0.8rem; color: #666;">{row["datetime"].strftime("%H:%M:%S")}</div>
+        </div>
+        <div style="flex: 1; font-weight: 500; display: flex; align-items: center;">
+            <span style="background-color: {type_color}; color: white; font-size: 0.7rem; padding: 2px 8px; border-radius: 10px; margin-right: 10px;">{commit_type}</span>
+            {row["message"]}
+        </div>
+        <div style="flex: 0 0 100px; text-align: right;">
+            <a href="{row["commit_url"]}" target="_blank" style="text-decoration: none; color: {ALFA_RED}; font-family: monospace; background-color: rgba(239, 49, 36, 0.1); padding: 3px 8px; border-radius: 4px; transition: all 0.2s ease;">{commit_sha}</a>
+        </div>
+    </div>
+    """,
+        unsafe_allow_html=True,
+    )
+
+    # Патчи читаются из хранилища только для выбранного коммита
+    files_with_patch = [file for file in commit.get("files") or [] if "patch" in file]
+    if files_with_patch:
+        with st.expander(f"📄 Diff ({len(files_with_patch)} files)"):
+            for file in files_with_patch:
+                st.markdown(f"**{file['filename']}**")
+                st.code(file["patch"], language="diff")
+
+    llm_summary = commit.get("llm_summary", "")
+    if llm_summary:
+        st.markdown("## AI Code Analysis")
+        st.markdown(llm_summary)
+    elif commit.get("llm_pending"):
+        st.caption("⏳ The review is queued and will appear here automatically.")
+        if on_request_review and st.button(
+            "Review this commit next", key=f"review_next_{commit_sha}"
+        ):
+            on_request_review(commit_sha)
+            st.toast(f"Commit {commit_sha} moved to the front of the queue")
+    else:
+        st.caption("No AI analysis for this commit.")
+
+
+def _render_commit_browser(
+    commits, df_commits, fingerprint, on_request_review, load_commit
+):
+    """
+    Постраничный браузер коммитов с поиском, фильтром по типу и сортировкой.
+    Фильтрация и сортировка векторные по всей таблице, а на страницу выводится
+    одна таблица st.dataframe — число виджетов не зависит от числа коммитов.
+    Индекс `df_commits` — позиция коммита в `commits`, по нему для выбранной
+    строки берется LLM-ревью.
+    """
+    st.markdown("### 📋 Commit Browser")
+
+    col1, col2, col3 = st.columns([3, 2, 1])
+    with col1:
+        query = st.text_input(
+            "Search", placeholder="Message or SHA", key="commit_browser_query"
         )
-        trend_data["complexity_ma"] = (
-            trend_data["complexity"].rolling(window=window_size, min_periods=1).mean()
+    with col2:
+        selected_types = st.multiselect(
+            "Commit types", COMMIT_TYPES, key="commit_browser_types"
         )
-        trend_data["files_ma"] = (
-            trend_data["files_changed"]
-            .rolling(window=window_size, min_periods=1)
-            .mean()
+    with col3:
+        sort_label = st.selectbox(
+            "Sort", list(BROWSER_SORT_OPTIONS), key="commit_browser_sort"
         )
 
-        # Создаем интерактивный график трендов без анимации
-        fig = make_subplots(
-            rows=2,
-            cols=2,
-            subplot_titles=(
-                "Code Changes Trend",
-                "Complexity Trend",
-                "Files Changed Trend",
-                "Commit Size Distribution",
-            ),
-            shared_xaxes=True,
-            vertical_spacing=0.1,
-            horizontal_spacing=0.1,
-        )
+    mask = np.ones(len(df_commits), dtype="bool")
+    if query:
+        mask &= df_commits["message"].str.contains(
+            query, case=False, regex=False
+        ).to_numpy() | df_commits["sha"].str.startswith(query.lower()).to_numpy()
+    if selected_types:
+        mask &= df_commits["commit_type"].isin(selected_types).to_numpy()
+
+    sort_column, ascending = BROWSER_SORT_OPTIONS[sort_label]
+    filtered = df_commits[mask].sort_values(
+        sort_column, ascending=ascending, kind="stable"
+    )
 
-        # 1. Тренд изменений кода
-        fig.add_trace(
-            go.Scatter(
-                x=trend_data["datetime"],
-                y=trend_data["additions_ma"],
-                mode="lines",
-                name="Additions Trend",
-                line=dict(color="#4CAF50", width=2),
-            ),
-            row=1,
-            col=1,
-        )
+    if filtered.empty:
+        st.info("No commits match the filters")
+        return
 
-        fig.add_trace(
-            go.Scatter(
-                x=trend_data["datetime"],
-                y=trend_data["deletions_ma"],
-                mode="lines",
-                name="Deletions Trend",
-                line=dict(color=ALFA_RED, width=2),
-            ),
-            row=1,
-            col=1,
+    col1, col2, col3 = st.columns([1, 1, 4])
+    with col1:
+        page_size = st.selectbox(
+            "Rows per page", BROWSER_PAGE_SIZES, key="commit_browser_page_size"
         )
-
-        # 2. Тренд сложности
-        fig.add_trace(
-            go.Scatter(
-                x=trend_data["datetime"],
-                y=trend_data["complexity_ma"],
-                mode="lines",
-                name="Complexity Trend",
-                line=dict(color="#FF9800", width=2),
-                fill="tozeroy",
-                fillcolor="rgba(255, 152, 0, 0.2)",
-            ),
-            row=1,
-            col=2,
+    pages = -(-len(filtered) // page_size)
+    # Фильтры могли сократить число страниц — поправляем номер до создания виджета
+    if st.session_state.get("commit_browser_page", 1) > pages:
+        st.session_state["commit_browser_page"] = pages
+    with col2:
+        page = st.number_input(
+            "Page", min_value=1, max_value=pages, step=1, key="commit_browser_page"
         )
+    with col3:
+        st.caption(f"{len(filtered):,} of {len(df_commits):,} commits • {pages} pages")
 
-        # 3. Тренд количества файлов
-        fig.add_trace(
-            go.Scatter(
-                x=trend_data["datetime"],
-                y=trend_data["files_ma"],
-                mode="lines",
-                name="Files Trend",
-                line=dict(color="#2196F3", width=2),
-                fill="tozeroy",
-                fillcolor="rgba(33, 150, 243, 0.2)",
-            ),
-            row=2,
-            col=1,
-        )
+    page_rows = filtered.iloc[(page - 1) * page_size : page * page_size]
+    table = page_rows[BROWSER_COLUMNS].copy()
+    table.insert(
+        2, "review", [_review_status(commits[position]) for position in page_rows.index]
+    )
 
-        # 4. Распределение размеров коммитов
-        fig.add_trace(
-            go.Histogram(
-                x=trend_data["total_changes"],
-                name="Commit Size",
-                marker=dict(color=ALFA_RED),
-                nbinsx=20,
-                histnorm="probability",
+    # Ключ зависит от страницы и фильтров, чтобы выбор строки сбрасывался при их смене
+    view_key = f"{fingerprint[:8]}_{query}_{selected_types}_{sort_label}_{page_size}_{page}"
+    event = st.dataframe(
+        table,
+        column_config={
+            "datetime": st.column_config.DatetimeColumn(
+                "Date", format="YYYY-MM-DD HH:mm"
             ),
-            row=2,
-            col=2,
-        )
+            "sha": st.column_config.TextColumn("SHA"),
+            "review": st.column_config.TextColumn("AI", width="small"),
+            "commit_type": st.column_config.TextColumn("Type"),
+            "message": st.column_config.TextColumn("Message", width="large"),
+            "additions": st.column_config.NumberColumn("Added", format="%d"),
+            "deletions": st.column_config.NumberColumn("Deleted", format="%d"),
+            "files_changed": st.column_config.NumberColumn("Files", format="%d"),
+            "commit_url": st.column_config.LinkColumn("Link", display_text="Open"),
+        },
+        hide_index=True,
+        use_container_width=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key=f"commit_browser_table_{abs(hash(view_key))}",
+    )
+
+    selected_rows = event.selection.rows if event else []
+    if selected_rows:
+        row = page_rows.iloc[selected_rows[0]]
+        _render_commit_details(commits[row.name], row, on_request_review, load_commit)
+    else:
+        st.caption("Select a row to see the commit details and its AI analysis.")
+
+
+def create_team_comparison_chart(summary):
+    """
+    Коммиты и изменённые строки участников команды (горизонтальные столбцы,
+    порядок — как в таблице сравнения)
+    """
+    names = [row["name"] for row in summary]
+    fig = make_subplots(
+        rows=1,
+        cols=2,
+        subplot_titles=("Commits", "Lines changed"),
+        shared_yaxes=True,
+        horizontal_spacing=0.04,
+    )
+    fig.add_trace(
+        go.Bar(
+            y=names,
+            x=[row["commits"] for row in summary],
+            orientation="h",
+            marker_color=ALFA_RED,
+            name="Commits",
+        ),
+        row=1,
+        col=1,
+    )
+    fig.add_trace(
+        go.Bar(
+            y=names,
+            x=[row["additions"] for row in summary],
+            orientation="h",
+            marker_color="#4CAF50",
+            name="Added",
+        ),
+        row=1,
+        col=2,
+    )
+    fig.add_trace(
+        go.Bar(
+            y=names,
+            x=[row["deletions"] for row in summary],
+            orientation="h",
+            marker_color="#FF9E8D",
+            name="Deleted",
+        ),
+        row=1,
+        col=2,
+    )
+    fig.update_yaxes(autorange="reversed")
+    fig.update_layout(
+        title="Team Comparison",
+        barmode="stack",
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        font=dict(family="Arial, sans-serif", size=12, color=ALFA_BLACK),
+        margin=dict(l=10, r=10, t=80, b=10),
+        legend=dict(orientation="h", yanchor="bottom", y=1.08, xanchor="right", x=1),
+        height=max(300, 28 * len(names) + 140),
+    )
+    return fig
+
 
-        # Настраиваем макет
-        fig.update_layout(
-            title="Developer Activity Trends",
-            showlegend=True,
-            legend=dict(
-                orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5
+def display_team_comparison(commits, members):
+    """
+    Сравнительный дашборд команды: показатели участников, графики коммитов
+    и строк, тепловые карты активности. `members` — участники по ключу
+    (`member_key`), коммиты размечены полем `member`.
+    """
+    from app.services.team_service import partition_by_member, team_summary
+
+    if not commits:
+        st.info("No commits found for the selected team and period")
+        return
+
+    # Ревью догружаются в фоне: таблица (оценки) считается заново, графики — из кэша
+    summary = team_summary(partition_by_member(commits), members)
+    fingerprint = dataset_fingerprint(commits)
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Developers", len(summary))
+    col2.metric("Commits", len(commits))
+    col3.metric("Reviewed", f"{sum(row['reviewed'] for row in summary)}/{len(commits)}")
+
+    st.dataframe(
+        summary,
+        hide_index=True,
+        use_container_width=True,
+        column_order=(
+            "name",
+            "commits",
+            "additions",
+            "deletions",
+            "files_changed",
+            "avg_commit_size",
+            "active_days",
+            "reviewed",
+            "avg_score",
+        ),
+        column_config={
+            "name": "Developer",
+            "commits": "Commits",
+            "additions": "Lines added",
+            "deletions": "Lines deleted",
+            "files_changed": "Files",
+            "avg_commit_size": st.column_config.NumberColumn(
+                "Avg commit size", format="%.0f"
+            ),
+            "active_days": "Active days",
+            "reviewed": "Reviewed",
+            "avg_score": st.column_config.ProgressColumn(
+                "Avg review score", min_value=0, max_value=10, format="%.1f"
             ),
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            font=dict(family="Arial, sans-serif", size=12, color=ALFA_BLACK),
-            margin=dict(l=10, r=10, t=80, b=50),
-            height=600,
+        },
+    )
+
+    chart = memoize(
+        fingerprint, "team_comparison", create_team_comparison_chart, summary
+    )
+    st.plotly_chart(chart, use_container_width=True, config={"displayModeBar": False})
+
+    df_commits = memoize(fingerprint, "commit_frame", prepare_commit_data, commits)
+    if df_commits["author"].nunique() > 1:
+        author_heatmaps = memoize(
+            fingerprint, "author_heatmaps", create_author_heatmaps, df_commits
+        )
+        st.plotly_chart(
+            author_heatmaps, use_container_width=True, config={"displayModeBar": False}
         )
 
-        # Настраиваем оси
-        for i in range(1, 3):
-            for j in range(1, 3):
-                fig.update_xaxes(
-                    showgrid=True,
-                    gridwidth=1,
-                    gridcolor=ALFA_LIGHT_GRAY,
-                    zeroline=False,
-                    row=i,
-                    col=j,
-                )
-                fig.update_yaxes(
-                    showgrid=True,
-                    gridwidth=1,
-                    gridcolor=ALFA_LIGHT_GRAY,
-                    zeroline=False,
-                    row=i,
-                    col=j,
-                )
 
-        st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": True})
+def display_commit_analytics(
+    commits, author_data, on_request_review=None, load_commit=None
+):
+    """
+    Отображает аналитику коммитов в Streamlit с улучшенной визуализацией без анимации.
+    `on_request_review(sha)` вызывается, когда пользователь просит проверить коммит,
+    LLM-ревью которого ещё стоит в очереди. `load_commit(sha)` возвращает коммит
+    с текстом ревью, если в `commits` его нет (только флаг `llm_reviewed`).
+    """
+    if not commits:
+        st.info("No commits found for the selected period")
+        return
 
-        # Добавляем выводы и рекомендации
+    # Применяем стилизацию к Streamlit
+    st.markdown(
+        """
+    <style>
+    div[data-testid="stRadio"] div[role="radiogroup"] {
+        gap: 24px;
+    }
+    div[data-testid="stRadio"] div[role="radiogroup"] label {
+        padding: 0.6rem 0.8rem;
+        background-color: transparent;
+        border-radius: 4px 4px 0px 0px;
+        color: #333333;
+        font-size: 14px;
+        font-weight: 400;
+        transition: all 0.3s ease;
+    }
+    div[data-testid="stRadio"] div[role="radiogroup"] label:has(input:checked) {
+        background-color: #EF3124 !important;
+        color: white !important;
+        font-weight: bold !important;
+        transform: translateY(-3px);
+        box-shadow: 0 4px 10px rgba(239, 49, 36, 0.2);
+    }
+    div[data-testid="stRadio"] div[role="radiogroup"] label:hover {
+        background-color: #FFEBE9;
+        transform: translateY(-2px);
+    }
+    div[data-testid="stMetricValue"] {
+        font-size: 28px;
+        color: #EF3124;
+        font-weight: 700;
+        transition: all 0.3s ease;
+    }
+    div[data-testid="stMetricValue"]:hover {
+        transform: scale(1.05);
+    }
+    div[data-testid="stMetricLabel"] {
+        font-weight: 600;
+    }
+    h1, h2, h3 {
+        color: #333333;
+    }
+    .stDataFrame {
+        border-radius: 8px;
+        overflow: hidden;
+        border: 1px solid #E5E5E5;
+        transition: all 0.3s ease;
+    }
+    .stDataFrame:hover {
+        box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1);
+    }
+    .css-1ht1j8u {
+        overflow-x: auto;
+    }
+    .metric-card {
+        background-color: #F5F5F5;
+        border-radius: 10px;
+        padding: 1rem;
+        transition: all 0.3s ease;
+        height: 100%;
+    }
+    .metric-card:hover {
+        background-color: #FFEBE9;
+        transform: translateY(-5px);
+        box-shadow: 0 6px 15px rgba(239, 49, 36, 0.15);
+    }
+    .commit-card {
+        transition: all 0.3s ease;
+    }
+    .commit-card:hover {
+        transform: translateY(-3px);
+        box-shadow: 0 4px 8px rgba(0, 0, 0, 0.1);
+    }
+    </style>
+    """,
+        unsafe_allow_html=True,
+    )
+
+    # Создаем красивый заголовок с иконкой и метриками
+    st.markdown(
+        f"""
+    <div style="display: flex; align-items: center; margin-bottom: 1rem; background-color: #F5F5F5; padding: 1.5rem; border-radius: 10px; box-shadow: 0 2px 8px rgba(0,0,0,0.05);">
+        <div style="font-size: 3rem; margin-right: 20px; color: #EF3124;">👨‍💻</div>
+        <div style="flex-grow: 1;">
+            <h2 style="margin: 0; padding: 0; font-size: 1.8rem;">{author_data["name"]}</h2>
+            <div style="color: #666; font-size: 1.1rem; margin-top: 5px;">
+                {author_data.get("github_login", "")} • {author_data.get("email", "")}
+            </div>
+        </div>
+        <div style="background-color: #EF3124; color: white; padding: 0.5rem 1rem; border-radius: 30px; font-weight: bold; display: flex; align-items: center;">
+            <span style="margin-right: 5px;">⭐</span> Commit Analytics
+        </div>
+    </div>
+    """,
+        unsafe_allow_html=True,
+    )
+
+    # Преобразуем данные в DataFrame. Таблица и графики кэшируются по отпечатку
+    # набора коммитов, поэтому повторный запуск скрипта их не пересчитывает
+    fingerprint = dataset_fingerprint(commits)
+    df_commits = memoize(fingerprint, "commit_frame", prepare_commit_data, commits)
+    # Общие агрегаты по дате, неделе, дню недели × часу и типу для всех графиков
+    cube = memoize(fingerprint, "commit_cube", CommitCube, df_commits)
+
+    # Отображаем ключевые метрики в красивых карточках
+    st.markdown('<div style="margin-bottom: 1.5rem;">', unsafe_allow_html=True)
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
         st.markdown(
-            """
-        <div style="background-color: #F5F5F5; padding: 1.2rem; border-radius: 8px; margin-top: 1.5rem;">
-            <h4 style="margin-top: 0;">Summary and Recommendations</h4>
-            <p style="color: #666;">
-                Based on the analysis of commit patterns and code changes, here are some insights and recommendations:
-            </p>
-            <ul style="color: #666;">
-                <li><strong>Code Quality:</strong> Consider the balance between additions and deletions in your commits. A healthy ratio suggests good code evolution.</li>
-                <li><strong>Commit Size:</strong> Aim for smaller, more focused commits that are easier to review and less prone to introducing bugs.</li>
-                <li><strong>Complexity Management:</strong> Monitor the complexity trend to ensure it stays manageable over time.</li>
-                <li><strong>File Organization:</strong> Pay attention to which file types see the most changes, as this can indicate areas that might benefit from refactoring.</li>
-            </ul>
+            f"""
+        <div class="metric-card">
+            <div style="font-size: 0.9rem; color: #666; margin-bottom: 0.3rem;">Total Commits</div>
+            <div style="font-size: 1.8rem; font-weight: 700; color: #EF3124;">{len(commits)}</div>
+            <div style="display: flex; align-items: center; margin-top: 0.5rem;">
+                <div style="font-size: 1.2rem; margin-right: 5px;">📊</div>
+                <div style="font-size: 0.8rem; color: #666;">Activity Metric</div>
+            </div>
         </div>
         """,
             unsafe_allow_html=True,
         )
 
-    # Добавляем интерактивную таблицу с коммитами
-    st.markdown("### 📋 Recent Commits")
-
-    # Получаем последние коммиты
-    recent_commits = df_commits.sort_values("datetime", ascending=False).head(10)
-
-    # Создаем красивую таблицу коммитов с экспандерами для LLM анализа и интерактивными элементами
-    for i, row in recent_commits.iterrows():
-        commit_date = row["date"]
-        commit_time = row["time"]
-        commit_msg = row["message"]
-        commit_url = row["commit_url"]
-        commit_sha = row["sha"]
-        commit_type = row["commit_type"]
-        llm_summary = row.get("llm_summary", "")
-
-        # Определяем цвет для типа коммита
-        type_colors = {
-            "Addition": "#4CAF50",
-            "Major Addition": "#2E7D32",
-            "Modification": "#FF9800",
-            "Removal": "#F44336",
-            "Major Removal": "#B71C1C",
-        }
-        type_color = type_colors.get(commit_type, "#333333")
-
-        # Ограничиваем длину сообщения
-        if len(commit_msg) > 70:
-            commit_msg = commit_msg[:67] + "..."
-
-        # Создаем карточку коммита с индикатором наличия LLM анализа
-        has_llm = "🤖 " if llm_summary else ""
-
+    with col2:
+        total_additions = df_commits["additions"].sum()
         st.markdown(
             f"""
-        <div class="commit-card" style="display: flex; padding: 15px; border-radius: 10px; background-color: {ALFA_GRAY}; margin-bottom: 10px; align-items: center; border-left: 4px solid {type_color};">
-            <div style="flex: 0 0 120px; display: flex; flex-direction: column;">
-                <div style="font-weight: 500; color: #333;">{commit_date}</div>
-                <div style="font-size: 0.8rem; color: #666;">{commit_time}</div>
+        <div class="metric-card">
+            <div style="font-size: 0.9rem; color: #666; margin-bottom: 0.3rem;">Lines Added</div>
+            <div style="font-size: 1.8rem; font-weight: 700; color: #4CAF50;">{total_additions:,}</div>
+            <div style="display: flex; align-items: center; margin-top: 0.5rem;">
+                <div style="font-size: 1.2rem; margin-right: 5px;">➕</div>
+                <div style="font-size: 0.8rem; color: #666;">Code Growth</div>
             </div>
-            <div style="flex: 1; font-weight: 500; display: flex; align-items: center;">
-                <span style="background-color: {type_color}; color: white; font-size: 0.7rem; padding: 2px 8px; border-radius: 10px; margin-right: 10px;">{commit_type}</span>
-                {has_llm}{commit_msg}
+        </div>
+        """,
+            unsafe_allow_html=True,
+        )
+
+    with col3:
+        total_deletions = df_commits["deletions"].sum()
+        st.markdown(
+            f"""
+        <div class="metric-card">
+            <div style="font-size: 0.9rem; color: #666; margin-bottom: 0.3rem;">Lines Deleted</div>
+            <div style="font-size: 1.8rem; font-weight: 700; color: #EF3124;">{total_deletions:,}</div>
+            <div style="display: flex; align-items: center; margin-top: 0.5rem;">
+                <div style="font-size: 1.2rem; margin-right: 5px;">➖</div>
+                <div style="font-size: 0.8rem; color: #666;">Code Reduction</div>
             </div>
-            <div style="flex: 0 0 100px; text-align: right;">
-                <a href="{commit_url}" target="_blank" style="text-decoration: none; color: {ALFA_RED}; font-family: monospace; background-color: rgba(239, 49, 36, 0.1); padding: 3px 8px; border-radius: 4px; transition: all 0.2s ease;">{commit_sha}</a>
+        </div>
+        """,
+            unsafe_allow_html=True,
+        )
+
+    with col4:
+        total_files = df_commits["files_changed"].sum()
+        st.markdown(
+            f"""
+        <div class="metric-card">
+            <div style="font-size: 0.9rem; color: #666; margin-bottom: 0.3rem;">Files Changed</div>
+            <div style="font-size: 1.8rem; font-weight: 700; color: #2196F3;">{total_files:,}</div>
+            <div style="display: flex; align-items: center; margin-top: 0.5rem;">
+                <div style="font-size: 1.2rem; margin-right: 5px;">📁</div>
+                <div style="font-size: 0.8rem; color: #666;">Scope Impact</div>
             </div>
         </div>
         """,
             unsafe_allow_html=True,
         )
 
-        # Если есть LLM анализ, показываем его в экспандере с улучшенным форматированием
-        if llm_summary:
-            with st.expander("🤖 View AI Analysis"):
-                # Добавляем заголовок отдельно
-                st.markdown("## AI Code Analysis")
+    st.markdown("</div>", unsafe_allow_html=True)
 
-                # Отображаем анализ LLM как обычный Markdown
-                st.markdown(llm_summary)
+    # Добавляем компактный улучшенный календарь коммитов вверху
+    calendar = memoize(
+        fingerprint, "calendar", create_enhanced_commits_calendar, df_commits, cube
+    )
+    st.plotly_chart(
+        calendar, use_container_width=True, config={"displayModeBar": False}
+    )
+
+    # Переключатель разделов вместо st.tabs: st.tabs выполняет содержимое всех вкладок
+    # при каждом запуске, а здесь строится только выбранный раздел
+    selected_tab = st.radio(
+        "Analytics section",
+        list(ANALYTICS_TABS),
+        horizontal=True,
+        key="analytics_tab",
+        label_visibility="collapsed",
+    )
+    ANALYTICS_TABS[selected_tab](commits, df_commits, cube, fingerprint)
 
-        # Добавляем разделитель для лучшей читаемости
-        if i < len(recent_commits) - 1:
-            st.markdown("<div style='height: 5px;'></div>", unsafe_allow_html=True)
+    # Браузер коммитов: постраничная таблица по всему набору данных
+    _render_commit_browser(
+        commits, df_commits, fingerprint, on_request_review, load_commit
+    )
 
     # Добавляем футер с информацией и кнопками
     st.markdown(
@@ -0,0 +1,7 @@
+"""
+Локальные двойники GitHub REST API и LLM-провайдеров для воспроизводимых
+бенчмарков и нагрузочных тестов без реальных ключей и квот.
+"""
+
+from app.stand_ins.cassette import Cassette
+from app.stand_ins.server import RECORD, REPLAY, LatencyProfile, StandInServer
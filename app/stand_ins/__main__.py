@@ -0,0 +1,81 @@
+import argparse
+import time
+
+from app.stand_ins.cassette import Cassette
+from app.stand_ins.server import RECORD, REPLAY, LatencyProfile, StandInServer
+
+GITHUB_UPSTREAM = "https://api.github.com"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Локальные двойники GitHub и LLM API (запись и воспроизведение кассет)"
+    )
+    parser.add_argument("--mode", choices=[REPLAY, RECORD], default=REPLAY)
+    parser.add_argument("--github-cassette", help="Кассета GitHub REST API")
+    parser.add_argument("--github-port", type=int, default=8701)
+    parser.add_argument("--github-upstream", default=GITHUB_UPSTREAM)
+    parser.add_argument("--llm-cassette", help="Кассета ответов LLM (OpenRouter и YandexGPT)")
+    parser.add_argument("--llm-port", type=int, default=8702)
+    parser.add_argument(
+        "--llm-upstream",
+        default="https://openrouter.ai/api/v1",
+        help="Адрес LLM-провайдера для режима записи",
+    )
+    parser.add_argument(
+        "--synthetic-llm",
+        action="store_true",
+        help="Отвечать детерминированным текстом на незаписанные LLM-запросы",
+    )
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=None)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    github_profile = LatencyProfile(args.latency_ms, args.jitter_ms, args.error_rate)
+    llm_latency = args.latency_ms if args.llm_latency_ms is None else args.llm_latency_ms
+    llm_profile = LatencyProfile(llm_latency, args.jitter_ms, args.error_rate)
+
+    servers = []
+    if args.github_cassette:
+        github = StandInServer(
+            Cassette(args.github_cassette),
+            mode=args.mode,
+            upstream_url=args.github_upstream,
+            profile=github_profile,
+            port=args.github_port,
+            seed=args.seed,
+        )
+        servers.append(github)
+        print(f"GITHUB_BASE_URL={github.start()}")
+    if args.llm_cassette or args.synthetic_llm:
+        llm = StandInServer(
+            Cassette(args.llm_cassette),
+            mode=args.mode,
+            upstream_url=args.llm_upstream,
+            profile=llm_profile,
+            synthetic_llm=args.synthetic_llm,
+            port=args.llm_port,
+            seed=args.seed + 1,
+        )
+        servers.append(llm)
+        base_url = llm.start()
+        print(f"OPENROUTER_BASE_URL={base_url}")
+        print(f"YANDEX_LLM_BASE_URL={base_url}")
+
+    if not servers:
+        parser.error("Укажите --github-cassette, --llm-cassette или --synthetic-llm")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        for server in servers:
+            server.stop()
+            print(f"{server.base_url}: {server.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+# Подставляется вместо адреса реального сервиса при записи и заменяется
+# адресом локального двойника при воспроизведении (ссылки пагинации, поля `url`)
+BASE_URL_PLACEHOLDER = "{{base_url}}"
+
+# Заголовки, которые не сохраняются в кассету
+_SKIPPED_HEADERS = {
+    "authorization",
+    "content-length",
+    "content-encoding",
+    "transfer-encoding",
+    "connection",
+    "date",
+    "set-cookie",
+}
+
+
+def request_key(method: str, target: str, body: bytes = b"") -> str:
+    """
+    Ключ запроса: метод, путь и отсортированные query-параметры.
+    Для запросов с телом (POST к LLM) добавляется хэш тела.
+    """
+    parts = urlsplit(target)
+    query = "&".join(f"{k}={v}" for k, v in sorted(parse_qsl(parts.query)))
+    key = f"{method.upper()} {parts.path}"
+    if query:
+        key += f"?{query}"
+    if body:
+        key += f" #{hashlib.sha256(body).hexdigest()[:16]}"
+    return key
+
+
+class Cassette:
+    """
+    Набор записанных пар запрос/ответ в JSON-файле.
+    Один и тот же запрос можно воспроизводить сколько угодно раз.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._interactions: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for interaction in json.load(f).get("interactions", []):
+                    self._interactions[interaction["key"]] = interaction
+
+    def __len__(self) -> int:
+        return len(self._interactions)
+
+    def find(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._interactions.get(key)
+
+    def add(
+        self,
+        key: str,
+        status: int,
+        headers: Dict[str, str],
+        body: str,
+        upstream_url: str = "",
+    ):
+        """Добавляет ответ, заменяя адрес реального сервиса на плейсхолдер"""
+        if upstream_url:
+            upstream_url = upstream_url.rstrip("/")
+            body = body.replace(upstream_url, BASE_URL_PLACEHOLDER)
+            headers = {
+                name: value.replace(upstream_url, BASE_URL_PLACEHOLDER)
+                for name, value in headers.items()
+            }
+        headers = {
+            name: value
+            for name, value in headers.items()
+            if name.lower() not in _SKIPPED_HEADERS
+        }
+        with self._lock:
+            self._interactions[key] = {
+                "key": key,
+                "status": status,
+                "headers": headers,
+                "body": body,
+            }
+
+    def interactions(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._interactions.values())
+
+    def save(self, path: Optional[str] = None):
+        path = path or self.path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"interactions": self.interactions()}, f, ensure_ascii=False, indent=1
+            )
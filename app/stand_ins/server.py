@@ -0,0 +1,228 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+import requests
+
+from app.stand_ins.cassette import BASE_URL_PLACEHOLDER, Cassette, request_key
+
+REPLAY = "replay"
+RECORD = "record"
+
+
+class LatencyProfile:
+    """Искусственная задержка ответов и доля ответов с ошибкой"""
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        error_statuses: Tuple[int, ...] = (429, 500, 502),
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+
+
+def synthetic_llm_response(path: str, body: bytes) -> Dict:
+    """
+    Детерминированный ответ LLM для незаписанных запросов: один и тот же
+    промпт всегда даёт одинаковый ответ в формате OpenRouter или YandexGPT.
+    """
+    digest = hashlib.sha256(body).hexdigest()
+    score = 5 + int(digest[:2], 16) % 6
+    prompt_tokens = max(1, len(body) // 3)
+    text = (
+        "### 📋 Краткое описание изменений\n"
+        f"Синтетический ответ {digest[:8]} для нагрузочного тестирования.\n\n"
+        "### ✅ Best practice\n- Изменения сгруппированы по смыслу.\n\n"
+        "### ⚠️ Проблемы и уязвимости\n- Не выявлено.\n\n"
+        "### 🧩 Паттерны и антипаттерны\n- Не выявлено.\n\n"
+        f"### 📊 Итоговая оценка\n{score}/10\n\n✅ Всё корректно"
+    )
+    completion_tokens = len(text) // 3
+    if path.endswith("/completion"):
+        return {
+            "result": {
+                "alternatives": [
+                    {
+                        "message": {"role": "assistant", "text": text},
+                        "status": "ALTERNATIVE_STATUS_FINAL",
+                    }
+                ],
+                "usage": {
+                    "inputTextTokens": str(prompt_tokens),
+                    "completionTokens": str(completion_tokens),
+                    "totalTokens": str(prompt_tokens + completion_tokens),
+                },
+            }
+        }
+    return {
+        "id": f"gen-{digest[:12]}",
+        "choices": [{"message": {"role": "assistant", "content": text}}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.stand_in.handle(self)
+
+    def do_POST(self):
+        self.server.stand_in.handle(self)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer:
+    """
+    Локальный двойник внешнего HTTP API (GitHub REST, OpenRouter, YandexGPT).
+    В режиме `replay` отдаёт ответы из кассеты, в режиме `record` проксирует
+    запросы к `upstream_url` и записывает ответы в кассету.
+    Задержка и ошибки задаются `LatencyProfile` и воспроизводимы при фиксированном seed.
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        mode: str = REPLAY,
+        upstream_url: str = "",
+        profile: Optional[LatencyProfile] = None,
+        synthetic_llm: bool = False,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: int = 0,
+    ):
+        self.cassette = cassette
+        self.mode = mode
+        self.upstream_url = upstream_url.rstrip("/")
+        self.profile = profile or LatencyProfile()
+        self.synthetic_llm = synthetic_llm
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "injected_errors": 0, "misses": 0}
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.stand_in = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """Запускает сервер в фоновом потоке и возвращает его адрес"""
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="stand-in", daemon=True
+        )
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self.mode == RECORD and self.cassette.path:
+            self.cassette.save()
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def _draw(self) -> Tuple[float, Optional[int]]:
+        """Задержка (с) и статус внедряемой ошибки (или None)"""
+        profile = self.profile
+        with self._random_lock:
+            delay = max(0.0, self._random.gauss(profile.latency_ms, profile.jitter_ms))
+            error = None
+            if profile.error_rate and self._random.random() < profile.error_rate:
+                error = self._random.choice(profile.error_statuses)
+        return delay / 1000.0, error
+
+    def handle(self, handler: BaseHTTPRequestHandler):
+        self._count("requests")
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = handler.rfile.read(length) if length else b""
+        key = request_key(handler.command, handler.path, body)
+
+        delay, error = self._draw()
+        if delay:
+            time.sleep(delay)
+        if error is not None:
+            self._count("injected_errors")
+            headers = {"Content-Type": "application/json"}
+            if error == 429:
+                headers["Retry-After"] = "1"
+            self._send(handler, error, headers, json.dumps({"message": "Injected error"}))
+            return
+
+        if self.mode == RECORD:
+            status, headers, text = self._forward(handler, body)
+            self.cassette.add(key, status, headers, text, upstream_url=self.upstream_url)
+            interaction = self.cassette.find(key)
+            self._send(
+                handler, interaction["status"], interaction["headers"], interaction["body"]
+            )
+            return
+
+        interaction = self.cassette.find(key)
+        if interaction is not None:
+            self._send(
+                handler, interaction["status"], interaction["headers"], interaction["body"]
+            )
+        elif self.synthetic_llm and handler.command == "POST":
+            self._send(
+                handler,
+                200,
+                {"Content-Type": "application/json"},
+                json.dumps(synthetic_llm_response(handler.path, body), ensure_ascii=False),
+            )
+        else:
+            self._count("misses")
+            self._send(
+                handler,
+                404,
+                {"Content-Type": "application/json"},
+                json.dumps({"message": f"Not recorded: {key}"}, ensure_ascii=False),
+            )
+
+    def _forward(self, handler: BaseHTTPRequestHandler, body: bytes):
+        headers = {
+            name: value
+            for name, value in handler.headers.items()
+            if name.lower() not in ("host", "content-length", "accept-encoding")
+        }
+        response = requests.request(
+            handler.command,
+            f"{self.upstream_url}{handler.path}",
+            headers=headers,
+            data=body or None,
+        )
+        return response.status_code, dict(response.headers), response.text
+
+    def _send(self, handler: BaseHTTPRequestHandler, status: int, headers: Dict[str, str], text: str):
+        payload = text.replace(BASE_URL_PLACEHOLDER, self.base_url).encode("utf-8")
+        handler.send_response(status)
+        for name, value in headers.items():
+            handler.send_header(name, value.replace(BASE_URL_PLACEHOLDER, self.base_url))
+        handler.send_header("Content-Length", str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
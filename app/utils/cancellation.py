@@ -0,0 +1,69 @@
+import threading
+from typing import Callable, List, Optional
+
+
+class OperationCancelled(BaseException):
+    """
+    Операция отменена пользователем.
+    Наследуется от BaseException (как asyncio.CancelledError), чтобы отмену
+    не проглатывали широкие `except Exception` в сервисах.
+    """
+
+
+class CancellationToken:
+    """Кооперативная отмена: долгие операции периодически проверяют токен"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        """Отменяет операцию и вызывает зарегистрированные обработчики"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Ошибка обработчика отмены: {e}")
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise OperationCancelled()
+
+    def wait(self, timeout: float) -> bool:
+        """Ждёт отмены не дольше `timeout` секунд; True — если операция отменена"""
+        return self._event.wait(timeout)
+
+    def add_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Регистрирует обработчик отмены (например, закрытие HTTP-сессии).
+        Возвращает функцию, снимающую обработчик. Если токен уже отменён,
+        обработчик вызывается сразу.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+
+                def remove():
+                    with self._lock:
+                        if callback in self._callbacks:
+                            self._callbacks.remove(callback)
+
+                return remove
+        callback()
+        return lambda: None
+
+
+def check_cancelled(token: Optional[CancellationToken]):
+    """Бросает OperationCancelled, если передан отменённый токен"""
+    if token is not None:
+        token.raise_if_cancelled()
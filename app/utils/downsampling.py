@@ -0,0 +1,83 @@
+import os
+
+import numpy as np
+
+# Максимум точек на линию графика (порядка двух точек на пиксель ширины графика)
+MAX_CHART_POINTS = int(os.getenv("CHART_MAX_POINTS", "2000"))
+
+# Начиная с этого числа точек трассы рисуются через WebGL (Scattergl)
+WEBGL_THRESHOLD = int(os.getenv("CHART_WEBGL_THRESHOLD", "1000"))
+
+
+def _as_float(values) -> np.ndarray:
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype("datetime64[ns]").astype("int64").astype("float64")
+    return values.astype("float64")
+
+
+def lttb_indices(x, y, threshold: int = MAX_CHART_POINTS) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: индексы `threshold` точек, визуально
+    наиболее близких к исходной линии. Первая и последняя точки сохраняются.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = _as_float(x)
+    y = _as_float(y)
+
+    # Границы корзин: первая и последняя точки — отдельные корзины
+    edges = np.linspace(1, n - 1, threshold - 1).astype("int64")
+    selected = np.empty(threshold, dtype="int64")
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    anchor = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        next_start = end
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_end = max(next_end, next_start + 1)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Площадь треугольника (опорная точка, кандидат, среднее следующей корзины)
+        area = np.abs(
+            (x[anchor] - avg_x) * (y[start:end] - y[anchor])
+            - (x[anchor] - x[start:end]) * (avg_y - y[anchor])
+        )
+        anchor = start + int(area.argmax())
+        selected[i + 1] = anchor
+
+    return selected
+
+
+def minmax_indices(y, buckets: int = MAX_CHART_POINTS // 2, keep: str = "both") -> np.ndarray:
+    """
+    Индексы минимума и максимума (`keep="both"`) или только максимума
+    (`keep="max"`) в каждой из `buckets` равных корзин. Выбросы не теряются,
+    в отличие от прореживания через одну точку.
+    """
+    n = len(y)
+    per_bucket = 2 if keep == "both" else 1
+    if n <= buckets * per_bucket:
+        return np.arange(n)
+
+    bucket = np.arange(n) * buckets // n
+    order = np.lexsort((_as_float(y), bucket))
+    ends = np.cumsum(np.bincount(bucket, minlength=buckets))
+    starts = ends - np.bincount(bucket, minlength=buckets)
+
+    picked = [order[ends - 1], [0, n - 1]]
+    if keep == "both":
+        picked.append(order[starts])
+    return np.unique(np.concatenate(picked))
+
+
+def downsample_indices(x, y, max_points: int = MAX_CHART_POINTS, method: str = "lttb"):
+    """Индексы точек для отрисовки линии методом `lttb` или `minmax`"""
+    if method == "minmax":
+        return minmax_indices(y, buckets=max(1, max_points // 2))
+    return lttb_indices(x, y, max_points)
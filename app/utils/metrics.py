@@ -0,0 +1,354 @@
+"""
+Метрики процесса в текстовом формате Prometheus: счётчики, gauge-и и гистограммы
+с метками, общий для процесса реестр и экспорт на локальный порт (`/metrics`)
+или в файл (для textfile collector node_exporter).
+
+    LLM_REQUESTS = get_registry().counter(
+        "llm_requests_total", "Запросы к LLM", ("provider", "status")
+    )
+    LLM_REQUESTS.inc(provider="yandex", status="200")
+
+Длительность каждого span-а трассировки (app/utils/tracing.py) попадает
+в гистограмму `stage_duration_seconds{stage=...}` автоматически.
+"""
+
+import math
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+
+from app.utils.tracing import Span, get_tracer
+
+load_dotenv()
+
+# Порт HTTP-эндпоинта /metrics; пусто — эндпоинт не запускается
+METRICS_PORT = os.getenv("METRICS_PORT", "")
+# Файл, куда периодически записываются метрики; пусто — не записываются
+METRICS_FILE = os.getenv("METRICS_FILE", "")
+METRICS_FILE_INTERVAL = float(os.getenv("METRICS_FILE_INTERVAL", "15"))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Границы гистограмм в секундах: стандартные корзины Prometheus
+# и дополнительные для долгих ответов LLM
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_BUCKETS += (30.0, 60.0, 120.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Метрика с набором меток; значения хранятся по кортежу значений меток"""
+
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name}: ожидаются метки {self.labelnames}, "
+                f"получены {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self):
+        """Строки (суффикс имени, метки, значение) для текстового формата"""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {_escape(self.documentation)}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for suffix, labels, value in self._samples():
+            lines.append(
+                f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}"
+            )
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Монотонно растущий счётчик"""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        if amount < 0:
+            raise ValueError(f"{self.name}: счётчик не может уменьшаться")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield "", dict(zip(self.labelnames, key)), value
+
+
+class Gauge(_Metric):
+    """Текущее значение; может вычисляться функцией в момент экспорта"""
+
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function: Callable[[], float], **labels):
+        """Значение будет запрашиваться у `function` при каждом экспорте"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = function
+
+    def value(self, **labels) -> Optional[float]:
+        with self._lock:
+            value = self._values.get(self._key(labels))
+        return value() if callable(value) else value
+
+    def _samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            if callable(value):
+                try:
+                    value = value()
+                except Exception as e:
+                    print(f"[metrics] Ошибка вычисления {self.name}: {e}")
+                    continue
+            if value is not None:
+                yield "", dict(zip(self.labelnames, key)), value
+
+
+class Histogram(_Metric):
+    """Распределение наблюдений по корзинам (кумулятивно, как в Prometheus)"""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {
+                    "counts": [0] * len(self.buckets),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][i] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    def _samples(self):
+        with self._lock:
+            items = [
+                (key, list(state["counts"]), state["sum"], state["count"])
+                for key, state in self._values.items()
+            ]
+        for key, counts, total, count in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield "_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield "_sum", labels, total
+            yield "_count", labels, count
+
+
+class Registry:
+    """Реестр метрик: повторная регистрация имени возвращает ту же метрику"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(
+                    f"Метрика {name} уже зарегистрирована как {metric.type}"
+                )
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames=()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets)
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+def _observe_span(registry: Registry) -> Callable[[Span], None]:
+    durations = registry.histogram(
+        "stage_duration_seconds", "Длительность этапов анализа (span-ов)", ("stage",)
+    )
+    errors = registry.counter(
+        "stage_errors_total", "Этапы, завершившиеся исключением", ("stage",)
+    )
+
+    def observe(span: Span):
+        durations.observe(span.duration, stage=span.name)
+        if span.status == "error":
+            errors.inc(stage=span.name)
+
+    return observe
+
+
+_registry: Optional[Registry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> Registry:
+    """Общий для процесса реестр; длительности span-ов записываются в него"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = Registry()
+            get_tracer().add_processor(_observe_span(_registry))
+        return _registry
+
+
+# Общие для кэшей процесса (графики, патчи): доля попаданий — hit / (hit + miss)
+CACHE_REQUESTS = get_registry().counter(
+    "cache_requests_total",
+    "Обращения к кэшам (result — hit или miss)",
+    ("cache", "result"),
+)
+CACHE_BYTES = get_registry().gauge("cache_bytes", "Объём данных в кэше", ("cache",))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: Registry
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(
+    port: int, host: str = "127.0.0.1", registry: Optional[Registry] = None
+) -> ThreadingHTTPServer:
+    """Запускает в фоновом потоке HTTP-эндпоинт /metrics"""
+    handler = type(
+        "MetricsHandler", (_MetricsHandler,), {"registry": registry or get_registry()}
+    )
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(
+        target=server.serve_forever, name="metrics-http", daemon=True
+    ).start()
+    print(f"[metrics] Метрики доступны на http://{host}:{port}/metrics")
+    return server
+
+
+def write_metrics(path: str, registry: Optional[Registry] = None):
+    """Атомарно записывает метрики в файл"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write((registry or get_registry()).render())
+    os.replace(tmp_path, path)
+
+
+def _write_periodically(path: str, interval: float):
+    while True:
+        time.sleep(interval)
+        try:
+            write_metrics(path)
+        except OSError as e:
+            print(f"[metrics] Не удалось записать {path}: {e}")
+
+
+_exporters_started = False
+
+
+def start_exporters():
+    """
+    Запускает экспорт, настроенный в окружении (`METRICS_PORT`, `METRICS_FILE`).
+    Повторные вызовы ничего не делают.
+    """
+    global _exporters_started
+    with _registry_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+    if METRICS_PORT:
+        try:
+            serve_metrics(int(METRICS_PORT))
+        except OSError as e:
+            print(f"[metrics] Не удалось открыть порт {METRICS_PORT}: {e}")
+    if METRICS_FILE:
+        threading.Thread(
+            target=_write_periodically,
+            args=(METRICS_FILE, METRICS_FILE_INTERVAL),
+            name="metrics-file",
+            daemon=True,
+        ).start()
+
@@ -0,0 +1,195 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from app.utils.cancellation import CancellationToken, OperationCancelled
+from app.utils.tracing import span
+
+# Лимиты по умолчанию (запросов и токенов в минуту) — переопределяются через .env.
+# 0 — без ограничения: GitHub API по умолчанию не ограничивается по частоте, только
+# приостанавливается при исчерпании лимита (см. GitService); `GITHUB_RPM` задаёт
+# общий бюджет запросов в минуту для всех потоков процесса
+DEFAULT_LIMITS = {
+    "openrouter": {"rpm": 20, "tpm": 200_000},
+    "yandex": {"rpm": 60, "tpm": 300_000},
+    "github": {"rpm": 0, "tpm": 0},
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Грубая оценка количества токенов в тексте (≈3 символа на токен для RU/EN)"""
+    return max(1, len(text or "") // 3)
+
+
+class TokenBucket:
+    """
+    Ведро токенов с равномерным пополнением `per_minute` единиц в минуту
+    (`per_minute=0` — ведро не ограничивает)
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Сколько секунд ждать, пока в ведре наберётся `amount` единиц"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+    def refund(self, amount: float):
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class ProviderRateLimiter:
+    """
+    Общий для процесса лимитер одного внешнего API (LLM-провайдера или GitHub).
+    Запросы не отклоняются, а встают в FIFO-очередь и ждут, пока в ведрах
+    запросов/минуту и токенов/минуту хватит ёмкости.
+    """
+
+    def __init__(self, provider: str, requests_per_minute: int, tokens_per_minute: int):
+        self.provider = provider
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._cond = threading.Condition()
+        self._next_ticket = 0
+        self._serving = 0
+        self._abandoned = set()
+        self._paused_until = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Количество запросов, ожидающих своей очереди"""
+        with self._cond:
+            return self._next_ticket - self._serving - len(self._abandoned)
+
+    def _advance(self):
+        """Передаёт очередь следующему билету, пропуская покинувшие очередь"""
+        self._serving += 1
+        while self._serving in self._abandoned:
+            self._abandoned.discard(self._serving)
+            self._serving += 1
+        self._cond.notify_all()
+
+    def acquire(self, tokens: int, cancel_token: Optional[CancellationToken] = None):
+        """
+        Блокирует поток, пока запрос с `tokens` токенами не уложится в лимиты.
+        При отмене `cancel_token` запрос покидает очередь с OperationCancelled.
+        """
+        with self._cond:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            depth = ticket - self._serving
+            if depth > 0:
+                print(f"⏳ {self.provider}: запрос в очереди, перед ним {depth}")
+
+            while True:
+                if cancel_token is not None and cancel_token.is_cancelled:
+                    if ticket == self._serving:
+                        self._advance()
+                    else:
+                        self._abandoned.add(ticket)
+                    raise OperationCancelled()
+
+                # Короткие ожидания, чтобы вовремя заметить отмену
+                poll = 0.5 if cancel_token is not None else None
+                if ticket == self._serving:
+                    now = time.monotonic()
+                    wait = max(
+                        self._paused_until - now,
+                        self.requests.wait_time(1, now),
+                        self.tokens.wait_time(tokens, now),
+                    )
+                    if wait <= 0:
+                        break
+                    self._cond.wait(timeout=min(wait, poll) if poll else wait)
+                else:
+                    self._cond.wait(timeout=poll)
+
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+            self._advance()
+
+    def settle(self, reserved: int, used: Optional[int]):
+        """Возвращает в ведро неиспользованную часть зарезервированных токенов"""
+        if used is None or used >= reserved:
+            return
+        with self._cond:
+            self.tokens.refund(reserved - used)
+            self._cond.notify_all()
+
+    def pause(self, seconds: float):
+        """Приостанавливает выдачу слотов (например, после ответа 429)"""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def stats(self) -> Dict[str, float]:
+        with self._cond:
+            now = time.monotonic()
+            self.requests._refill(now)
+            self.tokens._refill(now)
+            return {
+                "queue_depth": self._next_ticket - self._serving - len(self._abandoned),
+                "requests_available": round(self.requests.tokens, 1),
+                "tokens_available": round(self.tokens.tokens),
+            }
+
+
+_limiters: Dict[str, ProviderRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> ProviderRateLimiter:
+    """
+    Возвращает лимитер провайдера (один на процесс, общий для всех сессий Streamlit).
+    Лимиты берутся из переменных окружения `<PROVIDER>_RPM` и `<PROVIDER>_TPM`.
+    """
+    with _limiters_lock:
+        if provider not in _limiters:
+            defaults = DEFAULT_LIMITS.get(provider, {"rpm": 60, "tpm": 100_000})
+            prefix = provider.upper()
+            _limiters[provider] = ProviderRateLimiter(
+                provider,
+                requests_per_minute=int(os.getenv(f"{prefix}_RPM", defaults["rpm"])),
+                tokens_per_minute=int(os.getenv(f"{prefix}_TPM", defaults["tpm"])),
+            )
+        return _limiters[provider]
+
+
+@contextmanager
+def rate_limited(
+    provider: str, tokens: int, cancel_token: Optional[CancellationToken] = None
+):
+    """
+    Резервирует слот у лимитера провайдера на время запроса.
+    Через возвращаемый dict можно сообщить фактический расход: `slot["used"] = ...`
+    """
+    limiter = get_rate_limiter(provider)
+    with span("rate_limit.wait", provider=provider, tokens=tokens):
+        limiter.acquire(tokens, cancel_token)
+    slot = {"reserved": tokens, "used": None}
+    try:
+        yield slot
+    finally:
+        limiter.settle(tokens, slot["used"])
+
+
+def get_queue_depths() -> Dict[str, int]:
+    """Текущая глубина очередей по всем провайдерам"""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.provider: limiter.queue_depth for limiter in limiters}
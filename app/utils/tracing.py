@@ -0,0 +1,419 @@
+"""
+Лёгкая трассировка этапов анализа: вложенные span-ы с атрибутами (repo, sha,
+provider, tokens, bytes), общий для процесса трассировщик и экспорт в локальные
+файлы — JSONL (строка на span) и/или OTLP/JSON (строка на трассу, формат
+ExportTraceServiceRequest).
+
+    with span("github.page", repo=repo_name, page=1) as current:
+        ...
+        current.set_attribute("commits", 30)
+
+    @traced("llm.ask_qwen", provider="openrouter")
+    def ask_qwen(prompt): ...
+
+Сводка по файлу трассы:
+
+    python -m app.utils.tracing data/traces/spans.jsonl [--trace TRACE_ID]
+"""
+
+import argparse
+import contextvars
+import functools
+import json
+import os
+import random
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Экспорт: "jsonl", "otlp" или оба через запятую; пусто — только в памяти
+TRACE_EXPORT = os.getenv("TRACE_EXPORT", "")
+TRACE_DIR = os.getenv("TRACE_DIR", os.path.join("data", "traces"))
+# Сколько последних трасс хранить в памяти процесса
+TRACE_RECENT = int(os.getenv("TRACE_RECENT", "100"))
+
+SERVICE_NAME = "code-quality-reporter"
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+class Span:
+    """
+    Интервал работы этапа с атрибутами; время — в наносекундах Unix.
+    Атрибуты со значением None не сохраняются.
+    """
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "status",
+        "error",
+    )
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, attributes=None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else _new_id(128)
+        self.span_id = _new_id(64)
+        self.parent_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = {}
+        self.set_attributes(**(attributes or {}))
+        self.status = "ok"
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, **attributes):
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    @property
+    def duration(self) -> float:
+        """Длительность в секундах (для незавершённого span — до текущего момента)"""
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+            "status": self.status,
+            "error": self.error,
+        }
+
+
+class JsonlExporter:
+    """Пишет каждый завершённый span отдельной JSON-строкой"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(span: Span) -> Dict[str, Any]:
+    data = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [
+            {"key": key, "value": _otlp_value(value)}
+            for key, value in span.attributes.items()
+        ],
+        "status": {"code": 2, "message": span.error}
+        if span.status == "error"
+        else {"code": 1},
+    }
+    if span.parent_id:
+        data["parentSpanId"] = span.parent_id
+    return data
+
+
+class OtlpJsonExporter:
+    """
+    Пишет трассу целиком (после завершения корневого span) строкой в формате
+    OTLP/JSON ExportTraceServiceRequest — файл читается OpenTelemetry Collector
+    (receiver `otlpjsonfile`) и совместимыми инструментами.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._pending: Dict[str, List[Span]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        with self._lock:
+            self._pending[span.trace_id].append(span)
+            if span.parent_id is not None:
+                return
+            spans = self._pending.pop(span.trace_id)
+            request = {
+                "resourceSpans": [
+                    {
+                        "resource": {
+                            "attributes": [
+                                {
+                                    "key": "service.name",
+                                    "value": {"stringValue": SERVICE_NAME},
+                                }
+                            ]
+                        },
+                        "scopeSpans": [
+                            {
+                                "scope": {"name": __name__},
+                                "spans": [_otlp_span(item) for item in spans],
+                            }
+                        ],
+                    }
+                ]
+            }
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(request, ensure_ascii=False) + "\n")
+
+
+class Tracer:
+    """
+    Трассировщик процесса: создаёт span-ы (родитель берётся из contextvars),
+    хранит последние трассы в памяти, передаёт завершённые span-ы экспортёрам
+    и подписчикам (`add_processor`). Трассы вытесняются по давности последнего
+    завершённого span-а, поэтому долгая задача не вытесняется, пока идёт.
+    """
+
+    def __init__(self, exporters=None, recent_traces: int = TRACE_RECENT):
+        self.exporters = list(exporters or [])
+        self.recent_traces = recent_traces
+        self._traces: "OrderedDict[str, List[Span]]" = OrderedDict()
+        # Корневые span-ы трасс из памяти, в том числе ещё не завершённые
+        self._roots: Dict[str, Span] = {}
+        self._processors: List[Callable[[Span], None]] = []
+        self._lock = threading.Lock()
+
+    def add_processor(self, processor: Callable[[Span], None]):
+        """Подписка на завершённые span-ы (например, для метрик)"""
+        self._processors.append(processor)
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        parent = _current_span.get()
+        current = Span(name, parent, attributes)
+        if parent is None:
+            with self._lock:
+                self._roots[current.trace_id] = current
+                self._trace_spans(current.trace_id)
+        token = _current_span.set(current)
+        try:
+            yield current
+        except BaseException as e:
+            current.status = "error"
+            current.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            current.end_ns = time.time_ns()
+            _current_span.reset(token)
+            self._finish(current)
+
+    def _trace_spans(self, trace_id: str) -> List[Span]:
+        """Список span-ов трассы (создаётся при необходимости); вызывать под замком"""
+        spans = self._traces.get(trace_id)
+        if spans is None:
+            spans = self._traces[trace_id] = []
+            while len(self._traces) > self.recent_traces:
+                evicted, _ = self._traces.popitem(last=False)
+                self._roots.pop(evicted, None)
+        else:
+            self._traces.move_to_end(trace_id)
+        return spans
+
+    def _finish(self, span: Span):
+        with self._lock:
+            self._trace_spans(span.trace_id).append(span)
+        for handler in self._processors + [e.export for e in self.exporters]:
+            try:
+                handler(span)
+            except Exception as e:
+                print(f"[tracing] Ошибка обработки span {span.name}: {e}")
+
+    def get_trace(self, trace_id: str) -> List[Span]:
+        """Завершённые span-ы трассы (из памяти процесса)"""
+        with self._lock:
+            return list(self._traces.get(trace_id, ()))
+
+    def get_root(self, trace_id: str) -> Optional[Span]:
+        """Корневой span трассы (может быть ещё не завершён)"""
+        with self._lock:
+            return self._roots.get(trace_id)
+
+    def find_traces(self, **attributes) -> List[str]:
+        """
+        Трассы (в том числе незавершённые), корневой span которых имеет указанные
+        атрибуты; недавно обновлявшиеся — первыми.
+        """
+        with self._lock:
+            roots = [
+                self._roots[trace_id]
+                for trace_id in reversed(self._traces)
+                if trace_id in self._roots
+            ]
+        return [
+            root.trace_id
+            for root in roots
+            if all(
+                root.attributes.get(key) == value for key, value in attributes.items()
+            )
+        ]
+
+
+def _exporters_from_env() -> list:
+    exporters = []
+    kinds = {kind.strip().lower() for kind in TRACE_EXPORT.split(",") if kind.strip()}
+    if "jsonl" in kinds:
+        exporters.append(JsonlExporter(os.path.join(TRACE_DIR, "spans.jsonl")))
+    if "otlp" in kinds:
+        exporters.append(OtlpJsonExporter(os.path.join(TRACE_DIR, "traces.otlp.json")))
+    return exporters
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Общий для процесса трассировщик (экспорт настраивается `TRACE_EXPORT`)"""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer(_exporters_from_env())
+        return _tracer
+
+
+def span(name: str, **attributes):
+    """Контекстный менеджер span-а в общем трассировщике"""
+    return get_tracer().span(name, **attributes)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def set_attributes(**attributes):
+    """Добавляет атрибуты текущему span-у (если трассировка идёт)"""
+    current = _current_span.get()
+    if current is not None:
+        current.set_attributes(**attributes)
+
+
+def traced(name: Optional[str] = None, **attributes):
+    """Декоратор: выполняет функцию внутри span-а `name` (по умолчанию — имя функции)"""
+
+    def decorator(function):
+        span_name = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(span_name, **attributes):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def load_spans(path: str) -> List[Dict[str, Any]]:
+    """Читает span-ы из JSONL-файла экспортёра"""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def summarize(spans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Сводка по именам span-ов: число вызовов, суммарное и «собственное» время
+    (без вложенных span-ов) — показывает, куда ушло время.
+    """
+    children_ms = defaultdict(float)
+    for item in spans:
+        if item.get("parent_id"):
+            children_ms[item["parent_id"]] += item["duration_ms"]
+
+    rows = {}
+    for item in spans:
+        row = rows.setdefault(
+            item["name"],
+            {
+                "name": item["name"],
+                "calls": 0,
+                "total_ms": 0.0,
+                "self_ms": 0.0,
+                "errors": 0,
+            },
+        )
+        row["calls"] += 1
+        row["total_ms"] += item["duration_ms"]
+        row["self_ms"] += max(0.0, item["duration_ms"] - children_ms[item["span_id"]])
+        row["errors"] += item.get("status") == "error"
+    return sorted(rows.values(), key=lambda row: -row["self_ms"])
+
+
+def _print_tree(spans: List[Dict[str, Any]]):
+    children = defaultdict(list)
+    for item in spans:
+        children[item.get("parent_id")].append(item)
+
+    def walk(parent_id, depth):
+        for item in sorted(children[parent_id], key=lambda s: s["start_ns"]):
+            attributes = ", ".join(f"{k}={v}" for k, v in item["attributes"].items())
+            print(
+                f"{'  ' * depth}{item['name']:<{40 - 2 * depth}} "
+                f"{item['duration_ms']:>10.1f} ms  {attributes}"
+            )
+            walk(item["span_id"], depth + 1)
+
+    walk(None, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сводка по файлу трассы (JSONL)")
+    parser.add_argument("path")
+    parser.add_argument("--trace", help="Показать дерево span-ов одной трассы")
+    args = parser.parse_args()
+
+    spans = load_spans(args.path)
+    if args.trace:
+        spans = [item for item in spans if item["trace_id"] == args.trace]
+        _print_tree(spans)
+        return
+
+    print(f"{'span':<36} {'calls':>7} {'total, s':>10} {'self, s':>10} {'errors':>7}")
+    for row in summarize(spans):
+        print(
+            f"{row['name']:<36} {row['calls']:>7} {row['total_ms'] / 1000:>10.2f} "
+            f"{row['self_ms'] / 1000:>10.2f} {row['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
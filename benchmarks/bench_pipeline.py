@@ -0,0 +1,362 @@
+"""
+Сквозной замер анализа: GitService.get_repository_commits (загрузка коммитов
+и LLM-ревью в два прохода) и generate_full_quality_report против локальных
+двойников GitHub и LLM (app/stand_ins) с заданным профилем задержек.
+
+    python -m benchmarks.bench_pipeline --commits 40 --profile typical
+    python -m benchmarks.bench_pipeline --commits 200 --sessions 4 --profile slow --rpm 600
+
+Печатает пропускную способность (коммитов в минуту), число LLM-вызовов на
+коммит и p50/p95 по этапам; `--json` сохраняет отчёт в файл. Лимиты запросов
+к LLM по умолчанию сняты, чтобы замер показывал конвейер, а не настройку
+лимитера; `--rpm` / `--tpm` включают их.
+"""
+
+import argparse
+import copy
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Dict, List
+
+import numpy as np
+from github.Requester import Requester
+
+import app.models.llm_service as llm_service
+import app.services.full_quality_report as full_quality_report
+import app.services.git_service as git_service_module
+from app.services.full_quality_report import generate_full_quality_report
+from app.services.git_service import GitService
+from app.stand_ins import Cassette, LatencyProfile, StandInServer
+from app.stand_ins.cassette import BASE_URL_PLACEHOLDER, request_key
+from benchmarks.synthetic import generate_commits
+
+REPO = "bench/repo"
+AUTHOR = "dev0"
+SINCE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+UNTIL = datetime(2024, 12, 31, tzinfo=timezone.utc)
+PER_PAGE = 30
+
+# Профили задержек: (GitHub, LLM). Ошибки 429 LLM повторяются лимитером,
+# ошибки 502 GitHub — встроенными повторами PyGithub
+PROFILES = {
+    "instant": (LatencyProfile(), LatencyProfile()),
+    "typical": (LatencyProfile(80, 30), LatencyProfile(1500, 500)),
+    "slow": (LatencyProfile(300, 100), LatencyProfile(6000, 2000)),
+    "flaky": (
+        LatencyProfile(80, 30, error_rate=0.02, error_statuses=(502,)),
+        LatencyProfile(1500, 500, error_rate=0.05, error_statuses=(429,)),
+    ),
+}
+
+_JSON = {"Content-Type": "application/json"}
+_GITHUB_DATE = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def _commit_json(commit, detailed: bool) -> Dict:
+    """Коммит в формате GitHub REST API (списка или детального ответа)"""
+    data = {
+        "sha": commit["sha"],
+        "url": f"{BASE_URL_PLACEHOLDER}/repos/{REPO}/commits/{commit['sha']}",
+        "html_url": commit["url"],
+        "commit": {
+            "message": commit["message"],
+            "author": {
+                "name": commit["author"],
+                "email": commit["author_email"],
+                "date": commit["date"].strftime(_GITHUB_DATE),
+            },
+        },
+    }
+    if detailed:
+        data["stats"] = commit["stats"]
+        data["files"] = commit["files"]
+    return data
+
+
+def build_github_cassette(commits, per_page: int = PER_PAGE) -> Cassette:
+    """
+    Кассета GitHub API для `GitService.list_commits(REPO, AUTHOR, SINCE, UNTIL)`:
+    репозиторий, постраничный список коммитов со ссылками пагинации,
+    запрос `totalCount` и детальный ответ по каждому коммиту.
+    """
+    cassette = Cassette()
+    cassette.add(
+        request_key("GET", f"/repos/{REPO}"),
+        200,
+        _JSON,
+        json.dumps(
+            {
+                "id": 1,
+                "name": REPO.split("/")[1],
+                "full_name": REPO,
+                "url": f"{BASE_URL_PLACEHOLDER}/repos/{REPO}",
+            }
+        ),
+    )
+
+    query = (
+        f"author={AUTHOR}&since={SINCE.strftime(_GITHUB_DATE)}"
+        f"&until={UNTIL.strftime(_GITHUB_DATE)}"
+    )
+    path = f"/repos/{REPO}/commits?{query}"
+
+    def link(page: int, rel: str, size: str = "") -> str:
+        return f'<{BASE_URL_PLACEHOLDER}{path}{size}&page={page}>; rel="{rel}"'
+
+    # totalCount: PyGithub запрашивает одну запись и читает номер последней страницы
+    headers = dict(_JSON)
+    if len(commits) > 1:
+        headers["Link"] = ", ".join(
+            [link(2, "next", "&per_page=1"), link(len(commits), "last", "&per_page=1")]
+        )
+    cassette.add(
+        request_key("GET", f"{path}&per_page=1"),
+        200,
+        headers,
+        json.dumps([_commit_json(commit, False) for commit in commits[:1]]),
+    )
+
+    pages = [commits[i : i + per_page] for i in range(0, len(commits), per_page)]
+    pages = pages or [[]]
+    for number, page in enumerate(pages, start=1):
+        headers = dict(_JSON)
+        if number < len(pages):
+            headers["Link"] = ", ".join(
+                [link(number + 1, "next"), link(len(pages), "last")]
+            )
+        target = path if number == 1 else f"{path}&page={number}"
+        cassette.add(
+            request_key("GET", target),
+            200,
+            headers,
+            json.dumps([_commit_json(commit, False) for commit in page]),
+        )
+
+    for commit in commits:
+        cassette.add(
+            request_key("GET", f"/repos/{REPO}/commits/{commit['sha']}"),
+            200,
+            _JSON,
+            json.dumps(_commit_json(commit, True), ensure_ascii=False),
+        )
+    return cassette
+
+
+class StageTimer:
+    """Длительности вызовов по этапам (потокобезопасно)"""
+
+    def __init__(self):
+        self._durations: Dict[str, List[float]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            self._durations[stage].append(seconds)
+
+    def wrap(self, stage, function):
+        """Оборачивает функцию; `stage` — имя этапа или функция от аргументов"""
+
+        @wraps(function)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                name = stage(*args, **kwargs) if callable(stage) else stage
+                self.record(name, time.perf_counter() - started)
+
+        return timed
+
+    def count(self, stage: str) -> int:
+        with self._lock:
+            return len(self._durations.get(stage, ()))
+
+    def report(self) -> List[Dict]:
+        with self._lock:
+            stages = {stage: list(values) for stage, values in self._durations.items()}
+        rows = []
+        for stage, values in stages.items():
+            values = np.asarray(values) * 1000
+            rows.append(
+                {
+                    "stage": stage,
+                    "calls": len(values),
+                    "total_s": round(values.sum() / 1000, 3),
+                    "p50_ms": round(float(np.percentile(values, 50)), 1),
+                    "p95_ms": round(float(np.percentile(values, 95)), 1),
+                    "max_ms": round(float(values.max()), 1),
+                }
+            )
+        return rows
+
+
+def _github_stage(requester, verb, url, *args, **kwargs):
+    if re.search(r"/commits/[0-9a-f]{40}", url):
+        return "github.commit"
+    return "github.list"
+
+
+def instrument(timer: StageTimer):
+    """
+    Подменяет функции конвейера обёртками с замером времени и возвращает
+    функцию, восстанавливающую оригиналы
+    """
+    patches = [
+        (Requester, "requestJsonAndCheck", _github_stage),
+        (GitService, "build_commit_data", "build_commit_data"),
+        (GitService, "review_commit", "review_commit"),
+        (git_service_module, "ask_qwen", "llm.review"),
+        (git_service_module, "revise_code_review_with_gemini", "llm.revision"),
+        (full_quality_report, "ask_yandex_gpt", "llm.report"),
+    ]
+    originals = []
+    for owner, name, stage in patches:
+        original = getattr(owner, name)
+        originals.append((owner, name, original))
+        setattr(owner, name, timer.wrap(stage, original))
+
+    def restore():
+        for owner, name, original in originals:
+            setattr(owner, name, original)
+
+    return restore
+
+
+def run_session(timer: StageTimer, base_url: str, use_llm: bool, report: bool):
+    """Один пользователь: анализ коммитов и (опционально) итоговый отчёт"""
+    service = GitService(base_url=base_url)
+    started = time.perf_counter()
+    commits = service.get_repository_commits(
+        REPO,
+        developer_username=AUTHOR,
+        start_date=SINCE.strftime("%Y-%m-%d"),
+        end_date=UNTIL.strftime("%Y-%m-%d"),
+        use_llm=use_llm,
+    )
+    timer.record("analysis", time.perf_counter() - started)
+    if report and commits:
+        started = time.perf_counter()
+        generate_full_quality_report(commits)
+        timer.record("full_report", time.perf_counter() - started)
+    return len(commits)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--commits", type=int, default=40)
+    parser.add_argument("--sessions", type=int, default=1, help="Параллельные анализы")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="typical")
+    parser.add_argument(
+        "--github-latency-ms", type=float, help="Задержка GitHub без джиттера"
+    )
+    parser.add_argument(
+        "--llm-latency-ms", type=float, help="Задержка LLM без джиттера"
+    )
+    parser.add_argument(
+        "--rpm", type=int, default=0, help="Лимит запросов в минуту к LLM (0 — нет)"
+    )
+    parser.add_argument(
+        "--tpm", type=int, default=0, help="Лимит токенов в минуту к LLM (0 — нет)"
+    )
+    parser.add_argument("--no-llm", action="store_true", help="Без LLM-ревью")
+    parser.add_argument("--no-report", action="store_true", help="Без итогового отчёта")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Сохранить отчёт в JSON")
+    args = parser.parse_args()
+
+    # Лимитеры создаются при первом вызове LLM — задаём лимиты заранее, иначе
+    # действовали бы лимиты приложения по умолчанию (20 запросов в минуту)
+    for provider in ("OPENROUTER", "YANDEX"):
+        os.environ[f"{provider}_RPM"] = str(args.rpm)
+        os.environ[f"{provider}_TPM"] = str(args.tpm)
+
+    github_profile, llm_profile = map(copy.copy, PROFILES[args.profile])
+    if args.github_latency_ms is not None:
+        github_profile.latency_ms, github_profile.jitter_ms = args.github_latency_ms, 0
+    if args.llm_latency_ms is not None:
+        llm_profile.latency_ms, llm_profile.jitter_ms = args.llm_latency_ms, 0
+
+    commits = generate_commits(
+        args.commits,
+        seed=args.seed,
+        start=SINCE,
+        days=(UNTIL - SINCE).days,
+        authors=1,
+        review_ratio=0,
+        with_patches=True,
+    )
+    github = StandInServer(
+        build_github_cassette(commits), profile=github_profile, seed=args.seed
+    )
+    llm = StandInServer(
+        Cassette(), profile=llm_profile, synthetic_llm=True, seed=args.seed + 1
+    )
+    github_url = github.start()
+    llm_service.OPENROUTER_BASE_URL = llm_service.YANDEX_LLM_BASE_URL = llm.start()
+
+    timer = StageTimer()
+    restore = instrument(timer)
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+            analyzed = sum(
+                pool.map(
+                    lambda _: run_session(
+                        timer, github_url, not args.no_llm, not args.no_report
+                    ),
+                    range(args.sessions),
+                )
+            )
+    finally:
+        elapsed = time.perf_counter() - started
+        restore()
+        github.stop()
+        llm.stop()
+
+    llm_calls = timer.count("llm.review") + timer.count("llm.revision")
+    summary = {
+        "profile": args.profile,
+        "sessions": args.sessions,
+        "llm_rpm_limit": args.rpm or "unlimited",
+        "llm_tpm_limit": args.tpm or "unlimited",
+        "commits": analyzed,
+        "wall_s": round(elapsed, 2),
+        "commits_per_min": round(analyzed / elapsed * 60, 1) if elapsed else 0.0,
+        "llm_calls_per_commit": round(llm_calls / analyzed, 2) if analyzed else 0.0,
+        "llm_http_requests": llm.stats()["requests"],
+        "github_http_requests": github.stats()["requests"],
+        "injected_errors": github.stats()["injected_errors"]
+        + llm.stats()["injected_errors"],
+    }
+    stages = sorted(timer.report(), key=lambda row: -row["total_s"])
+
+    print(
+        f"\n{'stage':<20} {'calls':>6} {'total, s':>9} {'p50, ms':>9} "
+        f"{'p95, ms':>9} {'max, ms':>9}"
+    )
+    for row in stages:
+        print(
+            f"{row['stage']:<20} {row['calls']:>6} {row['total_s']:>9.2f} "
+            f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['max_ms']:>9.1f}"
+        )
+    print()
+    for key, value in summary.items():
+        print(f"{key:<22} {value}")
+
+    if args.json:
+        os.makedirs(os.path.dirname(args.json) or ".", exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "stages": stages}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
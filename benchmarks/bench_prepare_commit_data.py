@@ -0,0 +1,143 @@
+"""
+Сравнение векторной сборки prepare_commit_data с прежней построчной реализацией.
+
+    python -m benchmarks.bench_prepare_commit_data [--sizes 10000 100000]
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+
+from app.services.visualization_service import prepare_commit_data
+from benchmarks.synthetic import generate_commits
+
+
+def legacy_prepare_commit_data(commits):
+    """Построчная реализация prepare_commit_data до перехода на векторную сборку"""
+    commit_data = []
+    for commit in commits:
+        commit_date = (
+            commit["date"].date()
+            if isinstance(commit["date"], datetime)
+            else commit["date"]
+        )
+        commit_time = (
+            commit["date"].time()
+            if isinstance(commit["date"], datetime)
+            else datetime.min.time()
+        )
+
+        # Расчет дополнительных метрик
+        additions = commit["stats"]["additions"]
+        deletions = commit["stats"]["deletions"]
+        files_changed = len(commit["files"])
+        total_changes = additions + deletions
+
+        # Рассчитываем сложность изменений (соотношение изменений к файлам)
+        complexity = total_changes / max(1, files_changed)
+
+        # Определяем тип коммита на основе соотношения добавлений/удалений
+        if additions == 0 and deletions > 0:
+            commit_type = "Removal"
+        elif deletions == 0 and additions > 0:
+            commit_type = "Addition"
+        elif additions > deletions * 3:
+            commit_type = "Major Addition"
+        elif deletions > additions * 3:
+            commit_type = "Major Removal"
+        else:
+            commit_type = "Modification"
+
+        commit_data.append(
+            {
+                "date": commit_date,
+                "time": commit_time,
+                "datetime": (
+                    commit["date"]
+                    if isinstance(commit["date"], datetime)
+                    else datetime.combine(commit_date, commit_time)
+                ),
+                "additions": additions,
+                "deletions": deletions,
+                "files_changed": files_changed,
+                "total_changes": total_changes,
+                "complexity": complexity,
+                "commit_type": commit_type,
+                "hour": (
+                    commit["date"].hour if isinstance(commit["date"], datetime) else 0
+                ),
+                "day_of_week": (
+                    commit["date"].strftime("%A")
+                    if isinstance(commit["date"], datetime)
+                    else "Unknown"
+                ),
+                "week_of_year": (
+                    commit["date"].isocalendar()[1]
+                    if isinstance(commit["date"], datetime)
+                    else 0
+                ),
+                "month": (
+                    commit["date"].strftime("%B")
+                    if isinstance(commit["date"], datetime)
+                    else "Unknown"
+                ),
+                "message": (
+                    commit["message"].splitlines()[0]
+                    if commit["message"]
+                    else "No message"
+                ),
+                "commit_url": commit["url"],
+                "sha": commit["sha"][:7],
+                # Добавляем LLM резюме
+                "llm_summary": commit.get("llm_summary", ""),
+                "llm_pending": bool(commit.get("llm_pending")),
+            }
+        )
+
+    df = pd.DataFrame(commit_data)
+
+    if len(df) > 1:
+        df = df.sort_values("datetime")
+        df["additions_ma7"] = df["additions"].rolling(window=7, min_periods=1).mean()
+        df["deletions_ma7"] = df["deletions"].rolling(window=7, min_periods=1).mean()
+        df["changes_ma7"] = df["total_changes"].rolling(window=7, min_periods=1).mean()
+
+    return df
+
+
+def measure(function, commits):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    df = function(commits)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, df.memory_usage(deep=True).sum()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    print(f"{'commits':>8} {'impl':>10} {'time, s':>9} {'peak, MB':>9} {'frame, MB':>10}")
+    for size in args.sizes:
+        commits = generate_commits(size)
+        for name, function in (
+            ("legacy", legacy_prepare_commit_data),
+            ("columnar", prepare_commit_data),
+        ):
+            elapsed, peak, frame = measure(function, commits)
+            print(
+                f"{size:>8} {name:>10} {elapsed:>9.3f} {peak / 2**20:>9.1f} "
+                f"{frame / 2**20:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Время импорта модулей, которые streamlit_app.py загружает до первого экрана,
+по выводу `python -X importtime` в отдельных процессах (холодный интерпретатор).
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 9 --budget-ms 150 --json startup.json
+
+Streamlit считается отдельно: его импорт от приложения не зависит. Код выхода 1,
+если импорт модулей приложения дольше бюджета или на старте загрузилась тяжёлая
+зависимость (pandas, numpy, pyarrow, PyGithub и др.), которая нужна только позже.
+"""
+
+import argparse
+import ast
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_SCRIPT = os.path.join(ROOT, "streamlit_app.py")
+
+# Бюджет импорта модулей приложения (без Streamlit), мс
+DEFAULT_BUDGET_MS = 150.0
+
+# Зависимости, которые должны загружаться при первом использовании, а не на старте
+LAZY_MODULES = (
+    "pandas",
+    "numpy",
+    "pyarrow",
+    "github",
+    "requests",
+    "google.generativeai",
+    "reportlab",
+)
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+
+def startup_modules(script: str = APP_SCRIPT) -> List[str]:
+    """Модули, импортируемые на верхнем уровне скрипта (в порядке импорта)"""
+    with open(script, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), script)
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module]
+        else:
+            continue
+        modules.extend(name for name in names if name not in modules)
+    return modules
+
+
+def parse_importtime(output: str) -> List[Dict]:
+    """Строки `-X importtime`: модуль, уровень вложенности, self и cumulative в мс"""
+    rows = []
+    for line in output.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append(
+                {
+                    "module": name,
+                    "depth": len(indent) // 2,
+                    "self_ms": int(self_us) / 1000,
+                    "cumulative_ms": int(cumulative_us) / 1000,
+                }
+            )
+    return rows
+
+
+def measure_once(modules: List[str]) -> Dict:
+    """Импорт модулей в свежем интерпретаторе: Streamlit первым, затем приложение"""
+    code = "import streamlit\n" + "".join(f"import {name}\n" for name in modules)
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if result.returncode:
+        raise RuntimeError(f"Импорт завершился с ошибкой:\n{result.stderr[-2000:]}")
+
+    rows = parse_importtime(result.stderr)
+    # Группы вывода: вложенные строки печатаются до своего модуля верхнего уровня.
+    # До Streamlit идёт запуск интерпретатора (site, encodings), после него —
+    # то, что приложение загружает сверх Streamlit
+    streamlit_ms, app_rows, group, after_streamlit = 0.0, [], [], False
+    for row in rows:
+        group.append(row)
+        if row["depth"]:
+            continue
+        if row["module"] == "streamlit":
+            streamlit_ms = row["cumulative_ms"]
+            after_streamlit = True
+        elif after_streamlit:
+            app_rows.extend(group)
+        group = []
+    app_ms = sum(row["cumulative_ms"] for row in app_rows if row["depth"] == 0)
+    loaded = {row["module"] for row in rows}
+    return {
+        "wall_ms": round(wall_ms, 1),
+        "streamlit_ms": round(streamlit_ms, 1),
+        "app_ms": round(app_ms, 1),
+        "app_rows": app_rows,
+        "lazy_loaded": sorted(
+            name
+            for name in LAZY_MODULES
+            if any(m == name or m.startswith(name + ".") for m in loaded)
+        ),
+    }
+
+
+def top_modules(rows: List[Dict], limit: int) -> List[Dict]:
+    """Самые долгие модули приложения по собственному времени импорта"""
+    self_ms = defaultdict(float)
+    for row in rows:
+        self_ms[row["module"]] += row["self_ms"]
+    ranked = sorted(self_ms.items(), key=lambda item: -item[1])[:limit]
+    return [{"module": name, "self_ms": round(ms, 1)} for name, ms in ranked]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--runs", type=int, default=5, help="Число процессов")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=float(os.getenv("STARTUP_BUDGET_MS", DEFAULT_BUDGET_MS)),
+        help="Бюджет импорта модулей приложения (медиана), мс",
+    )
+    parser.add_argument("--top", type=int, default=15, help="Сколько модулей вывести")
+    parser.add_argument("--json", help="Сохранить отчёт в JSON")
+    args = parser.parse_args()
+
+    modules = [name for name in startup_modules() if name != "streamlit"]
+    # Прогон для компиляции .pyc: иначе первый замер включает компиляцию
+    measure_once(modules)
+    runs = [measure_once(modules) for _ in range(args.runs)]
+    median_run = sorted(runs, key=lambda run: run["app_ms"])[len(runs) // 2]
+
+    summary = {
+        "runs": len(runs),
+        "app_ms": round(statistics.median(r["app_ms"] for r in runs), 1),
+        "streamlit_ms": round(statistics.median(r["streamlit_ms"] for r in runs), 1),
+        "wall_ms": round(statistics.median(r["wall_ms"] for r in runs), 1),
+        "budget_ms": args.budget_ms,
+        "lazy_loaded": median_run["lazy_loaded"],
+    }
+    top = top_modules(median_run["app_rows"], args.top)
+
+    print(f"{'module':<48} {'self, ms':>9}")
+    for row in top:
+        print(f"{row['module']:<48} {row['self_ms']:>9.1f}")
+    print()
+    for key, value in summary.items():
+        print(f"{key:<14} {value}")
+
+    if args.json:
+        os.makedirs(os.path.dirname(args.json) or ".", exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(
+                {"modules": modules, "summary": summary, "top": top}, f, indent=2
+            )
+
+    failed = False
+    if summary["app_ms"] > args.budget_ms:
+        print(
+            f"\nИмпорт приложения {summary['app_ms']} мс — "
+            f"больше бюджета {args.budget_ms:g} мс"
+        )
+        failed = True
+    if summary["lazy_loaded"]:
+        print(f"\nНа старте загружены: {', '.join(summary['lazy_loaded'])}")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("\nСтарт укладывается в бюджет")
+
+
+if __name__ == "__main__":
+    main()
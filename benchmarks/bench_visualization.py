@@ -0,0 +1,256 @@
+"""
+Замеры слоя визуализации: подготовка DataFrame, куб, индекс файлов, каждый
+построитель графиков и весь дашборд `display_commit_analytics` (без кэша
+и с прогретым кэшем) на синтетических коммитах.
+
+    # замер и сохранение базовой линии
+    python -m benchmarks.bench_visualization --save benchmarks/baselines/visualization.json
+
+    # сравнение с базовой линией (код выхода 1 при регрессии)
+    python -m benchmarks.bench_visualization --compare benchmarks/baselines/visualization.json
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import plotly
+import streamlit
+import streamlit.logger
+from streamlit import config as streamlit_config
+
+from app.services.chart_cache import get_chart_cache
+from app.services.commit_cube import CommitCube
+from app.services.file_index import build_file_index
+from app.services.visualization_service import (
+    compute_commit_type_counts,
+    compute_productivity_metrics,
+    compute_weekly_stats,
+    create_activity_heatmap,
+    create_author_heatmaps,
+    create_code_pulse_visualization,
+    create_commit_impact_chart,
+    create_commit_types_chart,
+    create_enhanced_code_changes_chart,
+    create_enhanced_commits_calendar,
+    create_enhanced_daily_activity_chart,
+    create_interactive_file_types_chart,
+    create_productivity_radar_chart,
+    create_top_files_chart,
+    create_trend_analysis_chart,
+    create_weekly_activity_chart,
+    display_commit_analytics,
+    prepare_commit_data,
+)
+from benchmarks.synthetic import generate_commits
+
+DEFAULT_SIZES = [100, 10_000, 100_000]
+
+# Допустимый рост времени и пиковой памяти относительно базовой линии
+DEFAULT_THRESHOLD = 0.25
+# Изменения меньше этих величин считаются шумом
+MIN_TIME_DELTA = 0.005
+MIN_MEMORY_DELTA_MB = 0.5
+
+
+class Dataset:
+    """Коммиты и производные от них структуры, общие для всех замеров одного размера"""
+
+    def __init__(self, size: int, seed: int):
+        self.size = size
+        self.commits = generate_commits(size, seed=seed)
+        self.df = prepare_commit_data(self.commits)
+        self.cube = CommitCube(self.df)
+        self.file_index = build_file_index(self.commits)
+
+
+def _dashboard(data: Dataset, cold: bool):
+    if cold:
+        get_chart_cache().clear()
+    display_commit_analytics(data.commits, {"name": "Benchmark"})
+
+
+# Название замера → функция от набора данных
+CASES = {
+    "prepare_commit_data": lambda d: prepare_commit_data(d.commits),
+    "commit_cube": lambda d: CommitCube(d.df),
+    "file_index": lambda d: build_file_index(d.commits),
+    "daily_activity_chart": lambda d: create_enhanced_daily_activity_chart(
+        d.df, d.cube
+    ),
+    "weekly_activity_chart": lambda d: create_weekly_activity_chart(d.df, d.cube),
+    "commits_calendar": lambda d: create_enhanced_commits_calendar(d.df, d.cube),
+    "activity_heatmap": lambda d: create_activity_heatmap(d.df, d.cube),
+    "author_heatmaps": lambda d: create_author_heatmaps(d.df),
+    "code_changes_chart": lambda d: create_enhanced_code_changes_chart(d.df, d.cube),
+    "code_pulse": lambda d: create_code_pulse_visualization(d.df),
+    "commit_impact_chart": lambda d: create_commit_impact_chart(d.df),
+    "file_types_chart": lambda d: create_interactive_file_types_chart(
+        d.commits, d.file_index
+    ),
+    "top_files_chart": lambda d: create_top_files_chart(d.commits, d.file_index),
+    "weekly_stats": lambda d: compute_weekly_stats(d.df, d.cube),
+    "commit_types_chart": lambda d: create_commit_types_chart(
+        compute_commit_type_counts(d.df, d.cube)
+    ),
+    "productivity_radar": lambda d: create_productivity_radar_chart(
+        compute_productivity_metrics(d.df)
+    ),
+    "trend_analysis_chart": lambda d: create_trend_analysis_chart(d.df),
+    "dashboard_cold": lambda d: _dashboard(d, cold=True),
+    "dashboard_warm": lambda d: _dashboard(d, cold=False),
+}
+
+
+def _payload_kb(result):
+    """Размер JSON фигуры, который уходит в браузер"""
+    if hasattr(result, "to_plotly_json"):
+        return round(len(result.to_json()) / 1024, 1)
+    return None
+
+
+def measure(case, data: Dataset, repeat: int, memory: bool):
+    """Лучшее время из `repeat` запусков и пиковая память отдельного запуска"""
+    function = CASES[case]
+    if case == "dashboard_warm":
+        _dashboard(data, cold=False)
+
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        result = function(data)
+        times.append(time.perf_counter() - started)
+
+    peak_mb = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        function(data)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak_mb = round(peak / 2**20, 2)
+
+    return {
+        "case": case,
+        "commits": data.size,
+        "time_s": round(min(times), 4),
+        "peak_mb": peak_mb,
+        "payload_kb": _payload_kb(result),
+    }
+
+
+def environment():
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "plotly": plotly.__version__,
+        "streamlit": streamlit.__version__,
+    }
+
+
+def compare(results, baseline, threshold: float):
+    """Печатает сравнение с базовой линией и возвращает список регрессий"""
+    base = {(item["case"], item["commits"]): item for item in baseline["results"]}
+    regressions = []
+    print(
+        f"\n{'case':<24} {'commits':>8} {'base, s':>9} {'now, s':>9} "
+        f"{'Δ time':>8} {'base, MB':>9} {'now, MB':>9}"
+    )
+    for item in results:
+        old = base.get((item["case"], item["commits"]))
+        if old is None:
+            continue
+        ratio = item["time_s"] / old["time_s"] if old["time_s"] else 1.0
+        marks = []
+        if ratio > 1 + threshold and item["time_s"] - old["time_s"] > MIN_TIME_DELTA:
+            marks.append("time")
+        if (
+            item["peak_mb"] is not None
+            and old.get("peak_mb") is not None
+            and item["peak_mb"] > old["peak_mb"] * (1 + threshold)
+            and item["peak_mb"] - old["peak_mb"] > MIN_MEMORY_DELTA_MB
+        ):
+            marks.append("memory")
+        if marks:
+            regressions.append((item, marks))
+        print(
+            f"{item['case']:<24} {item['commits']:>8} {old['time_s']:>9.4f} "
+            f"{item['time_s']:>9.4f} {ratio - 1:>+8.0%} "
+            f"{old.get('peak_mb') or 0:>9.1f} {item['peak_mb'] or 0:>9.1f}"
+            f"{'  ⚠ ' + ', '.join(marks) if marks else ''}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--cases", nargs="+", help="Замеры (по умолчанию все)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="Без tracemalloc")
+    parser.add_argument("--save", help="Сохранить результаты как базовую линию")
+    parser.add_argument("--compare", help="Сравнить с базовой линией из файла")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    cases = args.cases or list(CASES)
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        parser.error(f"неизвестные замеры: {', '.join(sorted(unknown))}")
+
+    # Дашборд вызывается без `streamlit run` — глушим предупреждения bare mode
+    streamlit_config.get_config_options()
+    streamlit.logger.set_log_level(logging.ERROR)
+
+    # Прогрев: первые фигуры Plotly и виджеты Streamlit строятся заметно дольше
+    warmup = Dataset(50, args.seed)
+    for case in cases:
+        CASES[case](warmup)
+
+    results = []
+    print(f"{'case':<24} {'commits':>8} {'time, s':>9} {'peak, MB':>9} {'JSON, KB':>9}")
+    for size in args.sizes:
+        data = Dataset(size, args.seed)
+        for case in cases:
+            item = measure(case, data, args.repeat, memory=not args.no_memory)
+            results.append(item)
+            print(
+                f"{case:<24} {size:>8} {item['time_s']:>9.4f} "
+                f"{item['peak_mb'] if item['peak_mb'] is not None else '-':>9} "
+                f"{item['payload_kb'] if item['payload_kb'] is not None else '-':>9}"
+            )
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.save) or ".", exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(
+                {"environment": environment(), "results": results}, f, indent=2
+            )
+        print(f"\nБазовая линия сохранена: {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nРегрессий: {len(regressions)} (порог {args.threshold:.0%})")
+            sys.exit(1)
+        print("\nРегрессий нет")
+
+
+if __name__ == "__main__":
+    main()
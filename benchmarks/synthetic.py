@@ -0,0 +1,196 @@
+"""
+Генератор синтетических коммитов в формате `GitService.build_commit_data`.
+
+Распределения подобраны так, чтобы графики дашборда выглядели правдоподобно:
+коммиты чаще в рабочие часы и будни, размер изменений с тяжёлым хвостом,
+файлы с типичными для репозитория расширениями (в том числе без расширения
+и скрытые), часть коммитов — с LLM-ревью.
+
+    from benchmarks.synthetic import generate_commits
+    commits = generate_commits(10_000, seed=1)
+"""
+
+import hashlib
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+# Каталоги и расширения с весами (доля файлов в изменениях)
+DIRECTORIES = [
+    "src/main/java/ru/alfa/core",
+    "src/main/java/ru/alfa/api",
+    "src/test/java/ru/alfa/core",
+    "app/services",
+    "app/models",
+    "app/utils",
+    "frontend/src/components",
+    "frontend/src/styles",
+    "config",
+    "docs",
+    "",
+]
+EXTENSIONS = {
+    ".java": 30,
+    ".py": 20,
+    ".ts": 10,
+    ".tsx": 6,
+    ".js": 5,
+    ".css": 3,
+    ".scss": 2,
+    ".html": 2,
+    ".json": 4,
+    ".yml": 4,
+    ".xml": 3,
+    ".md": 5,
+    ".sql": 2,
+    ".sh": 1,
+    "": 3,
+}
+EXTENSIONLESS_FILES = [
+    "Dockerfile",
+    "Makefile",
+    ".gitignore",
+    ".env.example",
+    "LICENSE",
+]
+
+COMMIT_PREFIXES = ["feat", "fix", "refactor", "test", "docs", "chore", "perf"]
+COMMIT_SUBJECTS = [
+    "add validation for policy requests",
+    "handle empty response from payment gateway",
+    "extract client factory",
+    "cover edge cases in premium calculation",
+    "update README",
+    "bump dependencies",
+    "cache exchange rates",
+    "fix NPE in claims mapper",
+    "split report service",
+    "remove deprecated endpoints",
+]
+
+# Относительная активность по часам (0–23) и дням недели (пн–вс)
+HOUR_WEIGHTS = [1, 1, 1, 1, 1, 1, 2, 4, 8, 14, 18, 18]
+HOUR_WEIGHTS += [12, 14, 18, 18, 16, 12, 8, 6, 4, 3, 2, 1]
+WEEKDAY_WEIGHTS = [18, 20, 20, 19, 16, 4, 3]
+
+FILE_STATUSES = ["modified"] * 8 + ["added"] * 3 + ["removed", "renamed"]
+
+REVIEW_TEMPLATE = """### 📋 Краткое описание изменений
+{subject}.
+
+### ✅ Best practice
+- Изменения небольшие и сфокусированные.
+
+### ⚠️ Уязвимости
+- Существенных проблем не найдено.
+
+### 🧩 Паттерны и антипаттерны
+- Используется внедрение зависимостей.
+
+### 📊 Итоговая оценка
+**{score}/10**
+"""
+
+
+def _patch(rnd: random.Random, additions: int, deletions: int) -> str:
+    lines = [f"@@ -1,{deletions} +1,{additions} @@"]
+    lines += [f"-    old_{rnd.randrange(10**6)}();" for _ in range(min(deletions, 40))]
+    lines += [f"+    new_{rnd.randrange(10**6)}();" for _ in range(min(additions, 40))]
+    return "\n".join(lines)
+
+
+def _split(rnd: random.Random, total: int, parts: int) -> List[int]:
+    """Случайное разбиение `total` на `parts` неотрицательных слагаемых"""
+    cuts = sorted(rnd.randint(0, total) for _ in range(parts - 1))
+    return [b - a for a, b in zip([0] + cuts, cuts + [total])]
+
+
+def generate_commits(
+    count: int,
+    seed: int = 0,
+    start: Optional[datetime] = None,
+    days: int = 365,
+    authors: int = 5,
+    review_ratio: float = 0.3,
+    with_patches: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Возвращает `count` коммитов за `days` дней начиная с `start`, от новых
+    к старым (как их отдаёт GitHub API). `review_ratio` — доля коммитов
+    с `llm_summary`; `with_patches` добавляет к файлам текст патчей.
+    """
+    rnd = random.Random(seed)
+    start = start or datetime(2024, 1, 1, tzinfo=timezone.utc)
+    people = [
+        (f"Developer {i}", f"dev{i}@example.com") for i in range(max(1, authors))
+    ]
+    extensions = list(EXTENSIONS)
+    extension_weights = list(EXTENSIONS.values())
+
+    # Дни и часы выбираются с весами, минуты — равномерно
+    day_offsets = [
+        offset
+        for offset in range(days)
+        for _ in range(WEEKDAY_WEIGHTS[(start + timedelta(days=offset)).weekday()])
+    ]
+
+    commits = []
+    for i in range(count):
+        moment = start + timedelta(
+            days=rnd.choice(day_offsets),
+            hours=rnd.choices(range(24), HOUR_WEIGHTS)[0],
+            minutes=rnd.randrange(60),
+            seconds=rnd.randrange(60),
+        )
+        # Логнормальный размер: большинство коммитов небольшие, редкие — огромные
+        size = int(rnd.lognormvariate(3.5, 1.3))
+        additions = int(size * rnd.betavariate(2, 1.2))
+        deletions = size - additions
+
+        files = []
+        file_count = max(1, min(int(rnd.expovariate(1 / 3)) + 1, 60))
+        for file_additions, file_deletions in zip(
+            _split(rnd, additions, file_count), _split(rnd, deletions, file_count)
+        ):
+            extension = rnd.choices(extensions, extension_weights)[0]
+            directory = rnd.choice(DIRECTORIES)
+            if extension:
+                name = f"module_{rnd.randrange(200)}{extension}"
+            else:
+                name = rnd.choice(EXTENSIONLESS_FILES)
+            file = {
+                "filename": f"{directory}/{name}" if directory else name,
+                "status": rnd.choice(FILE_STATUSES),
+                "additions": file_additions,
+                "deletions": file_deletions,
+                "changes": file_additions + file_deletions,
+            }
+            if with_patches and file["changes"]:
+                file["patch"] = _patch(rnd, file_additions, file_deletions)
+            files.append(file)
+
+        author, email = rnd.choice(people)
+        subject = f"{rnd.choice(COMMIT_PREFIXES)}: {rnd.choice(COMMIT_SUBJECTS)}"
+        sha = hashlib.sha1(f"{seed}:{i}".encode()).hexdigest()
+        commit = {
+            "sha": sha,
+            "message": f"{subject}\n\nTask ALFA-{rnd.randrange(1, 5000)}",
+            "author": author,
+            "author_email": email,
+            "date": moment,
+            "url": f"https://github.com/org/repo/commit/{sha}",
+            "stats": {
+                "additions": additions,
+                "deletions": deletions,
+                "total": additions + deletions,
+            },
+            "files": files,
+        }
+        if rnd.random() < review_ratio:
+            commit["llm_summary"] = REVIEW_TEMPLATE.format(
+                subject=subject, score=rnd.randint(5, 10)
+            )
+        commits.append(commit)
+
+    commits.sort(key=lambda commit: commit["date"], reverse=True)
+    return commits
@@ -8,14 +8,27 @@ st.set_page_config(
 )
 
 import os
-from datetime import datetime, timedelta
+import time
+from datetime import date, datetime, timedelta
 from dotenv import load_dotenv
 import base64
 from app.services.git_service import GitService
-from app.services.visualization_service import display_commit_analytics
+from app.services.analysis_jobs import (
+    COMMIT_ANALYSIS, QUALITY_REPORT, TEAM_ANALYSIS, TEAM_SELECTION_KEYS, create_job_queue, find_recent_analysis,
+    request_review, team_params,
+)
+from app.services.diagnostics import cache_totals, run_diagnostics
+from app.services.job_queue import ACTIVE_STATUSES
 from app.services.full_quality_report import generate_full_quality_report, get_pdf_download_link
+from app.services.snapshot_service import SNAPSHOTS_DIR, export_snapshot, list_snapshots, open_snapshot, snapshot_name
+from app.services.team_service import member_key, partition_by_member
+from app.utils.metrics import start_exporters
+from app.utils.rate_limiter import get_queue_depths
+from app.utils.tracing import get_tracer, span
 
 load_dotenv()
+# Эндпоинт /metrics и/или файл метрик, если заданы METRICS_PORT / METRICS_FILE
+start_exporters()
 
 # Стили
 st.markdown("""
@@ -56,7 +69,7 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-use_llm = st.checkbox("🌍 Enable LLM analysis for commit messages", value=True)
+poll_job = False
 
 @st.cache_resource
 def get_services():
@@ -64,6 +77,218 @@ def get_services():
 
 git_service = get_services()
 
+
+@st.cache_resource
+def get_job_queue():
+    return create_job_queue(git_service)
+
+job_queue = get_job_queue()
+
+
+
+def author_display(author):
+    return f"{author['name']} - {author.get('commit_count', 0)} commits"
+
+
+def render_dashboard(commits, author_data, **kwargs):
+    """Дашборд в отдельной трассе — её разбор показывает панель диагностики"""
+    # pandas, numpy и графики загружаются только к первому дашборду
+    from app.services.visualization_service import display_commit_analytics
+
+    with span("dashboard.render", commits=len(commits)) as render:
+        display_commit_analytics(commits, author_data, **kwargs)
+    st.session_state.last_render_trace = render.trace_id
+
+
+def render_diagnostics(title, diagnostics):
+    st.markdown(f"**{title}**")
+    if diagnostics is None:
+        st.caption("No trace recorded for this run")
+        return
+    status = "running, " if diagnostics["running"] else ""
+    counts = diagnostics["counts"]
+    st.caption(f"{status}{diagnostics['wall_seconds']:.2f} s total")
+    st.dataframe(
+        [{**row, "share": row["share"] * 100} for row in diagnostics["stages"]],
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "stage": "Stage",
+            "seconds": st.column_config.NumberColumn("Time, s", format="%.3f"),
+            "share": st.column_config.ProgressColumn(
+                "Share", min_value=0, max_value=100, format="%.0f%%"
+            ),
+            "calls": "Calls",
+        },
+    )
+    st.caption(
+        f"GitHub requests: {counts['github_requests']} · "
+        f"LLM requests: {counts['llm_requests']} "
+        f"(429: {counts['llm_rate_limited']}, tokens: {counts['llm_tokens']:,}) · "
+        f"Chart cache: {counts['cache_hits']} hits / {counts['cache_misses']} misses · "
+        f"Errors: {counts['errors']}"
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=100)
+def cached_pdf_link(report, filename):
+    """Ссылка на PDF отчёта участника: PDF не пересоздаётся при каждом перезапуске"""
+    return get_pdf_download_link(report, filename, "Download as PDF")
+
+
+def render_team_mode(repo_name, use_llm):
+    """
+    Командный режим: один список коммитов репозитория на всю команду, сравнительный
+    дашборд, дашборд выбранного разработчика и отчёты по каждому участнику.
+    """
+    global poll_job
+    from app.services.visualization_service import display_team_comparison
+
+    authors = {member_key(author): author for author in st.session_state.authors}
+    col1, col2 = st.columns(2)
+    with col1:
+        st.session_state.setdefault("team_members", list(authors))
+        st.session_state.team_members = [key for key in st.session_state.team_members if key in authors]
+        selected_keys = st.multiselect(
+            "Team members", list(authors), format_func=lambda key: author_display(authors[key]), key="team_members"
+        )
+    with col2:
+        col_start, col_end = st.columns(2)
+        st.session_state.setdefault("start_date", (datetime.now() - timedelta(days=30)).date())
+        st.session_state.setdefault("end_date", datetime.now().date())
+        with col_start:
+            start_date = st.date_input("Start Date", key="start_date")
+        with col_end:
+            end_date = st.date_input("End Date", key="end_date")
+
+    params = team_params(repo_name, [authors[key] for key in selected_keys], start_date, end_date, use_llm)
+    job = job_queue.get(st.session_state.team_job) if st.session_state.get("team_job") else None
+
+    # Сменился состав команды, период или репозиторий — отменяем устаревший анализ
+    if job and job["status"] in ACTIVE_STATUSES:
+        job_selection = {key: job["params"].get(key) for key in TEAM_SELECTION_KEYS}
+        current_selection = {
+            key: params[key].isoformat() if hasattr(params[key], "isoformat") else params[key]
+            for key in TEAM_SELECTION_KEYS
+        }
+        if job_selection != current_selection:
+            job_queue.cancel(job["id"])
+            st.session_state.pop("team_job", None)
+            st.session_state.team_reports = {}
+            st.query_params.pop("team", None)
+            st.toast("Previous team analysis cancelled")
+            job = None
+
+    if st.button("Analyze team", type="primary", disabled=not selected_keys):
+        # Идущий анализ с теми же параметрами продолжаем, а не запускаем второй
+        if not (job and job["status"] in ACTIVE_STATUSES):
+            # Готовый анализ той же команды за тот же период открывается сразу
+            recent = find_recent_analysis(job_queue, params, kind=TEAM_ANALYSIS)
+            st.session_state.team_job = recent["id"] if recent else job_queue.submit(TEAM_ANALYSIS, params)
+            st.session_state.team_reports = {}
+            st.query_params["team"] = st.session_state.team_job
+
+    job = job_queue.get(st.session_state.team_job) if st.session_state.get("team_job") else None
+    if job is None:
+        st.caption("One commit listing for the whole team; reviews for all developers run in a shared pool.")
+        return
+
+    if job["status"] in ACTIVE_STATUSES and (not job["progress_total"] or job["progress_done"] < job["progress_total"]):
+        done, total = job["progress_done"], job["progress_total"]
+        st.progress(min(1.0, done / total) if total else 0.0, text=f"🔍 Fetching team commits... {done}/{total or '?'}")
+        poll_job = True
+        return
+    if job["status"] == "cancelled":
+        st.info("Team analysis was cancelled")
+        return
+    if job["status"] == "failed":
+        st.error("Team analysis failed")
+        with st.expander("Details"):
+            st.code(job["error"] or "")
+        return
+
+    if job["status"] != "done":
+        reviewed = job["reviews_done"]
+        total = reviewed + job["reviews_pending"]
+        st.progress(reviewed / max(1, total), text=f"🤖 AI reviews (all developers): {reviewed}/{total}")
+        poll_job = True
+
+    members = {member_key(member): member for member in job["params"]["members"]}
+    commits = job_queue.results(job["id"])
+    display_team_comparison(commits, members)
+    if not commits:
+        return
+    by_member = partition_by_member(commits)
+
+    def member_name(key):
+        return (members.get(key) or {}).get("name") or key
+
+    st.markdown("---")
+    st.subheader("🔎 Developer Dashboard")
+    selected_member = st.selectbox("Developer", list(by_member), format_func=member_name, key="team_developer")
+    render_dashboard(
+        by_member[selected_member],
+        members.get(selected_member, {"name": selected_member}),
+        on_request_review=lambda sha: request_review(job_queue, job["id"], sha),
+    )
+
+    st.markdown("---")
+    st.subheader("📊 Reports per Developer")
+    reports = st.session_state.setdefault("team_reports", {})
+    if job["status"] != "done":
+        st.caption("Reports become available when all reviews are finished")
+    elif st.button("📊 Generate reports for all developers", key="generate_team_reports"):
+        for key in by_member:
+            reports[key] = job_queue.submit(QUALITY_REPORT, {"analysis_job": job["id"], "member": key})
+    for key, report_job_id in reports.items():
+        report_job = job_queue.get(report_job_id)
+        if report_job is None:
+            continue
+        with st.expander(f"{member_name(key)} · {report_job['status']}"):
+            if report_job["status"] == "done":
+                report = report_job["result"]["markdown"]
+                st.markdown(report)
+                filename = f"code_quality_{key}_{start_date.strftime('%Y%m%d')}.pdf"
+                st.markdown(cached_pdf_link(report, filename), unsafe_allow_html=True)
+            elif report_job["status"] in ACTIVE_STATUSES:
+                st.caption("🧠 Generating report...")
+                poll_job = True
+            else:
+                st.code(report_job["error"] or "")
+
+
+# После обновления страницы подхватываем задачу из URL и восстанавливаем выбор в виджетах
+if "analysis_job" not in st.session_state and st.query_params.get("job"):
+    restored_job = job_queue.get(st.query_params["job"])
+    if restored_job:
+        params = restored_job["params"]
+        st.session_state.analysis_job = restored_job["id"]
+        st.session_state.analyzed_author = params["author"]
+        st.session_state.repo_loaded = True
+        st.session_state.setdefault("authors", [params["author"]])
+        st.session_state.repo_name = params["repo_name"]
+        st.session_state.developer = author_display(params["author"])
+        st.session_state.start_date = datetime.fromisoformat(params["start_date"]).date()
+        st.session_state.end_date = datetime.fromisoformat(params["end_date"]).date()
+        st.session_state.use_llm = params["use_llm"]
+
+if "team_job" not in st.session_state and st.query_params.get("team"):
+    restored_team = job_queue.get(st.query_params["team"])
+    if restored_team:
+        params = restored_team["params"]
+        st.session_state.team_job = restored_team["id"]
+        st.session_state.team_mode = True
+        st.session_state.repo_loaded = True
+        st.session_state.setdefault("authors", params["members"])
+        st.session_state.team_members = params["member_keys"]
+        st.session_state.repo_name = params["repo_name"]
+        st.session_state.start_date = datetime.fromisoformat(params["start_date"]).date()
+        st.session_state.end_date = datetime.fromisoformat(params["end_date"]).date()
+        st.session_state.use_llm = params["use_llm"]
+
+st.session_state.setdefault("use_llm", True)
+use_llm = st.checkbox("🌍 Enable LLM analysis for commit messages", key="use_llm")
+
 # Sidebar: repo
 with st.sidebar:
     st.markdown("""
@@ -73,7 +298,8 @@ with st.sidebar:
     </div>
     """, unsafe_allow_html=True)
 
-    repo_name = st.text_input("Repository (owner/repo)", "AlfaInsurance/devQ_testData_JavaProject")
+    st.session_state.setdefault("repo_name", "AlfaInsurance/devQ_testData_JavaProject")
+    repo_name = st.text_input("Repository (owner/repo)", key="repo_name")
     if st.button("Load Repository Data", type="primary"):
         with st.spinner("Loading repository data..."):
             try:
@@ -86,7 +312,73 @@ with st.sidebar:
             except Exception as e:
                 st.error(f"Error: {e}")
 
-if not st.session_state.get("repo_loaded"):
+    st.toggle("👥 Team mode", key="team_mode", disabled=not st.session_state.get("repo_loaded"),
+              help="Analyze several developers at once: one commit listing, shared review pool, "
+                   "comparative dashboard and a report per developer")
+
+    st.checkbox("🩺 Show diagnostics", key="show_diagnostics",
+                help="Where the time went in the last analysis and dashboard render")
+
+    queue_depths = get_queue_depths()
+    if any(queue_depths.values()):
+        st.caption("⏳ API queue: " + ", ".join(f"{p}: {d}" for p, d in queue_depths.items()))
+
+    # Снимки: сохранённые результаты анализа открываются без GitHub и LLM
+    with st.expander("💾 Snapshots"):
+        saved_job = job_queue.get(st.session_state.analysis_job) if st.session_state.get("analysis_job") else None
+        if saved_job and st.session_state.get("analyzed_commits") and not st.session_state.get("snapshot"):
+            if st.button("Save snapshot", key="save_snapshot"):
+                params = saved_job["params"]
+                metadata = {
+                    "repo_name": params["repo_name"],
+                    "developer": params["developer_username"],
+                    "start_date": params["start_date"],
+                    "end_date": params["end_date"],
+                    "author": params["author"],
+                }
+                # В analyzed_commits нет текстов ревью — снимок собираем из задачи
+                path = export_snapshot(
+                    job_queue.results(saved_job["id"]),
+                    os.path.join(SNAPSHOTS_DIR, snapshot_name(metadata)),
+                    metadata,
+                )
+                st.success(f"Saved to {path}")
+
+        snapshots = list_snapshots()
+        if snapshots:
+            labels = {
+                item["path"]: f"{item.get('repo_name', item['name'])} · {item.get('developer', '')} · "
+                              f"{item.get('start_date', '')}..{item.get('end_date', '')} ({item.get('commits', 0)} commits)"
+                for item in snapshots
+            }
+            selected_snapshot = st.selectbox("Saved snapshots", list(labels), format_func=labels.get)
+            if st.button("Open snapshot", key="open_snapshot"):
+                snapshot = open_snapshot(selected_snapshot)
+                st.session_state.snapshot = snapshot.metadata
+                st.session_state.analyzed_commits = snapshot.to_commits()
+                st.session_state.analyzed_author = snapshot.metadata.get("author", {})
+                st.session_state.quality_report_generated = False
+        else:
+            st.caption("No saved snapshots yet")
+
+if st.session_state.get("snapshot"):
+    snapshot_meta = st.session_state.snapshot
+    st.info(
+        f"💾 Snapshot: {snapshot_meta.get('repo_name', '')}, {snapshot_meta.get('developer', '')}, "
+        f"{snapshot_meta.get('start_date', '')} — {snapshot_meta.get('end_date', '')}"
+    )
+    if st.button("Close snapshot"):
+        st.session_state.pop("snapshot", None)
+        st.session_state.pop("analyzed_job", None)
+        st.session_state.analyzed_commits = None
+        st.session_state.quality_report_generated = False
+        st.rerun()
+
+    # Для имени PDF-отчёта
+    selected_value = snapshot_meta.get("developer", "snapshot")
+    start_date = date.fromisoformat(snapshot_meta.get("start_date") or date.today().isoformat())
+    render_dashboard(st.session_state.analyzed_commits, st.session_state.analyzed_author)
+elif not st.session_state.get("repo_loaded"):
     st.markdown("""
     <div style="text-align: center; margin: 3rem 0;">
         <div style="font-size: 4rem; margin-bottom: 1.5rem;">🔍</div>
@@ -96,51 +388,139 @@ if not st.session_state.get("repo_loaded"):
         </p>
     </div>
     """, unsafe_allow_html=True)
+elif st.session_state.get("team_mode"):
+    render_team_mode(repo_name, use_llm)
 else:
     col1, col2 = st.columns(2)
     with col1:
-        author_options = [(f"{a['name']} - {a.get('commit_count', 0)} commits",
-                           a.get("github_login") or a.get("email"), a) for a in st.session_state.authors]
-        selected_display = st.selectbox("Select Developer", [a[0] for a in author_options], index=0)
+        author_options = [(author_display(a), a.get("github_login") or a.get("email"), a)
+                          for a in st.session_state.authors]
+        if st.session_state.get("developer") not in [a[0] for a in author_options]:
+            st.session_state.developer = author_options[0][0]
+        selected_display = st.selectbox("Select Developer", [a[0] for a in author_options], key="developer")
         selected_value = next(a[1] for a in author_options if a[0] == selected_display)
         selected_author_data = next(a[2] for a in author_options if a[0] == selected_display)
 
     with col2:
         col_start, col_end = st.columns(2)
+        st.session_state.setdefault("start_date", (datetime.now() - timedelta(days=30)).date())
+        st.session_state.setdefault("end_date", datetime.now().date())
         with col_start:
-            start_date = st.date_input("Start Date", value=datetime.now() - timedelta(days=30))
+            start_date = st.date_input("Start Date", key="start_date")
         with col_end:
-            end_date = st.date_input("End Date", value=datetime.now())
+            end_date = st.date_input("End Date", key="end_date")
+
+    selection = {
+        "repo_name": repo_name,
+        "developer_username": selected_value,
+        "start_date": start_date,
+        "end_date": end_date,
+        "use_llm": use_llm,
+    }
+
+    def open_analysis(job_id):
+        st.session_state.analysis_job = job_id
+        st.session_state.analyzed_commits = None
+        st.session_state.analyzed_author = selected_author_data
+        st.session_state.analyzed_dates = (start_date, end_date)
+        st.session_state.quality_report_generated = False
+        st.query_params["job"] = job_id
 
     if st.button("Analyze", type="primary"):
-        with st.spinner("🔍 Analyzing commits..."):
-            commits = git_service.get_repository_commits(
-                repo_name=repo_name,
-                developer_username=selected_value,
-                start_date=start_date,
-                end_date=end_date,
-                use_llm=use_llm,
-            )
-            st.session_state.analyzed_commits = commits
-            st.session_state.analyzed_author = selected_author_data
-            st.session_state.analyzed_dates = (start_date, end_date)
-            st.session_state.quality_report_generated = False
+        # Готовый анализ с теми же параметрами (например, ночной прогон CLI) открывается сразу
+        recent = find_recent_analysis(job_queue, selection)
+        if recent:
+            open_analysis(recent["id"])
+            st.session_state.reused_analysis = recent["id"]
+        else:
+            open_analysis(job_queue.submit(COMMIT_ANALYSIS, {**selection, "author": selected_author_data}))
+
+    reused_job = st.session_state.get("reused_analysis")
+    if reused_job and reused_job == st.session_state.get("analysis_job"):
+        reused = job_queue.get(reused_job)
+        if reused is None:
+            # Задание успели удалить (prune или сборка мусора) — начинаем с чистого листа
+            st.session_state.pop("reused_analysis", None)
+            st.session_state.pop("analysis_job", None)
+            st.query_params.pop("job", None)
+        else:
+            finished = reused["updated_at"]
+            st.caption(f"♻️ Showing the analysis finished at {datetime.fromtimestamp(finished):%Y-%m-%d %H:%M}")
+            if st.button("🔄 Re-analyze"):
+                st.session_state.pop("reused_analysis")
+                open_analysis(job_queue.submit(COMMIT_ANALYSIS, {**selection, "author": selected_author_data}))
+
+    job = job_queue.get(st.session_state.analysis_job) if st.session_state.get("analysis_job") else None
+
+    # Пользователь сменил разработчика, период или репозиторий — отменяем устаревший анализ
+    if job and job["status"] in ACTIVE_STATUSES:
+        job_selection = {key: job["params"].get(key) for key in selection}
+        current_selection = {
+            key: value.isoformat() if hasattr(value, "isoformat") else value
+            for key, value in selection.items()
+        }
+        if job_selection != current_selection:
+            job_queue.cancel(job["id"])
+            st.session_state.pop("analysis_job", None)
+            st.session_state.analyzed_commits = None
+            st.query_params.pop("job", None)
+            st.toast("Previous analysis cancelled")
+            job = None
+
+    fetching = job and job["status"] in ("queued", "running") and (
+        not job["progress_total"] or job["progress_done"] < job["progress_total"]
+    )
+    if fetching:
+        done, total = job["progress_done"], job["progress_total"]
+        if total:
+            st.progress(min(1.0, done / total), text=f"🔍 Fetching commits... {done}/{total}")
+        else:
+            st.progress(0.0, text="🔍 Fetching commits...")
+        poll_job = True
+    elif job and job["status"] == "cancelled":
+        st.info("Analysis was cancelled")
+    elif job and job["status"] == "failed":
+        st.error("Analysis failed")
+        with st.expander("Details"):
+            st.code(job["error"] or "")
+    elif job:
+        # Коммиты загружены — показываем дашборд, LLM-ревью догружаются в фоне
+        reviews_pending = job["status"] != "done" and job["reviews_pending"] > 0
+        if reviews_pending or st.session_state.get("analyzed_job") != (job["id"], job["status"]):
+            # Тексты ревью не загружаются: их читает карточка выбранного коммита
+            st.session_state.analyzed_commits = job_queue.results(job["id"], reviews=False)
+            st.session_state.analyzed_job = (job["id"], job["status"])
+
+        if job["status"] != "done":
+            reviewed = job["reviews_done"]
+            total = reviewed + job["reviews_pending"]
+            st.progress(reviewed / max(1, total), text=f"🤖 AI reviews: {reviewed}/{total}")
+            poll_job = True
 
-            if not commits:
+        if not st.session_state.analyzed_commits:
+            if job["status"] == "done":
                 st.warning("No commits found for the selected developer and date range.")
-            else:
-                display_commit_analytics(commits, selected_author_data)
-    elif st.session_state.get("analyzed_commits"):
-        display_commit_analytics(st.session_state.analyzed_commits, st.session_state.analyzed_author)
+        else:
+            render_dashboard(
+                st.session_state.analyzed_commits,
+                st.session_state.analyzed_author,
+                on_request_review=lambda sha: request_review(job_queue, job["id"], sha),
+                load_commit=lambda sha: job_queue.result(job["id"], sha),
+            )
 
-# Отчет внизу
-if st.session_state.get("analyzed_commits"):
+# Отчет внизу (в командном режиме отчёты строятся по каждому участнику)
+team_view = st.session_state.get("team_mode") and not st.session_state.get("snapshot")
+if st.session_state.get("analyzed_commits") and not team_view:
     st.markdown("---")
     st.subheader("📊 Full Code Quality Report")
 
     if st.button("📊 Generate Full Quality Report", key="generate_final_report"):
         with st.spinner("🧠 Generating comprehensive quality report..."):
-            report = generate_full_quality_report(st.session_state.analyzed_commits)
+            report_commits = st.session_state.analyzed_commits
+            if not st.session_state.get("snapshot") and st.session_state.get("analysis_job"):
+                # Тексты ревью для отчёта читаем из задачи целиком
+                report_commits = job_queue.results(st.session_state.analysis_job)
+            report = generate_full_quality_report(report_commits)
             st.session_state.quality_report = report
             st.session_state.quality_report_generated = True
 
@@ -183,3 +563,35 @@ if st.session_state.get("analyzed_commits"):
             unsafe_allow_html=True
         )
         st.markdown("</div>", unsafe_allow_html=True)
+
+# Диагностика последнего запуска: разбор трасс анализа и отрисовки дашборда
+if st.session_state.get("show_diagnostics"):
+    st.markdown("---")
+    st.subheader("🩺 Diagnostics")
+    col_job, col_render = st.columns(2)
+    with col_job:
+        job_id = st.session_state.get("analysis_job")
+        render_diagnostics(
+            "Analysis (GitHub fetch, LLM review, revision)",
+            run_diagnostics(get_tracer().find_traces(job_id=job_id)) if job_id else None,
+        )
+    with col_render:
+        render_trace = st.session_state.get("last_render_trace")
+        render_diagnostics(
+            "Dashboard render (DataFrame prep, charts)",
+            run_diagnostics([render_trace]) if render_trace else None,
+        )
+    totals = cache_totals()
+    st.caption(
+        "Process cache totals: "
+        + " · ".join(
+            f"{cache} {item['hits']:.0f} hits / {item['misses']:.0f} misses"
+            + (f" ({item['hit_ratio']:.0%})" if item["hit_ratio"] is not None else "")
+            for cache, item in totals.items()
+        )
+    )
+
+# Пока фоновая задача не завершена, периодически перезапускаем скрипт
+if poll_job:
+    time.sleep(2)
+    st.rerun()
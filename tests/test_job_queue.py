@@ -0,0 +1,288 @@
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from app.models import commit_record
+from app.models.commit_record import PatchStore
+from app.services.job_queue import CANCELLED, DONE, QUEUED, RUNNING, JobQueue
+from app.utils.cancellation import CancellationToken, OperationCancelled
+
+
+def make_commit(sha: str, **extra):
+    return {
+        "sha": sha,
+        "message": f"commit {sha}",
+        "author": "Alice",
+        "author_email": "alice@example.com",
+        "date": "2024-01-01T00:00:00",
+        "url": f"https://example.com/{sha}",
+        "stats": {"additions": 1, "deletions": 0, "total": 1},
+        "files": [],
+        **extra,
+    }
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "jobs.sqlite3")
+
+
+def dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def set_lease(queue: JobQueue, job_id: str, owner, heartbeat_at):
+    with queue._connect() as conn:
+        conn.execute(
+            "UPDATE jobs SET status = ?, owner = ?, heartbeat_at = ? WHERE id = ?",
+            (RUNNING, owner, heartbeat_at, job_id),
+        )
+
+
+def test_claim_next_gives_each_job_to_one_queue(db_path):
+    queues = [JobQueue(db_path), JobQueue(db_path)]
+    submitted = {queues[0].submit("noop", {"n": i}) for i in range(40)}
+    claimed, lock = [], threading.Lock()
+
+    def claim(queue):
+        while True:
+            job = queue._claim_next()
+            if job is None:
+                return
+            with lock:
+                claimed.append((queue.owner, job["id"]))
+
+    threads = [threading.Thread(target=claim, args=(queue,)) for queue in queues * 4]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    job_ids = [job_id for _, job_id in claimed]
+    assert len(job_ids) == len(set(job_ids))
+    assert set(job_ids) == submitted
+    for owner, job_id in claimed:
+        job = queues[0].get(job_id)
+        assert job["status"] == RUNNING
+        assert job["owner"] == owner
+
+
+def test_recover_requeues_only_stale_jobs(db_path):
+    owner_queue, other = JobQueue(db_path), JobQueue(db_path, lease_seconds=60)
+    live = owner_queue.submit("noop", {})
+    assert owner_queue._claim_next()["id"] == live
+    expired = other.submit("noop", {})
+    set_lease(other, expired, owner_queue.owner, time.time() - 120)
+    dead = other.submit("noop", {})
+    set_lease(other, dead, f"{socket.gethostname()}:{dead_pid()}:x", time.time())
+    remote = other.submit("noop", {})
+    set_lease(other, remote, "elsewhere:1:x", time.time())
+
+    assert other.recover() == 2
+
+    assert other.get(live)["status"] == RUNNING
+    assert other.get(remote)["status"] == RUNNING
+    for job_id in (expired, dead):
+        job = other.get(job_id)
+        assert job["status"] == QUEUED
+        assert job["owner"] is None
+
+
+def test_lease_is_renewed_while_job_runs(db_path):
+    queue = JobQueue(db_path, lease_seconds=2)
+    other = JobQueue(db_path, lease_seconds=2)
+    started, release = threading.Event(), threading.Event()
+
+    def handler(q, job):
+        started.set()
+        release.wait(10)
+
+    queue.register_handler("slow", handler)
+    job_id = queue.submit("slow", {})
+    queue.start_workers(1)
+    assert started.wait(5)
+    time.sleep(3)
+    assert other.recover() == 0
+    release.set()
+    deadline = time.time() + 5
+    while queue.get(job_id)["status"] != DONE and time.time() < deadline:
+        time.sleep(0.05)
+    assert queue.get(job_id)["status"] == DONE
+
+
+def test_checkpoint_resume(db_path):
+    queue = JobQueue(db_path)
+    job_id = queue.submit("noop", {})
+    queue._claim_next()
+    queue.checkpoint(job_id, 2, make_commit("c"), reviewed=False)
+    queue.checkpoint(job_id, 0, make_commit("a"), reviewed=False)
+    queue.checkpoint(job_id, 0, make_commit("a", llm_summary="ok"))
+
+    job = queue.get(job_id)
+    assert job["progress_done"] == 2
+    assert (job["reviews_done"], job["reviews_pending"]) == (1, 1)
+    assert queue.done_shas(job_id) == {"a", "c"}
+    assert [commit["sha"] for commit in queue.results(job_id)] == ["a", "c"]
+    assert queue.results(job_id)[0]["llm_summary"] == "ok"
+    position, commit = queue.next_pending_review(job_id)
+    assert (position, commit["sha"]) == (2, "c")
+    assert queue.next_pending_review(job_id, exclude=["c"]) is None
+
+
+def test_results_without_reviews_load_review_per_commit(db_path):
+    queue = JobQueue(db_path)
+    job_id = queue.submit("noop", {})
+    queue._claim_next()
+    queue.checkpoint(job_id, 0, make_commit("a", llm_summary="review a"))
+    queue.checkpoint(job_id, 1, make_commit("b", llm_pending=True), reviewed=False)
+    queue.checkpoint(job_id, 2, make_commit("c", llm_summary=""))
+
+    listing = queue.results(job_id, reviews=False)
+    assert [commit["sha"] for commit in listing] == ["a", "b", "c"]
+    assert all("llm_summary" not in commit for commit in listing)
+    assert [commit.get("llm_reviewed") for commit in listing] == [True, None, None]
+    assert listing[1]["llm_pending"]
+    assert queue.result(job_id, "a")["llm_summary"] == "review a"
+    assert queue.result(job_id, "missing") is None
+
+
+def test_cancel_queued_job(db_path):
+    queue = JobQueue(db_path)
+    job_id = queue.submit("noop", {})
+    assert queue.cancel(job_id)
+    assert queue.get(job_id)["status"] == CANCELLED
+    assert queue._claim_next() is None
+    assert not queue.cancel(job_id)
+
+
+def test_cancel_running_job_signals_its_token(db_path):
+    queue = JobQueue(db_path)
+    started = threading.Event()
+
+    def handler(q, job):
+        started.set()
+        job["cancel_token"].wait(10)
+        job["cancel_token"].raise_if_cancelled()
+
+    queue.register_handler("slow", handler)
+    job_id = queue.submit("slow", {})
+    queue.start_workers(1)
+    assert started.wait(5)
+    assert queue.cancel(job_id)
+    deadline = time.time() + 5
+    while job_id in queue._tokens and time.time() < deadline:
+        time.sleep(0.05)
+    assert queue.get(job_id)["status"] == CANCELLED
+
+
+def test_inline_job_is_not_rerun_by_workers_of_another_queue(db_path):
+    inline, server = JobQueue(db_path), JobQueue(db_path)
+    runs, started, release = [], threading.Event(), threading.Event()
+
+    def handler(q, job):
+        runs.append((threading.current_thread().name, job["id"]))
+        started.set()
+        release.wait(10)
+
+    for queue in (inline, server):
+        queue.register_handler("slow", handler)
+    thread = threading.Thread(target=inline.run, args=("slow", {}), name="cli-inline")
+    thread.start()
+    assert started.wait(5)
+    server.start_workers(1)
+    time.sleep(1.5)
+    release.set()
+    thread.join(5)
+
+    assert [name for name, _ in runs] == ["cli-inline"]
+    assert inline.get(runs[0][1])["status"] == DONE
+
+
+def test_cancel_from_another_queue_stops_checkpoints(db_path):
+    owner, api = JobQueue(db_path, lease_seconds=2), JobQueue(db_path)
+    saved, started = [], threading.Event()
+
+    def handler(q, job):
+        started.set()
+        for position in range(100):
+            q.checkpoint(job["id"], position, make_commit(f"sha{position}"))
+            saved.append(position)
+            time.sleep(0.05)
+
+    owner.register_handler("fetch", handler)
+    job_id = owner.submit("fetch", {})
+    owner.start_workers(1)
+    assert started.wait(5)
+    assert api.cancel(job_id)
+    deadline = time.time() + 5
+    while job_id in owner._tokens and time.time() < deadline:
+        time.sleep(0.05)
+
+    assert job_id not in owner._tokens
+    assert len(saved) < 100
+    assert owner.get(job_id)["status"] == CANCELLED
+    with pytest.raises(OperationCancelled):
+        owner.next_pending_review(job_id)
+
+
+def test_cancel_from_another_queue_signals_token_of_blocked_job(db_path):
+    owner, api = JobQueue(db_path, lease_seconds=2), JobQueue(db_path)
+    shared = CancellationToken()
+    seen = {}
+
+    def handler(q, job):
+        # Как долгий HTTP-запрос: ждёт только токен, без checkpoint
+        seen["cancelled"] = job["cancel_token"].wait(10)
+
+    owner.register_handler("wait", handler)
+    thread = threading.Thread(target=owner.run, args=("wait", {}, shared))
+    thread.start()
+    deadline = time.time() + 5
+    while not owner._tokens and time.time() < deadline:
+        time.sleep(0.05)
+    api.cancel(next(iter(owner._tokens)))
+    thread.join(10)
+
+    assert seen["cancelled"]
+    # Общий токен пакета (CLI) не отменяется вместе с одной задачей
+    assert not shared.is_cancelled
+
+
+def test_collect_garbage_prunes_old_jobs_and_unreferenced_patches(
+    db_path, tmp_path, monkeypatch
+):
+    store = PatchStore(str(tmp_path / "patches"))
+    monkeypatch.setattr(commit_record, "_patch_store", store)
+    queue = JobQueue(db_path)
+    old, recent = queue.submit("noop", {}), queue.submit("noop", {})
+    for job_id, patch in ((old, "old patch"), (recent, "recent patch")):
+        queue._claim_next()
+        file = {"filename": "a.py", "patch": patch}
+        queue.checkpoint(job_id, 0, make_commit(f"sha-{patch}", files=[file]))
+        queue._set_status(job_id, DONE)
+    with queue._connect() as conn:
+        conn.execute(
+            "UPDATE jobs SET updated_at = ? WHERE id = ?",
+            (time.time() - 40 * 86400, old),
+        )
+    old_key = store.put("old patch")
+    # Патчи старше часа: иначе их защищает окно для ещё не сохранённых коммитов
+    for prefix in os.listdir(store.root):
+        for name in os.listdir(os.path.join(store.root, prefix)):
+            path = os.path.join(store.root, prefix, name)
+            os.utime(path, (time.time() - 7200, time.time() - 7200))
+
+    assert queue.collect_garbage(retention_days=30) == {"jobs": 1, "patches": 1}
+
+    assert queue.get(old) is None
+    assert queue.results(old) == []
+    assert queue.results(recent)[0]["files"][0]["patch"] == "recent patch"
+    with pytest.raises(KeyError):
+        store.get(old_key)
@@ -0,0 +1,124 @@
+import threading
+import time
+
+import pytest
+
+from app.utils.cancellation import CancellationToken, OperationCancelled
+from app.utils.rate_limiter import ProviderRateLimiter
+
+
+def drained(requests_per_minute: int, tokens_per_minute: int = 0):
+    """Лимитер с пустым ведром запросов: каждый следующий запрос ждёт пополнения"""
+    limiter = ProviderRateLimiter("test", requests_per_minute, tokens_per_minute)
+    limiter.requests.tokens = 0
+    return limiter
+
+
+def wait_for_depth(limiter: ProviderRateLimiter, depth: int, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while limiter.queue_depth != depth:
+        assert time.monotonic() < deadline, f"очередь {limiter.queue_depth} != {depth}"
+        time.sleep(0.01)
+
+
+def start_waiter(limiter, name, order, errors, tokens=1, cancel_token=None):
+    def run():
+        try:
+            limiter.acquire(tokens, cancel_token)
+            order.append(name)
+        except OperationCancelled:
+            errors.append(name)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_waiters_are_served_in_fifo_order():
+    limiter = drained(1200)
+    order, errors = [], []
+    threads = []
+    for i in range(6):
+        threads.append(start_waiter(limiter, i, order, errors))
+        wait_for_depth(limiter, i + 1)
+    for thread in threads:
+        thread.join(5)
+
+    assert order == list(range(6))
+    assert errors == []
+    assert limiter.queue_depth == 0
+
+
+def test_cancelled_waiter_behind_the_head_is_skipped():
+    limiter = drained(40)
+    order, errors = [], []
+    cancel = CancellationToken()
+    head = start_waiter(limiter, "head", order, errors)
+    wait_for_depth(limiter, 1)
+    middle = start_waiter(limiter, "middle", order, errors, cancel_token=cancel)
+    wait_for_depth(limiter, 2)
+    tail = start_waiter(limiter, "tail", order, errors)
+    wait_for_depth(limiter, 3)
+
+    cancel.cancel()
+    middle.join(2)
+    assert errors == ["middle"]
+    assert limiter.queue_depth == 2
+    head.join(5)
+    tail.join(5)
+
+    assert order == ["head", "tail"]
+    assert limiter.queue_depth == 0
+    assert limiter._abandoned == set()
+
+
+def test_cancelled_head_passes_the_turn_to_the_next_waiter():
+    limiter = drained(6)
+    order, errors = [], []
+    cancel = CancellationToken()
+    head = start_waiter(limiter, "head", order, errors, cancel_token=cancel)
+    wait_for_depth(limiter, 1)
+    tail = start_waiter(limiter, "tail", order, errors)
+    wait_for_depth(limiter, 2)
+
+    cancel.cancel()
+    head.join(2)
+    assert errors == ["head"]
+    with limiter._cond:
+        limiter.requests.tokens = 1
+        limiter._cond.notify_all()
+    tail.join(2)
+
+    assert order == ["tail"]
+    assert limiter.queue_depth == 0
+
+
+def test_settle_refunds_unused_tokens_and_wakes_waiters():
+    limiter = ProviderRateLimiter("test", 0, 600)
+    limiter.acquire(500)
+    assert limiter.tokens.tokens == pytest.approx(100, abs=1)
+
+    limiter.settle(500, None)
+    limiter.settle(500, 700)
+    assert limiter.tokens.tokens == pytest.approx(100, abs=1)
+
+    order, errors = [], []
+    waiter = start_waiter(limiter, "big", order, errors, tokens=400)
+    wait_for_depth(limiter, 1)
+    started = time.monotonic()
+    limiter.settle(500, 100)
+    waiter.join(2)
+
+    assert order == ["big"]
+    assert time.monotonic() - started < 1
+    assert limiter.tokens.tokens == pytest.approx(100, abs=1)
+
+
+def test_zero_per_minute_means_unlimited():
+    limiter = ProviderRateLimiter("test", 0, 0)
+    started = time.monotonic()
+    for _ in range(1000):
+        limiter.acquire(1_000_000)
+
+    assert time.monotonic() - started < 1
+    assert limiter.queue_depth == 0